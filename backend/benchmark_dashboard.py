@@ -0,0 +1,155 @@
+"""Benchmark the dashboard endpoint: query count and latency, before and after.
+
+"Before" is the original sequential implementation (15 queries), kept here
+as a reference; "after" is routers.dashboard.build_dashboard (the
+endpoint body, without its ETag/response cache).
+
+Usage:
+    python benchmark_dashboard.py [--ncs 50000] [--capas 10000] [--runs 50]
+
+Runs against a throwaway SQLite database filled with synthetic records.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ncs", type=int, default=50000, help="synthetic nonconformances")
+    parser.add_argument("--capas", type=int, default=10000, help="synthetic CAPA records")
+    parser.add_argument("--runs", type=int, default=50, help="timed calls per variant")
+    return parser.parse_args()
+
+
+args = parse_args()
+db_dir = tempfile.mkdtemp(prefix="qms-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(db_dir, 'bench.db')}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import and_, event, func, insert, select  # noqa: E402
+
+from database import init_db, reader_engine, writer_session_factory, run_in_read_session  # noqa: E402
+from models import (  # noqa: E402
+    User, Role, Nonconformance, CAPARecord, AuditFinding,
+    WorkOrder, TrainingRecord, InspectionRecord
+)
+from routers.dashboard import build_dashboard  # noqa: E402
+from utils.kpi_counters import reconcile_kpi_counters  # noqa: E402
+from utils.nc_rollup import reconcile_nc_rollup  # noqa: E402
+
+
+NC_STATUSES = ["Open", "Under Investigation", "Pending Disposition", "Resolved", "Closed"]
+CAPA_STATUSES = ["Open", "In Progress", "Pending Verification", "Closed"]
+
+
+async def seed(nc_count: int, capa_count: int) -> None:
+    """Insert one user and the synthetic NC/CAPA history (5 years)."""
+    now = datetime.utcnow()
+    async with writer_session_factory() as db:
+        role = Role(name="Bench", permissions={})
+        db.add(role)
+        await db.flush()
+        user = User(
+            email="bench@example.com", username="bench", password_hash="x",
+            first_name="Bench", last_name="User", role_id=role.id
+        )
+        db.add(user)
+        await db.flush()
+
+        rows = []
+        for i in range(nc_count):
+            created = now - timedelta(minutes=random.randint(0, 5 * 365 * 24 * 60))
+            rows.append({
+                "id": str(uuid.uuid4()), "nc_number": f"NC-B-{i:07d}", "title": f"NC {i}",
+                "description": "synthetic", "discovered_date": created.date(),
+                "created_by": user.id, "status": random.choice(NC_STATUSES),
+                "created_at": created, "updated_at": created,
+            })
+        await db.execute(insert(Nonconformance), rows)
+
+        rows = []
+        for i in range(capa_count):
+            created = now - timedelta(minutes=random.randint(0, 5 * 365 * 24 * 60))
+            rows.append({
+                "id": str(uuid.uuid4()), "capa_number": f"CAPA-B-{i:07d}", "title": f"CAPA {i}",
+                "owner_id": user.id, "status": random.choice(CAPA_STATUSES),
+                "created_at": created, "updated_at": created,
+            })
+        await db.execute(insert(CAPARecord), rows)
+        await db.commit()
+
+
+async def legacy_dashboard(db):
+    """The original get_dashboard query sequence."""
+    await db.execute(select(func.count(Nonconformance.id)).where(
+        Nonconformance.status.in_(["Open", "Under Investigation", "Pending Disposition"])))
+    await db.execute(select(func.count(CAPARecord.id)).where(
+        CAPARecord.status.in_(["Open", "In Progress", "Pending Verification"])))
+    await db.execute(select(func.count(AuditFinding.id)).where(
+        AuditFinding.status.in_(["Open", "In Progress"])))
+    await db.execute(select(func.count(TrainingRecord.id)).where(and_(
+        TrainingRecord.expiry_date < datetime.utcnow().date(),
+        TrainingRecord.is_certified == True)))
+    await db.execute(select(func.count(WorkOrder.id)).where(
+        WorkOrder.status.in_(["Planned", "Released", "In Progress"])))
+    await db.execute(select(func.count(InspectionRecord.id)).where(
+        InspectionRecord.status == "Pending"))
+    for i in range(5, -1, -1):
+        month_start = datetime.utcnow().replace(day=1) - timedelta(days=30 * i)
+        month_end = (month_start + timedelta(days=32)).replace(day=1)
+        await db.execute(select(func.count(Nonconformance.id)).where(and_(
+            Nonconformance.created_at >= month_start,
+            Nonconformance.created_at < month_end)))
+    await db.execute(select(CAPARecord.status, func.count(CAPARecord.id)).group_by(CAPARecord.status))
+    (await db.execute(select(Nonconformance).order_by(Nonconformance.created_at.desc()).limit(5))).scalars().all()
+    (await db.execute(select(CAPARecord).order_by(CAPARecord.created_at.desc()).limit(5))).scalars().all()
+
+
+async def measure(label: str, call, runs: int) -> None:
+    statements = 0
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements += 1
+
+    await call()  # warm up connections and caches
+    event.listen(reader_engine.sync_engine, "before_cursor_execute", count_statement)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    event.remove(reader_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    timings.sort()
+    print(
+        f"{label:<8} queries/call={statements / runs:>5.1f}  "
+        f"mean={statistics.mean(timings):8.2f} ms  "
+        f"p50={timings[len(timings) // 2]:8.2f} ms  "
+        f"p95={timings[int(len(timings) * 0.95) - 1]:8.2f} ms"
+    )
+
+
+async def main():
+    await init_db()
+    print(f"Seeding {args.ncs} NCs and {args.capas} CAPAs into {db_dir} ...")
+    await seed(args.ncs, args.capas)
+    # Bulk inserts bypass the flush events that maintain kpi_counters and the rollup
+    await reconcile_kpi_counters()
+    await reconcile_nc_rollup()
+
+    await measure("before", lambda: run_in_read_session(legacy_dashboard), args.runs)
+    await measure("after", build_dashboard, args.runs)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -9,10 +9,99 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./qms_erp.db"
     
+    # SQLite connection profile, applied to every new connection
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64 MiB
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+    
+    # Reader connection pool used by read-only (GET) sessions
+    READ_POOL_SIZE: int = 8
+    READ_POOL_MAX_OVERFLOW: int = 8
+    
+    # Rows fetched per round trip and flushed per chunk by streaming exports
+    STREAM_CHUNK_ROWS: int = 500
+    
+    # Seconds between kpi_counters reconciliation runs (0 disables the job)
+    KPI_RECONCILE_INTERVAL_SECONDS: int = 300
+    
+    # Single-writer queue: units arriving within the window share one commit
+    WRITE_QUEUE_WINDOW_MS: float = 5.0
+    WRITE_QUEUE_MAX_BATCH: int = 64
+    
     # JWT Authentication
     SECRET_KEY: str = "your-super-secret-key-change-in-production-min-32-chars"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    
+    # In-memory token revocation list (bloom filter sizing)
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    
+    # Record numbers reserved per sequence_counters write (hi/lo block size).
+    # Unused numbers in a block are skipped when the process restarts.
+    SEQUENCE_BLOCK_SIZE: int = 20
+    
+    # Directory of uploaded files; empty means backend/uploads
+    UPLOAD_DIR: str = ""
+    
+    # Document uploads: largest accepted file, and bytes buffered per disk write
+    UPLOAD_MAX_BYTES: int = 256 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    
+    # Unreferenced blobs (and stale partial uploads) older than this are
+    # removed by the blob store garbage collector
+    BLOB_GC_GRACE_SECONDS: int = 3600
+    
+    # Characters of file text kept in the document search index
+    SEARCH_CONTENT_MAX_CHARS: int = 1_000_000
+    
+    # Background text extraction of uploads on a process pool (0 disables).
+    # Worker processes are replaced after this many files so parser memory
+    # is returned to the OS.
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_TASKS_PER_CHILD: int = 50
+    
+    # Revision diffs cached per pair of file hashes (per process)
+    DIFF_CACHE_MAX_ENTRIES: int = 64
+    
+    # Exploded BOM trees cached per item and BOM revision (per process)
+    BOM_CACHE_MAX_ENTRIES: int = 512
+    
+    # Version-keyed cache of dashboard/stats response bodies (per process)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    
+    # KPI push stream (/api/dashboard/stream): changes within the debounce
+    # window are computed once; idle streams get a keepalive comment
+    KPI_PUSH_DEBOUNCE_MS: int = 250
+    KPI_PUSH_HEARTBEAT_SECONDS: int = 15
+    KPI_PUSH_MAX_SUBSCRIBERS: int = 500
+    # Lifetime of the stream-only tokens EventSource passes in the query string
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+    
+    # Unknown role ids reload the permission registry at most this often;
+    # in between they are denied without a query
+    ROLE_RELOAD_INTERVAL_SECONDS: int = 5
+    
+    # Authenticated principal cache (per process)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Password hashing pool
+    HASHING_MAX_WORKERS: int = 4
+    HASHING_MAX_PENDING: int = 64
+    
+    # bcrypt work factor. When BCRYPT_TARGET_MS > 0 the cost is calibrated at
+    # startup to the highest value in [MIN, MAX] that hashes within the target.
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_TARGET_MS: int = 0
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 15
     
     # Application
     APP_NAME: str = "Medical Device QMS-ERP"
@@ -1,6 +1,11 @@
 """Database configuration and session management."""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 
 
@@ -11,15 +16,294 @@ engine = create_async_engine(
     future=True
 )
 
+# Pooled engine for read-only sessions
+reader_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.READ_POOL_SIZE,
+    max_overflow=settings.READ_POOL_MAX_OVERFLOW
+)
+
+# Dedicated single-connection engine used by the write queue
+writer_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=1,
+    max_overflow=0
+)
+
+
+def sqlite_profile() -> dict:
+    """PRAGMA values applied to each SQLite connection, in execution order."""
+    return {
+        # busy_timeout first so switching journal mode can wait for locks
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "foreign_keys": "ON" if settings.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def apply_sqlite_profile(dbapi_connection, connection_record):
+    """Apply the configured PRAGMA profile to a new connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in sqlite_profile().items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def take_transaction_control(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself instead of the driver's implicit one."""
+    dbapi_connection.isolation_level = None
+
+
+def begin_immediate(conn):
+    """Take the write lock when the writer transaction starts."""
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def begin_deferred(conn):
+    """Open a read transaction; the WAL snapshot is taken on the first SELECT."""
+    conn.exec_driver_sql("BEGIN DEFERRED")
+
+
+def make_query_only(dbapi_connection, connection_record):
+    """Reject writes on reader connections."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    if settings.SQLITE_TUNING_ENABLED:
+        event.listen(engine.sync_engine, "connect", apply_sqlite_profile)
+        event.listen(reader_engine.sync_engine, "connect", apply_sqlite_profile)
+        event.listen(writer_engine.sync_engine, "connect", apply_sqlite_profile)
+    event.listen(reader_engine.sync_engine, "connect", take_transaction_control)
+    event.listen(reader_engine.sync_engine, "connect", make_query_only)
+    event.listen(reader_engine.sync_engine, "begin", begin_deferred)
+    event.listen(writer_engine.sync_engine, "connect", take_transaction_control)
+    event.listen(writer_engine.sync_engine, "begin", begin_immediate)
+
+
+async def get_sqlite_settings() -> dict:
+    """Read the effective PRAGMA values from a live connection."""
+    if engine.dialect.name != "sqlite":
+        return {}
+    values = {}
+    async with engine.connect() as conn:
+        for pragma in sqlite_profile():
+            result = await conn.execute(text(f"PRAGMA {pragma}"))
+            values[pragma] = result.scalar()
+    return values
+
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Single-writer lane with group commit.
+    
+    Units of work are ``async def unit(session)`` callables submitted with
+    ``await write_queue.submit(unit)``. The worker runs them one at a time on
+    the writer connection, each inside its own SAVEPOINT, and commits the
+    surrounding transaction once per batch: ``WRITE_QUEUE_WINDOW_MS`` after
+    the first unit arrived, or as soon as the batch reaches
+    ``WRITE_QUEUE_MAX_BATCH`` units. A failing unit only rolls back its savepoint
+    and its exception is raised to its own caller; a failed batch commit is
+    raised to every caller in the batch.
+    
+    Legacy request sessions that commit through ``get_db`` are serialized on
+    the same lane (see ``QueuedCommitSession``), so in-process writers never
+    contend for the SQLite write lock. Units must not submit further units.
+    """
+    
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.units = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        """Start the worker on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._worker())
+    
+    async def stop(self) -> None:
+        """Finish queued work and stop the worker."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+    
+    async def submit(self, unit: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        """Run a unit of work on the writer and return its result once committed."""
+        if not self.running:
+            # Scripts and startup code run without the worker
+            async with writer_session_factory() as session:
+                result = await unit(session)
+                await session.commit()
+                return result
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(("unit", unit, future))
+        return await future
+    
+    async def run_exclusive(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` between batches, with no other writer active."""
+        if not self.running:
+            return await func()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(("exclusive", func, future))
+        return await future
+    
+    def stats(self) -> dict:
+        """Return queue depth and batch counters."""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "units": self.units,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+        }
+    
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        held = None
+        while True:
+            item = held if held is not None else await self._queue.get()
+            held = None
+            if item is _STOP:
+                return
+            kind, func, future = item
+            if kind == "exclusive":
+                await self._settle(future, func)
+                continue
+            
+            batch = [item]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    nxt = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if nxt is _STOP or nxt[0] == "exclusive":
+                    # Close this batch first; handle the item on the next turn
+                    held = nxt
+                    break
+                batch.append(nxt)
+            await self._commit_batch(batch)
+    
+    async def _settle(self, future: asyncio.Future, func) -> None:
+        try:
+            result = await func()
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+        else:
+            if not future.done():
+                future.set_result(result)
+    
+    async def _commit_batch(self, batch: list) -> None:
+        outcomes = []
+        try:
+            async with writer_engine.connect() as conn:
+                await conn.begin()
+                for _, unit, future in batch:
+                    if future.done():
+                        continue
+                    session = AsyncSession(
+                        bind=conn,
+                        join_transaction_mode="create_savepoint",
+                        expire_on_commit=False,
+                        autoflush=False
+                    )
+                    try:
+                        result = await unit(session)
+                        await session.commit()
+                        outcomes.append((future, result, None))
+                    except Exception as exc:
+                        await session.rollback()
+                        outcomes.append((future, None, exc))
+                    finally:
+                        await session.close()
+                await conn.commit()
+        except Exception as exc:
+            # Connect/BEGIN/commit failures leave no unit committed, including
+            # the units that never got to run
+            outcomes = [(future, None, exc) for _, _, future in batch]
+        
+        self.batches += 1
+        self.units += len(outcomes)
+        for future, result, exc in outcomes:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+write_queue = WriteQueue(
+    window_ms=settings.WRITE_QUEUE_WINDOW_MS,
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH
+)
+
+
+class QueuedCommitSession(AsyncSession):
+    """Request session whose commits take a turn on the write queue."""
+    
+    async def commit(self) -> None:
+        if self.new or self.dirty or self.deleted:
+            await write_queue.run_exclusive(super().commit)
+        else:
+            await super().commit()
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=QueuedCommitSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
 )
 
+# Read-only sessions on the reader pool; never committed
+ReadSessionLocal = async_sessionmaker(
+    reader_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+# Sessions on the writer connection, used when the write queue is not running
+writer_session_factory = async_sessionmaker(
+    writer_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -39,7 +323,53 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Dependency to get a read-only session for GET routes.
+    
+    The session reads from one deferred transaction on a reader connection
+    and is rolled back on close - it is never committed.
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def run_in_read_session(func: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    """Run ``func(session)`` on its own read-only session.
+    
+    Lets independent read queries of one request run concurrently on
+    separate reader connections, e.g. with ``asyncio.gather``.
+    """
+    async with ReadSessionLocal() as session:
+        return await func(session)
+
+
+def create_missing_columns(sync_conn):
+    """Add nullable columns added to models after their tables already existed."""
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            )
+
+
+def create_missing_indexes(sync_conn):
+    """Create indexes added to models after their tables already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(create_missing_indexes)
@@ -0,0 +1,167 @@
+"""Text and metadata extraction from uploaded files.
+
+Runs inside the extraction worker processes. It lives at the top level
+rather than in ``utils``: importing any module of that package in a
+worker runs ``utils/__init__``, which loads auth, the database engines
+and every model. Only the standard library is imported here; parsers
+are imported on first use of their format.
+
+Text is collected only up to a character limit, and spreadsheets are
+read in openpyxl's read-only mode, which streams rows instead of loading
+the whole workbook, so memory stays bounded however large the file is.
+"""
+import mimetypes
+import os
+import re
+import signal
+import zipfile
+from typing import Callable, Dict, Optional
+
+
+class _TextBuffer:
+    """Text pieces collected up to ``max_chars`` characters."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self.truncated = False
+
+    def add(self, text: str, separator: str = "\n") -> bool:
+        """Append ``text``; False once input had to be dropped.
+
+        Text that exactly fills the buffer is not truncation; the next
+        non-empty piece is.
+        """
+        if not text:
+            return not self.truncated
+        if self.parts:
+            text = separator + text
+        room = self.max_chars - self.size
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        if text:
+            self.parts.append(text)
+            self.size += len(text)
+        return not self.truncated
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _docx_page_count(path: str) -> Optional[int]:
+    """Page count saved by the authoring application in docProps/app.xml."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            app = archive.read("docProps/app.xml").decode("utf-8", "replace")
+    except (KeyError, zipfile.BadZipFile):
+        return None
+    match = re.search(r"<Pages>(\d+)</Pages>", app)
+    return int(match.group(1)) if match else None
+
+
+def _extract_docx(path: str, buffer: _TextBuffer) -> dict:
+    import docx
+
+    document = docx.Document(path)
+    for paragraph in document.paragraphs:
+        if not buffer.add(paragraph.text):
+            break
+    for table in document.tables:
+        if buffer.truncated:
+            break
+        for row in table.rows:
+            if not buffer.add(" | ".join(cell.text for cell in row.cells)):
+                break
+    return {"page_count": _docx_page_count(path)}
+
+
+def _extract_xlsx(path: str, buffer: _TextBuffer) -> dict:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet_count = len(workbook.sheetnames)
+        for worksheet in workbook.worksheets:
+            if not buffer.add(f"[{worksheet.title}]"):
+                break
+            for row in worksheet.iter_rows(values_only=True):
+                cells = [str(value) for value in row if value is not None]
+                if cells and not buffer.add(" | ".join(cells)):
+                    break
+            if buffer.truncated:
+                break
+    finally:
+        # Read-only workbooks keep the file open until closed
+        workbook.close()
+    return {"sheet_count": sheet_count}
+
+
+def _extract_pdf(path: str, buffer: _TextBuffer) -> dict:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page in reader.pages:
+        if not buffer.add(page.extract_text() or ""):
+            break
+    return {"page_count": len(reader.pages)}
+
+
+def _extract_text(path: str, buffer: _TextBuffer) -> dict:
+    with open(path, "r", encoding="utf-8", errors="replace") as handle:
+        while True:
+            chunk = handle.read(64 * 1024)
+            if not chunk or not buffer.add(chunk, separator=""):
+                break
+    return {}
+
+
+def init_worker() -> None:
+    """Initializer of the extraction worker processes.
+
+    Ctrl+C reaches the whole process group; the parent shuts the pool
+    down, so workers ignore it instead of dying mid-task with a traceback.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+EXTRACTORS: Dict[str, Callable[[str, _TextBuffer], dict]] = {
+    ".docx": _extract_docx,
+    ".xlsx": _extract_xlsx,
+    ".xlsm": _extract_xlsx,
+    ".pdf": _extract_pdf,
+}
+
+
+def _extractor(filename: str) -> Optional[Callable[[str, _TextBuffer], dict]]:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in EXTRACTORS:
+        return EXTRACTORS[extension]
+    media_type = mimetypes.guess_type(filename or "")[0] or ""
+    return _extract_text if media_type.startswith("text/") else None
+
+
+def is_supported(filename: str) -> bool:
+    """Whether text can be extracted from files named like ``filename``."""
+    return _extractor(filename) is not None
+
+
+def extract(path: str, filename: str, max_chars: int) -> dict:
+    """Extract text and page/sheet counts from the file at ``path``.
+
+    The format is taken from ``filename`` (stored blobs have no extension).
+    Returns ``text``, ``truncated``, ``page_count`` and ``sheet_count``;
+    parser errors propagate to the caller.
+    """
+    extractor = _extractor(filename)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {filename}")
+    buffer = _TextBuffer(max_chars)
+    metadata = extractor(path, buffer)
+    return {
+        "text": buffer.text(),
+        "truncated": buffer.truncated,
+        "page_count": metadata.get("page_count"),
+        "sheet_count": metadata.get("sheet_count"),
+    }
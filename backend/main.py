@@ -3,6 +3,7 @@ Medical Device QMS-ERP System
 Main FastAPI Application Entry Point
 """
 print("DEBUG: main.py is loading...")
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,9 +13,19 @@ from pathlib import Path
 from sqlalchemy import select
 
 from config import settings
-from database import init_db, AsyncSessionLocal
+from database import init_db, AsyncSessionLocal, write_queue
 from models import User
 from seed import seed_data
+from utils.permissions import permission_registry
+from utils.hashing import hashing_service
+from utils.auth import calibrate_bcrypt_rounds, set_bcrypt_rounds
+from utils.revocation import revocation_list
+from utils.kpi_counters import reconcile_kpi_counters, run_reconciliation
+from utils.nc_rollup import reconcile_nc_rollup
+from utils.kpi_stream import kpi_broadcaster
+from utils.blobs import collect_garbage
+from utils.search import reconcile_search_index
+from utils.extraction import extraction_pipeline
 
 # Import routers
 from routers.auth import router as auth_router
@@ -37,6 +48,7 @@ from routers.purchase import router as purchase_router
 from routers.store import router as store_router
 from routers.mr import router as mr_router
 from routers.qc_extended import router as qc_extended_router
+from routers.system import router as system_router
 
 
 @asynccontextmanager
@@ -58,9 +70,50 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 print(f"Error seeding database: {e}")
     
+    await permission_registry.reload()
+    print("Permission registry loaded")
+    
+    await revocation_list.load()
+    print(f"Token revocation list loaded ({len(revocation_list)} entries)")
+    
+    if settings.BCRYPT_TARGET_MS > 0:
+        rounds = await hashing_service.run(calibrate_bcrypt_rounds, settings.BCRYPT_TARGET_MS)
+        set_bcrypt_rounds(rounds)
+        print(f"bcrypt cost calibrated to {rounds} rounds (target {settings.BCRYPT_TARGET_MS} ms)")
+    
+    write_queue.start()
+    print("Write queue started")
+    
+    reconcile_jobs = {
+        "KPI counters": reconcile_kpi_counters,
+        "NC daily rollup": reconcile_nc_rollup,
+        "Blob store": collect_garbage,
+        "Search index": reconcile_search_index,
+    }
+    for name, job in reconcile_jobs.items():
+        changed = await job()
+        print(f"{name} reconciled ({changed} corrected)")
+    reconciler = None
+    if settings.KPI_RECONCILE_INTERVAL_SECONDS > 0:
+        reconciler = asyncio.create_task(
+            run_reconciliation(settings.KPI_RECONCILE_INTERVAL_SECONDS, reconcile_jobs)
+        )
+    
+    kpi_broadcaster.start()
+    print(f"KPI stream started ({len(kpi_broadcaster.sources)} sources)")
+    
+    pending = await extraction_pipeline.start()
+    print(f"Text extraction started ({pending} pending)")
+    
     yield
     # Shutdown
     print("Shutting down...")
+    await kpi_broadcaster.stop()
+    await extraction_pipeline.stop()
+    if reconciler:
+        reconciler.cancel()
+    await write_queue.stop()
+    hashing_service.shutdown()
 
 
 
@@ -99,6 +152,7 @@ app = FastAPI(
         {"name": "Items", "description": "Item master and BOM management"},
         {"name": "Work Orders", "description": "Manufacturing work orders"},
         {"name": "Dashboard", "description": "KPIs and analytics"},
+        {"name": "System", "description": "Runtime configuration and diagnostics"},
     ],
     lifespan=lifespan,
 )
@@ -142,6 +196,7 @@ app.include_router(purchase_router)
 app.include_router(store_router)
 app.include_router(mr_router)
 app.include_router(qc_extended_router)
+app.include_router(system_router)
 
 
 @app.get("/api", tags=["Root"])
@@ -1,8 +1,10 @@
 """Models package - Import all models for easy access."""
-from models.user import User, Role, AuditLog
-from models.document import Document, DocumentVersion
+from models.user import User, Role, AuditLog, RevokedToken, SequenceCounter, KPICounter
+from models.document import (
+    Document, DocumentVersion, DocumentExtraction, DocumentSearch, Blob
+)
 from models.training import TrainingMatrix, TrainingRecord
-from models.quality import Nonconformance, CAPARecord, EffectivenessCheck, Audit, AuditFinding
+from models.quality import Nonconformance, NCDailyRollup, CAPARecord, EffectivenessCheck, Audit, AuditFinding
 from models.manufacturing import Item, BillOfMaterial, Routing, WorkOrder, WorkOrderOperation
 from models.inventory import (
     InspectionPlan, TestSpecification, InspectionRecord, TestResult,
@@ -53,13 +55,13 @@ from models.qc_extended import (
 
 __all__ = [
     # User & Auth
-    "User", "Role", "AuditLog",
+    "User", "Role", "AuditLog", "RevokedToken", "SequenceCounter", "KPICounter",
     # Documents
-    "Document", "DocumentVersion",
+    "Document", "DocumentVersion", "DocumentExtraction", "DocumentSearch", "Blob",
     # Training
     "TrainingMatrix", "TrainingRecord",
     # Quality
-    "Nonconformance", "CAPARecord", "EffectivenessCheck", "Audit", "AuditFinding",
+    "Nonconformance", "NCDailyRollup", "CAPARecord", "EffectivenessCheck", "Audit", "AuditFinding",
     # Manufacturing
     "Item", "BillOfMaterial", "Routing", "WorkOrder", "WorkOrderOperation",
     # QC & Inventory
@@ -1,7 +1,7 @@
 """SQLAlchemy models for Document Management."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -13,6 +13,9 @@ def generate_uuid():
 class Document(Base):
     """Document model for document management."""
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     doc_number = Column(String(50), unique=True, nullable=False)
@@ -37,15 +40,65 @@ class Document(Base):
 class DocumentVersion(Base):
     """Document version for version control."""
     __tablename__ = "document_versions"
+    __table_args__ = (
+        Index("ix_document_versions_document_id_revision", "document_id", "revision_number"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     document_id = Column(String(36), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     revision_number = Column(Integer, nullable=False)
     file_url = Column(String(500))
     file_name = Column(String(255))
+    file_size = Column(Integer)
+    sha256 = Column(String(64))  # hex digest of the stored file
     change_summary = Column(Text)
     created_by = Column(String(36), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     document = relationship("Document", back_populates="versions")
+
+
+class DocumentExtraction(Base):
+    """Text and metadata extracted in the background from a version's file."""
+    __tablename__ = "document_extractions"
+    __table_args__ = (
+        Index("ix_document_extractions_status", "status"),
+    )
+    
+    version_id = Column(
+        String(36), ForeignKey("document_versions.id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String(20), nullable=False, default="pending")  # pending, done, unsupported, failed
+    text = Column(Text)
+    truncated = Column(Boolean, default=False)  # text cut at SEARCH_CONTENT_MAX_CHARS
+    page_count = Column(Integer)  # PDF pages; DOCX pages as saved by the editor
+    sheet_count = Column(Integer)  # XLSX worksheets
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    extracted_at = Column(DateTime)
+
+
+class DocumentSearch(Base):
+    """Searchable text of a document; indexed by the ``document_search_fts`` FTS5 table."""
+    __tablename__ = "document_search"
+    
+    id = Column(Integer, primary_key=True)  # rowid of the FTS5 entry
+    document_id = Column(
+        String(36), ForeignKey("documents.id", ondelete="CASCADE"), unique=True, nullable=False
+    )
+    doc_number = Column(String(50))
+    title = Column(String(255))
+    description = Column(Text)
+    content = Column(Text)  # text of the latest uploaded file
+
+
+class Blob(Base):
+    """Content-addressed upload file, shared by every version with the same bytes."""
+    __tablename__ = "blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # DocumentVersion.file_url references
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
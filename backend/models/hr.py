@@ -1,7 +1,7 @@
 """HR Department Models - Personnel, Training, Competency"""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, JSON, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -11,6 +11,9 @@ def generate_uuid():
 class Employee(Base):
     """Employee/Personnel Information"""
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     employee_code = Column(String(50), unique=True, nullable=False)
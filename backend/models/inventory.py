@@ -1,7 +1,7 @@
 """SQLAlchemy models for Quality Control and Inventory."""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Text, Numeric
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Text, Numeric, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -15,6 +15,9 @@ def generate_uuid():
 class InspectionPlan(Base):
     """Inspection plans for items."""
     __tablename__ = "inspection_plans"
+    __table_args__ = (
+        Index("ix_inspection_plans_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
@@ -55,6 +58,10 @@ class TestSpecification(Base):
 class InspectionRecord(Base):
     """Inspection records for work orders."""
     __tablename__ = "inspection_records"
+    __table_args__ = (
+        Index("ix_inspection_records_inspection_date_id", "inspection_date", "id"),
+        Index("ix_inspection_records_status", "status"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     work_order_id = Column(String(36), ForeignKey("work_orders.id"), nullable=False)
@@ -99,6 +106,9 @@ class TestResult(Base):
 class Inventory(Base):
     """Inventory levels by location."""
     __tablename__ = "inventory"
+    __table_args__ = (
+        Index("ix_inventory_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
@@ -118,6 +128,9 @@ class Inventory(Base):
 class LotTracking(Base):
     """Lot tracking for items."""
     __tablename__ = "lot_tracking"
+    __table_args__ = (
+        Index("ix_lot_tracking_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
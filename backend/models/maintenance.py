@@ -1,7 +1,7 @@
 """Maintenance Department Models"""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -30,6 +30,9 @@ class CleaningRecord(Base):
 class Equipment(Base):
     """Equipment/Machine Master (M88-M95)"""
     __tablename__ = "equipment"
+    __table_args__ = (
+        Index("ix_equipment_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     equipment_id = Column(String(50), unique=True, nullable=False)  # M89
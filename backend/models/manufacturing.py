@@ -1,7 +1,7 @@
 """SQLAlchemy models for Manufacturing (Items, BOM, Routing, Work Orders)."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Numeric
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Numeric, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -39,6 +39,9 @@ class Item(Base):
 class BillOfMaterial(Base):
     """Bill of Materials for products."""
     __tablename__ = "bill_of_materials"
+    __table_args__ = (
+        Index("ix_bill_of_materials_parent_item_id_sequence", "parent_item_id", "sequence"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     parent_item_id = Column(String(36), ForeignKey("items.id"), nullable=False)
@@ -77,6 +80,10 @@ class Routing(Base):
 class WorkOrder(Base):
     """Production work orders."""
     __tablename__ = "work_orders"
+    __table_args__ = (
+        Index("ix_work_orders_created_at_id", "created_at", "id"),
+        Index("ix_work_orders_status", "status"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     work_order_number = Column(String(50), unique=True, nullable=False)
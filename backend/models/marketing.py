@@ -1,7 +1,7 @@
 """Marketing Department Models"""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, Numeric
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, Numeric, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -12,6 +12,9 @@ def generate_uuid():
 class Customer(Base):
     """Customer Master"""
     __tablename__ = "customers"
+    __table_args__ = (
+        Index("ix_customers_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     customer_code = Column(String(50), unique=True, nullable=False)
@@ -1,7 +1,7 @@
 """Purchase Department Models"""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, Numeric
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Text, Integer, Float, Numeric, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -12,6 +12,9 @@ def generate_uuid():
 class Vendor(Base):
     """Vendor Registration (P10-P55)"""
     __tablename__ = "vendors"
+    __table_args__ = (
+        Index("ix_vendors_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     vendor_code = Column(String(50), unique=True, nullable=False)
@@ -1,7 +1,7 @@
 """SQLAlchemy models for Quality Management (NC, CAPA, Audits)."""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -13,6 +13,10 @@ def generate_uuid():
 class Nonconformance(Base):
     """Nonconformance records."""
     __tablename__ = "nonconformances"
+    __table_args__ = (
+        Index("ix_nonconformances_created_at_id", "created_at", "id"),
+        Index("ix_nonconformances_status", "status"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     nc_number = Column(String(50), unique=True, nullable=False)
@@ -39,9 +43,28 @@ class Nonconformance(Base):
     capa_records = relationship("CAPARecord", back_populates="nonconformance")
 
 
+class NCDailyRollup(Base):
+    """NCs created per day and dimension combination, maintained on flush.
+
+    Unset dimensions are stored as "" so they can be part of the key; the
+    key leads with ``day`` so trend queries are a primary-key range scan.
+    """
+    __tablename__ = "nc_daily_rollup"
+    
+    day = Column(Date, primary_key=True)
+    severity = Column(String(20), primary_key=True, default="")
+    source = Column(String(100), primary_key=True, default="")
+    root_cause_category = Column(String(100), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+
 class CAPARecord(Base):
     """Corrective and Preventive Action records."""
     __tablename__ = "capa_records"
+    __table_args__ = (
+        Index("ix_capa_records_created_at_id", "created_at", "id"),
+        Index("ix_capa_records_status", "status"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     capa_number = Column(String(50), unique=True, nullable=False)
@@ -87,6 +110,9 @@ class EffectivenessCheck(Base):
 class Audit(Base):
     """Audit records."""
     __tablename__ = "audits"
+    __table_args__ = (
+        Index("ix_audits_start_date_id", "start_date", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     audit_number = Column(String(50), unique=True, nullable=False)
@@ -112,6 +138,9 @@ class Audit(Base):
 class AuditFinding(Base):
     """Audit findings."""
     __tablename__ = "audit_findings"
+    __table_args__ = (
+        Index("ix_audit_findings_status", "status"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     audit_id = Column(String(36), ForeignKey("audits.id", ondelete="CASCADE"), nullable=False)
@@ -1,7 +1,7 @@
 """SQLAlchemy models for Training and Competency."""
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -31,6 +31,9 @@ class TrainingMatrix(Base):
 class TrainingRecord(Base):
     """Training records for employees."""
     __tablename__ = "training_records"
+    __table_args__ = (
+        Index("ix_training_records_expiry_date", "expiry_date"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     employee_id = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -1,7 +1,7 @@
 """SQLAlchemy models for Users and Roles."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, JSON, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
@@ -29,6 +29,9 @@ class Role(Base):
 class User(Base):
     """User model for authentication and authorization."""
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -60,6 +63,9 @@ class User(Base):
 class AuditLog(Base):
     """Audit log for tracking all system changes."""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -73,3 +79,33 @@ class AuditLog(Base):
     
     # Relationships
     user = relationship("User", back_populates="audit_logs")
+
+
+class RevokedToken(Base):
+    """Revoked JWT ids (logout, refresh-token rotation)."""
+    __tablename__ = "revoked_tokens"
+    
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id"), index=True)
+    token_type = Column(String(20))  # access, refresh
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SequenceCounter(Base):
+    """High-water mark of allocated record numbers per scope (e.g. NC-2026)."""
+    __tablename__ = "sequence_counters"
+    
+    scope = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class KPICounter(Base):
+    """Live row count per (entity, status), maintained on flush."""
+    __tablename__ = "kpi_counters"
+    
+    entity = Column(String(50), primary_key=True)
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
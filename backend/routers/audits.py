@@ -1,48 +1,50 @@
 """Audits router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
-from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Audit, AuditFinding, User
 from schemas import (
     AuditCreate, AuditUpdate, AuditResponse,
     AuditFindingCreate, AuditFindingResponse
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
 
 
 router = APIRouter(prefix="/api/audits", tags=["Audits"])
 
 
-def generate_audit_number(count: int) -> str:
+async def generate_audit_number() -> str:
     """Generate audit number."""
-    year = datetime.now().year
-    return f"AUD-{year}-{count + 1:04d}"
+    return await sequence_service.next_number("AUD", Audit.audit_number)
 
 
 @router.get("", response_model=List[AuditResponse])
 async def get_audits(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     audit_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all audits."""
-    query = select(Audit).order_by(Audit.start_date.desc())
+    query = select(Audit)
     
     if status:
         query = query.where(Audit.status == status)
     if audit_type:
         query = query.where(Audit.audit_type == audit_type)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Audit.start_date, Audit.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "start_date")
 
 
 @router.post("", response_model=AuditResponse, status_code=status.HTTP_201_CREATED)
@@ -52,11 +54,8 @@ async def create_audit(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new audit."""
-    result = await db.execute(select(func.count(Audit.id)))
-    count = result.scalar() or 0
-    
     audit = Audit(
-        audit_number=generate_audit_number(count),
+        audit_number=await generate_audit_number(),
         **audit_data.model_dump()
     )
     db.add(audit)
@@ -69,7 +68,7 @@ async def create_audit(
 @router.get("/{audit_id}", response_model=AuditResponse)
 async def get_audit(
     audit_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific audit."""
@@ -108,7 +107,7 @@ async def update_audit(
 @router.get("/{audit_id}/findings", response_model=List[AuditFindingResponse])
 async def get_audit_findings(
     audit_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get findings for an audit."""
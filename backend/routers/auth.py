@@ -1,25 +1,81 @@
 """Authentication router."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from datetime import timedelta
+from typing import Optional
+from datetime import datetime, timedelta
 import traceback
 
-from database import get_db
+from database import get_db, AsyncSessionLocal
 from models import User, Role
-from schemas import Token, LoginRequest, UserCreate, UserResponse, ChangePasswordRequest
+from schemas import (
+    Token, LoginRequest, UserCreate, UserResponse, ChangePasswordRequest,
+    RefreshRequest, LogoutRequest
+)
 from utils.auth import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_user, get_current_active_user
+    verify_password_async, get_password_hash_async, create_access_token,
+    create_refresh_token, decode_token, oauth2_scheme,
+    get_current_user, get_current_active_user, invalidate_principal,
+    password_needs_rehash
 )
+from utils.hashing import hashing_service
+from utils.revocation import revocation_list
 from config import settings
 
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def issue_tokens(user: User) -> dict:
+    """Create a fresh access/refresh token pair for a user."""
+    access_token = create_access_token(
+        data={"sub": user.id, "username": user.username, "role_id": user.role_id}
+    )
+    refresh_token = create_refresh_token(data={"sub": user.id})
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+async def revoke_payload(db: AsyncSession, payload: dict) -> bool:
+    """Revoke the token described by a decoded JWT payload.
+
+    Returns False if it was already revoked.
+    """
+    if not payload.get("jti"):
+        return False
+    return await revocation_list.revoke(
+        db,
+        jti=payload["jti"],
+        expires_at=datetime.utcfromtimestamp(payload["exp"]),
+        user_id=payload.get("sub"),
+        token_type=payload.get("type", "access")
+    )
+
+
+async def rehash_password(user_id: str, old_hash: str, password: str):
+    """Re-hash a password with the active bcrypt cost after a successful login."""
+    try:
+        new_hash = await get_password_hash_async(password)
+    except HTTPException:
+        # Hashing pool saturated - try again on the next login
+        return
+    
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        # Skip if the password changed while we were hashing
+        if user is None or user.password_hash != old_hash:
+            return
+        user.password_hash = new_hash
+        await db.commit()
+    invalidate_principal(user_id)
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
@@ -42,7 +98,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=user_data.email,
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         department=user_data.department,
@@ -62,7 +118,11 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     """Login and get access token."""
     print(f"LOGIN ATTEMPT: username={form_data.username}")
     try:
@@ -79,7 +139,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if not verify_password(form_data.password, user.password_hash):
+        if not await verify_password_async(form_data.password, user.password_hash):
             print(f"LOGIN FAILED: Invalid password")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,12 +152,15 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
             print(f"LOGIN FAILED: Inactive user")
             raise HTTPException(status_code=400, detail="Inactive user")
         
-        access_token = create_access_token(
-            data={"sub": user.id, "username": user.username, "role_id": user.role_id}
-        )
+        if password_needs_rehash(user.password_hash):
+            background_tasks.add_task(
+                rehash_password, user.id, user.password_hash, form_data.password
+            )
+        
+        tokens = issue_tokens(user)
         
         print(f"LOGIN SUCCESS: {user.username}")
-        return {"access_token": access_token, "token_type": "bearer"}
+        return tokens
     except HTTPException:
         raise
     except Exception as e:
@@ -119,16 +182,66 @@ async def change_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Change user password."""
-    if not verify_password(data.current_password, current_user.password_hash):
+    if not await verify_password_async(data.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    current_user.password_hash = get_password_hash(data.new_password)
+    # current_user may be a cached, detached instance - update the live row
+    user = await db.get(User, current_user.id)
+    user.password_hash = await get_password_hash_async(data.new_password)
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Password changed successfully"}
 
 
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new token pair; the old one is revoked."""
+    payload = decode_token(data.refresh_token, token_type="refresh")
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user = await db.get(User, payload["sub"])
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Refresh tokens are single use; of two requests with the same token
+    # only the first gets a new pair
+    if not await revoke_payload(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return issue_tokens(user)
+
+
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
-    """Logout (client should discard token)."""
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Logout by revoking the access token and, if given, the refresh token."""
+    await revoke_payload(db, decode_token(token))
+    if data and data.refresh_token:
+        payload = decode_token(data.refresh_token, token_type="refresh")
+        if payload and payload["sub"] == current_user.id:
+            await revoke_payload(db, payload)
+    
     return {"message": "Logged out successfully"}
+
+
+@router.get("/hashing-stats")
+async def get_hashing_stats(current_user: User = Depends(get_current_active_user)):
+    """Password hashing pool queue depth and counters."""
+    return hashing_service.stats()
@@ -1,180 +1,290 @@
 """Dashboard router with KPIs and analytics."""
-from fastapi import APIRouter, Depends
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, literal, union_all
+from datetime import date, datetime
+from typing import List, Optional
 
-from database import get_db
+from database import get_read_db, run_in_read_session
 from models import (
-    User, Nonconformance, CAPARecord, Audit, AuditFinding,
-    WorkOrder, TrainingRecord, InspectionRecord
+    User, Nonconformance, CAPARecord, TrainingRecord, KPICounter, NCDailyRollup
 )
 from schemas import DashboardResponse, KPIData, ChartData
-from utils.auth import get_current_user
+from utils.auth import create_stream_token, get_current_user, get_stream_user
+from utils.kpi_counters import read_kpi_counts, kpi_total
+from utils.nc_rollup import (
+    GRANULARITIES, bucket_start, shift_bucket, bucket_label, bucket_count, load_trend
+)
+from utils.kpi_stream import kpi_broadcaster, sse_events
+from routers.hr import HR_STATS_MODELS, load_hr_stats
+from routers.maintenance import MAINTENANCE_STATS_MODELS, load_maintenance_stats
+from routers.marketing import MARKETING_STATS_MODELS, load_marketing_stats
+from routers.mr import MR_STATS_MODELS, load_mr_stats
+from routers.purchase import PURCHASE_STATS_MODELS, load_purchase_stats
+from routers.qc_extended import QC_EXTENDED_STATS_MODELS, load_qc_extended_stats
+from routers.store import STORE_STATS_MODELS, load_store_stats
+from utils.table_versions import versioned_response
+from config import settings
 
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+NC_TREND_MONTHS = 6
+NC_TREND_DEFAULT_BUCKETS = 12
+NC_TREND_MAX_BUCKETS = 2000
+OPEN_NC_STATUSES = ["Open", "Under Investigation", "Pending Disposition"]
+OPEN_CAPA_STATUSES = ["Open", "In Progress", "Pending Verification"]
+OPEN_WORK_ORDER_STATUSES = ["Planned", "Released", "In Progress"]
 
-@router.get("", response_model=DashboardResponse)
-async def get_dashboard(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get dashboard KPIs and analytics data."""
-    # Get open NCs
-    nc_result = await db.execute(
-        select(func.count(Nonconformance.id)).where(
-            Nonconformance.status.in_(["Open", "Under Investigation", "Pending Disposition"])
-        )
-    )
-    open_ncs = nc_result.scalar() or 0
-    
-    # Get open CAPAs
-    capa_result = await db.execute(
-        select(func.count(CAPARecord.id)).where(
-            CAPARecord.status.in_(["Open", "In Progress", "Pending Verification"])
+# Department -> (tables read, loader) behind each /api/<department>/stats
+DEPARTMENT_STATS = {
+    "hr": (HR_STATS_MODELS, load_hr_stats),
+    "mr": (MR_STATS_MODELS, load_mr_stats),
+    "store": (STORE_STATS_MODELS, load_store_stats),
+    "purchase": (PURCHASE_STATS_MODELS, load_purchase_stats),
+    "maintenance": (MAINTENANCE_STATS_MODELS, load_maintenance_stats),
+    "qc_extended": (QC_EXTENDED_STATS_MODELS, load_qc_extended_stats),
+    "marketing": (MARKETING_STATS_MODELS, load_marketing_stats),
+}
+
+# Tables read by build_dashboard (the counters and rollup change with them)
+DASHBOARD_MODELS = [
+    KPICounter, NCDailyRollup, TrainingRecord, Nonconformance, CAPARecord
+]
+
+
+def parse_names(value: Optional[str], known: List[str], what: str) -> List[str]:
+    """Split a comma-separated selection, defaulting to all ``known`` names."""
+    if not value:
+        return list(known)
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {what}: {', '.join(unknown)}")
+    return names
+
+
+async def load_kpis(db: AsyncSession) -> KPIData:
+    """Dashboard KPIs from kpi_counters, plus the date-based training count."""
+    counts = await read_kpi_counts(db)
+    # Depends on today's date, so it cannot be maintained on write
+    result = await db.execute(
+        select(func.count()).select_from(TrainingRecord).where(
+            TrainingRecord.expiry_date < datetime.utcnow().date(),
+            TrainingRecord.is_certified == True
         )
     )
-    open_capas = capa_result.scalar() or 0
-    
-    # Get open audit findings
-    finding_result = await db.execute(
-        select(func.count(AuditFinding.id)).where(
-            AuditFinding.status.in_(["Open", "In Progress"])
-        )
+    return KPIData(
+        open_ncs=kpi_total(counts, "nc", OPEN_NC_STATUSES),
+        open_capas=kpi_total(counts, "capa", OPEN_CAPA_STATUSES),
+        open_findings=kpi_total(counts, "audit_finding", ["Open", "In Progress"]),
+        overdue_trainings=result.scalar() or 0,
+        open_work_orders=kpi_total(counts, "work_order", OPEN_WORK_ORDER_STATUSES),
+        pending_inspections=kpi_total(counts, "inspection", ["Pending"])
     )
-    open_findings = finding_result.scalar() or 0
-    
-    # Get overdue trainings (simplified - records past expiry)
-    training_result = await db.execute(
-        select(func.count(TrainingRecord.id)).where(
-            and_(
-                TrainingRecord.expiry_date < datetime.utcnow().date(),
-                TrainingRecord.is_certified == True
-            )
-        )
+
+
+async def load_nc_trend(db: AsyncSession) -> ChartData:
+    """NCs created per calendar month over the trend window, from the rollup."""
+    today = datetime.utcnow().date()
+    start = shift_bucket(bucket_start(today, "month"), "month", 1 - NC_TREND_MONTHS)
+    buckets, counts = await load_trend(db, start, today, "month")
+    return ChartData(
+        labels=[bucket_label(bucket, "month") for bucket in buckets],
+        datasets=[{"label": "Nonconformances", "data": counts}]
     )
-    overdue_trainings = training_result.scalar() or 0
-    
-    # Get open work orders
-    wo_result = await db.execute(
-        select(func.count(WorkOrder.id)).where(
-            WorkOrder.status.in_(["Planned", "Released", "In Progress"])
-        )
+
+
+async def load_capa_status(db: AsyncSession) -> dict:
+    """CAPA count per status."""
+    result = await db.execute(
+        select(CAPARecord.status, func.count()).group_by(CAPARecord.status)
     )
-    open_work_orders = wo_result.scalar() or 0
-    
-    # Get pending inspections
-    insp_result = await db.execute(
-        select(func.count(InspectionRecord.id)).where(
-            InspectionRecord.status == "Pending"
+    return dict(result.all())
+
+
+async def load_recent_activity(db: AsyncSession) -> List[dict]:
+    """Latest five NCs and five CAPAs, merged newest first."""
+    recent_ncs = (
+        select(
+            literal("NC").label("type"),
+            Nonconformance.nc_number.label("number"),
+            Nonconformance.title,
+            Nonconformance.status,
+            Nonconformance.created_at.label("date")
         )
+        .order_by(Nonconformance.created_at.desc())
+        .limit(5)
+        .subquery()
     )
-    pending_inspections = insp_result.scalar() or 0
-    
-    # NC Trend (last 6 months)
-    nc_trend_labels = []
-    nc_trend_data = []
-    for i in range(5, -1, -1):
-        month_start = datetime.utcnow().replace(day=1) - timedelta(days=30 * i)
-        month_end = (month_start + timedelta(days=32)).replace(day=1)
-        nc_trend_labels.append(month_start.strftime("%b %Y"))
-        
-        count_result = await db.execute(
-            select(func.count(Nonconformance.id)).where(
-                and_(
-                    Nonconformance.created_at >= month_start,
-                    Nonconformance.created_at < month_end
-                )
-            )
+    recent_capas = (
+        select(
+            literal("CAPA").label("type"),
+            CAPARecord.capa_number.label("number"),
+            CAPARecord.title,
+            CAPARecord.status,
+            CAPARecord.created_at.label("date")
         )
-        nc_trend_data.append(count_result.scalar() or 0)
-    
-    # CAPA Status distribution
-    capa_status_result = await db.execute(
-        select(CAPARecord.status, func.count(CAPARecord.id)).group_by(CAPARecord.status)
-    )
-    capa_status = dict(capa_status_result.all())
-    
-    # Recent Activity (last 10 items)
-    recent_ncs = await db.execute(
-        select(Nonconformance).order_by(Nonconformance.created_at.desc()).limit(5)
+        .order_by(CAPARecord.created_at.desc())
+        .limit(5)
+        .subquery()
     )
-    recent_capas = await db.execute(
-        select(CAPARecord).order_by(CAPARecord.created_at.desc()).limit(5)
-    )
-    
-    recent_activity = []
-    for nc in recent_ncs.scalars().all():
-        recent_activity.append({
-            "type": "NC",
-            "number": nc.nc_number,
-            "title": nc.title,
-            "status": nc.status,
-            "date": nc.created_at.isoformat()
-        })
-    for capa in recent_capas.scalars().all():
-        recent_activity.append({
-            "type": "CAPA",
-            "number": capa.capa_number,
-            "title": capa.title,
-            "status": capa.status,
-            "date": capa.created_at.isoformat()
-        })
+    result = await db.execute(union_all(select(recent_ncs), select(recent_capas)))
     
+    recent_activity = [
+        {**row._mapping, "date": row.date.isoformat()} for row in result.all()
+    ]
     recent_activity.sort(key=lambda x: x["date"], reverse=True)
+    return recent_activity[:10]
+
+
+async def build_dashboard() -> DashboardResponse:
+    """Dashboard KPIs and analytics data.
     
+    The four parts are independent, so each runs on its own reader
+    connection concurrently.
+    """
+    kpis, nc_trend, capa_status, recent_activity = await asyncio.gather(
+        run_in_read_session(load_kpis),
+        run_in_read_session(load_nc_trend),
+        run_in_read_session(load_capa_status),
+        run_in_read_session(load_recent_activity),
+    )
     return DashboardResponse(
-        kpis=KPIData(
-            open_ncs=open_ncs,
-            open_capas=open_capas,
-            open_findings=open_findings,
-            overdue_trainings=overdue_trainings,
-            open_work_orders=open_work_orders,
-            pending_inspections=pending_inspections
-        ),
-        nc_trend=ChartData(
-            labels=nc_trend_labels,
-            datasets=[{"label": "Nonconformances", "data": nc_trend_data}]
-        ),
+        kpis=kpis,
+        nc_trend=nc_trend,
         capa_status=capa_status,
-        recent_activity=recent_activity[:10]
+        recent_activity=recent_activity
     )
 
 
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(request: Request, current_user: User = Depends(get_current_user)):
+    """Get dashboard KPIs and analytics data; 304 while its tables are unchanged."""
+    return await versioned_response(request, DASHBOARD_MODELS, build_dashboard)
+
+
+async def load_kpi_summary(db: AsyncSession) -> dict:
+    """Quick KPI summary from kpi_counters."""
+    counts = await read_kpi_counts(db)
+    return {
+        "open_ncs": kpi_total(counts, "nc", ["Open", "Under Investigation"]),
+        "open_capas": kpi_total(counts, "capa", ["Open", "In Progress"]),
+        "open_work_orders": kpi_total(counts, "work_order", OPEN_WORK_ORDER_STATUSES)
+    }
+
+
 @router.get("/kpis")
 async def get_kpis(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get quick KPI summary."""
-    # Open NCs
-    nc_result = await db.execute(
-        select(func.count(Nonconformance.id)).where(
-            Nonconformance.status.in_(["Open", "Under Investigation"])
-        )
+    """Get quick KPI summary; 304 while kpi_counters is unchanged."""
+    return await versioned_response(
+        request, [KPICounter], lambda: run_in_read_session(load_kpi_summary)
     )
-    open_ncs = nc_result.scalar() or 0
+
+
+@router.get("/nc-trend", response_model=ChartData)
+async def get_nc_trend(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: str = Query("month", pattern="^(" + "|".join(GRANULARITIES) + ")$"),
+    severity: Optional[str] = None,
+    source: Optional[str] = None,
+    root_cause_category: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """NCs created per day, week, month or quarter between ``start`` and ``end``.
     
-    # Open CAPAs
-    capa_result = await db.execute(
-        select(func.count(CAPARecord.id)).where(
-            CAPARecord.status.in_(["Open", "In Progress"])
+    Defaults to the last 12 buckets up to today. Dimension filters match
+    exactly; pass an empty string to select NCs where the field is unset.
+    """
+    end = end or datetime.utcnow().date()
+    if start is None:
+        start = shift_bucket(
+            bucket_start(end, granularity), granularity, 1 - NC_TREND_DEFAULT_BUCKETS
         )
-    )
-    open_capas = capa_result.scalar() or 0
-    
-    # Open Work Orders
-    wo_result = await db.execute(
-        select(func.count(WorkOrder.id)).where(
-            WorkOrder.status.in_(["Planned", "Released", "In Progress"])
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if bucket_count(start, end, granularity) > NC_TREND_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans more than {NC_TREND_MAX_BUCKETS} {granularity} buckets"
         )
+    
+    buckets, counts = await load_trend(
+        db, start, end, granularity,
+        {"severity": severity, "source": source, "root_cause_category": root_cause_category}
+    )
+    return ChartData(
+        labels=[bucket_label(bucket, granularity) for bucket in buckets],
+        datasets=[{
+            "label": "Nonconformances",
+            "data": counts,
+            "bucket_starts": [bucket.isoformat() for bucket in buckets]
+        }]
     )
-    open_work_orders = wo_result.scalar() or 0
+
+
+@router.get("/department-stats")
+async def get_department_stats(
+    request: Request,
+    departments: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stats of several departments in one response, keyed by department.
+    
+    ``departments`` is a comma-separated subset of hr, mr, store, purchase,
+    maintenance, qc_extended and marketing; all by default. Each department
+    runs as one statement on its own reader session, concurrently.
+    """
+    names = parse_names(departments, list(DEPARTMENT_STATS), "departments")
+    
+    async def build() -> dict:
+        results = await asyncio.gather(*(
+            run_in_read_session(DEPARTMENT_STATS[name][1]) for name in names
+        ))
+        return dict(zip(names, results))
+    
+    models = [model for name in names for model in DEPARTMENT_STATS[name][0]]
+    return await versioned_response(request, models, build)
+
+
+@router.post("/stream-token")
+async def issue_stream_token(current_user: User = Depends(get_current_user)):
+    """Short-lived token for ``GET /api/dashboard/stream?stream_token=``.
     
+    EventSource cannot send an Authorization header; this token only opens
+    streams, so one leaked through a URL log is of little use.
+    """
     return {
-        "open_ncs": open_ncs,
-        "open_capas": open_capas,
-        "open_work_orders": open_work_orders
+        "stream_token": create_stream_token(current_user.id),
+        "expires_in": settings.STREAM_TOKEN_EXPIRE_SECONDS
     }
+
+
+@router.get("/stream")
+async def stream_kpis(
+    sources: Optional[str] = None,
+    current_user: User = Depends(get_stream_user)
+):
+    """Push KPI changes as Server-Sent Events instead of polling.
+    
+    ``sources`` is a comma-separated subset of ``dashboard`` and the
+    department stats (hr, mr, store, ...); all by default. The first event
+    per source carries every field, later ones only the fields that changed.
+    """
+    names = parse_names(sources, kpi_broadcaster.sources, "KPI sources")
+    subscriber = kpi_broadcaster.subscribe(names)
+    return StreamingResponse(
+        sse_events(subscriber, settings.KPI_PUSH_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+kpi_broadcaster.register("dashboard", [KPICounter, TrainingRecord], load_kpis)
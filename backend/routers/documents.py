@@ -1,28 +1,39 @@
 """Documents router with file upload."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import Select, func, select
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
+import csv
+import hashlib
+import io
 import os
-import uuid
-import shutil
 
-from database import get_db
-from models import Document, DocumentVersion, User
-from schemas import DocumentCreate, DocumentUpdate, DocumentResponse
+from config import settings
+from database import ReadSessionLocal, get_db, get_read_db, write_queue
+from models import Document, DocumentVersion, DocumentExtraction, User
+from schemas import DocumentCreate, DocumentUpdate, DocumentResponse, DocumentSearchHit
+from utils.archives import ZipStream, safe_name
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.extraction import extraction_pipeline
+from utils.streaming import NDJSON_MEDIA_TYPE
+from utils.search import match_expression, matching_document_ids, ranked_search, render_snippet
+from utils.sequences import sequence_service
+from utils.blobs import UPLOAD_DIR, store_blob
+from utils.diffs import diff_cache, diff_texts, ndjson_lines, unified_lines
+from utils.downloads import file_download
+from utils.uploads import multipart_body, receive_upload, upload_progress
 
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
-# Upload directory
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-def generate_doc_number(doc_type: str, count: int) -> str:
+async def generate_doc_number(doc_type: str) -> str:
     """Generate document number."""
     prefix_map = {
         "SOP": "SOP",
@@ -34,32 +45,230 @@ def generate_doc_number(doc_type: str, count: int) -> str:
         "Specification": "SPEC"
     }
     prefix = prefix_map.get(doc_type, "DOC")
-    return f"{prefix}-{count + 1:04d}"
+    return await sequence_service.next_number(prefix, Document.doc_number, yearly=False)
 
 
 @router.get("", response_model=List[DocumentResponse])
 async def get_documents(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all documents with filters."""
-    query = select(Document).order_by(Document.created_at.desc())
+    query = select(Document)
     
     if document_type:
         query = query.where(Document.document_type == document_type)
     if status:
         query = query.where(Document.status == status)
-    if search:
-        query = query.where(Document.title.ilike(f"%{search}%"))
+    expression = match_expression(search) if search else None
+    if expression:
+        # Full-text match; the listing keeps its (created_at, id) order and
+        # cursors - use /search for results ranked by relevance
+        query = query.where(Document.id.in_(matching_document_ids(expression)))
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Document.created_at, Document.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
+
+
+@router.get("/search", response_model=List[DocumentSearchHit])
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    document_type: Optional[str] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search over doc number, title, description and file text.
+    
+    Results are ranked with bm25 (doc number and title weigh most) and carry
+    a snippet of the best matching field. The last word matches as a prefix,
+    as does any word ending in ``*``.
+    """
+    expression = match_expression(q)
+    if expression is None:
+        return []
+    
+    query = ranked_search(expression)
+    if document_type:
+        query = query.where(Document.document_type == document_type)
+    if status:
+        query = query.where(Document.status == status)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return [
+        DocumentSearchHit(
+            **DocumentResponse.model_validate(document).model_dump(),
+            rank=rank,
+            snippet=render_snippet(snippet)
+        )
+        for document, rank, snippet in result.all()
+    ]
+
+
+def _diff_side(version: DocumentVersion, truncated: Optional[bool]) -> dict:
+    return {
+        "version_id": version.id,
+        "document_id": version.document_id,
+        "revision_number": version.revision_number,
+        "file_name": version.file_name,
+        "sha256": version.sha256,
+        "truncated": bool(truncated),
+    }
+
+
+@router.get("/diff")
+async def diff_document_versions(
+    from_version: str,
+    to_version: str,
+    context: int = Query(3, ge=0, le=100),
+    format: str = Query("ndjson", pattern="^(ndjson|unified)$"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Line and word diff between the extracted text of two versions.
+    
+    Streams NDJSON: a header line with both versions and change counts,
+    then one line per hunk. ``format=unified`` streams a unified diff
+    instead. Diffs are cached by the content hashes of the two files.
+    """
+    result = await db.execute(
+        select(DocumentVersion, DocumentExtraction.status, DocumentExtraction.truncated)
+        .outerjoin(DocumentExtraction, DocumentExtraction.version_id == DocumentVersion.id)
+        .where(DocumentVersion.id.in_([from_version, to_version]))
+    )
+    rows = {row.DocumentVersion.id: row for row in result.all()}
+    for version_id in (from_version, to_version):
+        row = rows.get(version_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Document version {version_id} not found")
+        if row.status != "done":
+            raise HTTPException(
+                status_code=409,
+                detail=f"No extracted text for version {version_id} "
+                       f"(extraction {row.status or 'not queued'})"
+            )
+    old, new = rows[from_version], rows[to_version]
+    
+    # Legacy versions without a hash are keyed by id; their file never changes
+    key = (
+        old.DocumentVersion.sha256 or from_version,
+        new.DocumentVersion.sha256 or to_version,
+        context
+    )
+    cached = diff_cache.get(key)
+    if cached is None:
+        result = await db.execute(
+            select(DocumentExtraction.version_id, DocumentExtraction.text)
+            .where(DocumentExtraction.version_id.in_([from_version, to_version]))
+        )
+        texts = dict(result.all())
+        cached = await run_in_threadpool(
+            diff_texts, texts[from_version] or "", texts[to_version] or "", context
+        )
+        diff_cache.set(key, cached)
+    stats, hunks = cached
+    
+    if format == "unified":
+        names = [
+            f"rev{row.DocumentVersion.revision_number}/{row.DocumentVersion.file_name}"
+            for row in (old, new)
+        ]
+        return StreamingResponse(unified_lines(*names, hunks), media_type="text/plain")
+    header = {
+        "from": _diff_side(old.DocumentVersion, old.truncated),
+        "to": _diff_side(new.DocumentVersion, new.truncated),
+        "stats": stats,
+        "hunks": len(hunks),
+    }
+    return StreamingResponse(ndjson_lines(header, hunks), media_type=NDJSON_MEDIA_TYPE)
+
+
+MANIFEST_COLUMNS = [
+    "doc_number", "title", "document_type", "status", "revision",
+    "file_name", "size", "sha256", "uploaded_at", "path"
+]
+
+
+async def _export_archive(query: Select) -> AsyncIterator[bytes]:
+    archive = ZipStream()
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(MANIFEST_COLUMNS)
+    # The request's session is closed before the body is sent, so the
+    # export reads through its own session for as long as it runs
+    async with ReadSessionLocal() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.STREAM_CHUNK_ROWS)
+        )
+        async for rows in result.partitions():
+            for document, version in rows:
+                path = os.path.join(UPLOAD_DIR, version.file_url)
+                name = "/".join([
+                    safe_name(document.doc_number),
+                    f"rev{version.revision_number}",
+                    safe_name(version.file_name)
+                ])
+                sha256 = version.sha256
+                if os.path.exists(path):
+                    digest = hashlib.sha256()
+                    async for data in archive.add_file(name, path, version.created_at, digest):
+                        yield data
+                    sha256 = digest.hexdigest()
+                else:
+                    name = ""
+                writer.writerow([
+                    document.doc_number, document.title, document.document_type,
+                    document.status, version.revision_number, version.file_name,
+                    version.file_size, sha256,
+                    version.created_at.isoformat() if version.created_at else "", name
+                ])
+    yield archive.add_bytes("manifest.csv", manifest.getvalue().encode("utf-8"))
+    yield archive.close()
+
+
+@router.get("/export")
+async def export_documents(
+    document_type: Optional[str] = None,
+    status: Optional[str] = None,
+    approved_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Download the files of every revision of the matching documents as one ZIP.
+    
+    Entries are named ``<doc_number>/rev<n>/<file name>``; ``manifest.csv``
+    at the end lists each revision with the SHA-256 of the exported bytes
+    (``path`` is empty when the file is missing from storage). The archive
+    is built while it is sent, so memory stays flat however many files it
+    holds.
+    """
+    query = (
+        select(Document, DocumentVersion)
+        .join(DocumentVersion, DocumentVersion.document_id == Document.id)
+        .where(DocumentVersion.file_url.is_not(None))
+        .order_by(Document.doc_number, DocumentVersion.revision_number)
+    )
+    if document_type:
+        query = query.where(Document.document_type == document_type)
+    if status:
+        query = query.where(Document.status == status)
+    if approved_since:
+        query = query.where(Document.approved_at >= approved_since)
+    
+    filename = f"documents-{datetime.utcnow():%Y%m%d-%H%M%S}.zip"
+    return StreamingResponse(
+        _export_archive(query),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
@@ -69,14 +278,8 @@ async def create_document(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new document."""
-    # Get count for document number
-    result = await db.execute(
-        select(func.count(Document.id)).where(Document.document_type == doc_data.document_type)
-    )
-    count = result.scalar() or 0
-    
     document = Document(
-        doc_number=generate_doc_number(doc_data.document_type, count),
+        doc_number=await generate_doc_number(doc_data.document_type),
         title=doc_data.title,
         description=doc_data.description,
         document_type=doc_data.document_type,
@@ -92,7 +295,7 @@ async def create_document(
 @router.get("/{doc_id}", response_model=DocumentResponse)
 async def get_document(
     doc_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific document."""
@@ -144,60 +347,110 @@ async def delete_document(
     return {"message": "Document deleted successfully"}
 
 
-@router.post("/{doc_id}/upload")
+@router.post("/{doc_id}/upload", openapi_extra=multipart_body())
 async def upload_document_file(
     doc_id: str,
-    file: UploadFile = File(...),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    upload_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Upload a file to a document."""
-    result = await db.execute(select(Document).where(Document.id == doc_id))
-    document = result.scalar_one_or_none()
-    if not document:
+    """Upload a file to a document (multipart form field ``file``).
+    
+    The body is streamed to disk in chunks and hashed on the way; files over
+    ``UPLOAD_MAX_BYTES`` are rejected with 413. Pass ``upload_id`` to follow
+    progress at ``GET /api/documents/uploads/{upload_id}``. Content already
+    in the blob store is not stored again. Text is extracted afterwards in
+    the background; see ``GET /api/documents/{doc_id}/versions/{version_id}/text``.
+    """
+    result = await db.execute(select(Document.id).where(Document.id == doc_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Document not found")
+    # End the read transaction (shared with the user lookup) so no reader
+    # connection or WAL snapshot is held while the body streams in; the
+    # write unit checks the document again
+    await db.close()
     
-    # Generate unique filename
-    file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{doc_id}_{uuid.uuid4().hex}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Create document version
-    version = DocumentVersion(
-        document_id=doc_id,
-        revision_number=document.current_revision,
-        file_url=unique_filename,
-        file_name=file.filename,
-        change_summary="File uploaded",
-        created_by=current_user.id
-    )
-    db.add(version)
+    received = await receive_upload(request, UPLOAD_DIR, upload_id=upload_id)
     
-    # Update document revision
-    document.current_revision += 1
-    await db.commit()
+    async def unit(session: AsyncSession):
+        document = await session.get(Document, doc_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        file_url = await store_blob(session, received.temp_path, received.sha256, received.size)
+        version = DocumentVersion(
+            document_id=doc_id,
+            revision_number=document.current_revision,
+            file_url=file_url,
+            file_name=received.filename,
+            file_size=received.size,
+            sha256=received.sha256,
+            change_summary="File uploaded",
+            created_by=current_user.id
+        )
+        session.add(version)
+        document.current_revision += 1
+        await session.flush()
+        session.add(DocumentExtraction(version_id=version.id))
+        await session.flush()
+        return version.id
+    
+    try:
+        version_id = await write_queue.submit(unit)
+    finally:
+        # Consumed by store_blob unless the unit failed before reaching it
+        if os.path.exists(received.temp_path):
+            await run_in_threadpool(os.remove, received.temp_path)
     
-    return {"message": "File uploaded successfully", "filename": file.filename}
+    # Text is extracted in the background and indexed for search when ready
+    extraction_pipeline.enqueue(version_id)
+    
+    if upload_id:
+        progress = upload_progress.get(upload_id)
+        if progress is not None:
+            progress["state"] = "stored"
+    return {
+        "message": "File uploaded successfully",
+        "filename": received.filename,
+        "size": received.size,
+        "sha256": received.sha256
+    }
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_progress(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Bytes received so far for an upload started with ``upload_id``."""
+    progress = upload_progress.get(upload_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return progress
 
 
 @router.get("/{doc_id}/download")
+# HEAD shares the GET operation in the schema
+@router.head("/{doc_id}/download", include_in_schema=False)
 async def download_document_file(
     doc_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Download the latest version of a document."""
-    # Get latest version
+    """Download the latest version of a document.
+    
+    Supports If-None-Match/If-Modified-Since (304) and single byte ranges
+    (206, with If-Range) so interrupted downloads can resume.
+    """
+    # Latest version: one row from the (document_id, revision_number) index
     result = await db.execute(
         select(DocumentVersion)
         .where(DocumentVersion.document_id == doc_id)
         .order_by(DocumentVersion.revision_number.desc())
+        .limit(1)
     )
-    version = result.scalars().first()
+    version = result.scalar_one_or_none()
     
     if not version or not version.file_url:
         raise HTTPException(status_code=404, detail="No file found for this document")
@@ -206,10 +459,18 @@ async def download_document_file(
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found on server")
     
-    return FileResponse(
+    if version.sha256:
+        etag = f'"{version.sha256}"'
+    else:
+        # Files stored before hashes were recorded
+        stat = os.stat(file_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return file_download(
+        request,
         path=file_path,
-        filename=version.file_name,
-        media_type="application/octet-stream"
+        filename=version.file_name or os.path.basename(version.file_url),
+        etag=etag,
+        last_modified=version.created_at or datetime.utcnow()
     )
 
 
@@ -238,7 +499,7 @@ async def approve_document(
 @router.get("/{doc_id}/versions")
 async def get_document_versions(
     doc_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get document versions."""
@@ -249,3 +510,34 @@ async def get_document_versions(
     )
     return result.scalars().all()
 
+
+@router.get("/{doc_id}/versions/{version_id}/text")
+async def get_document_version_text(
+    doc_id: str,
+    version_id: str,
+    max_chars: int = Query(5000, ge=0, le=settings.SEARCH_CONTENT_MAX_CHARS),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Extracted text (first ``max_chars`` characters) and metadata of a version.
+    
+    ``status`` is ``pending`` until the background extraction has run.
+    """
+    result = await db.execute(
+        select(
+            DocumentExtraction.status,
+            DocumentExtraction.page_count,
+            DocumentExtraction.sheet_count,
+            DocumentExtraction.truncated,
+            DocumentExtraction.error,
+            DocumentExtraction.extracted_at,
+            func.length(DocumentExtraction.text).label("length"),
+            func.substr(DocumentExtraction.text, 1, max_chars).label("text"),
+        )
+        .join(DocumentVersion, DocumentVersion.id == DocumentExtraction.version_id)
+        .where(DocumentVersion.id == version_id, DocumentVersion.document_id == doc_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="No extracted text for this version")
+    return dict(row._mapping)
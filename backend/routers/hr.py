@@ -1,18 +1,24 @@
 """HR Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.hr import (
     Employee, CompetencyMatrix, SkillLevelMatrix,
     TrainingCalendar, TrainingSession, TrainingAttendance, TrainingEvaluation
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/hr", tags=["HR Department"])
@@ -22,11 +28,13 @@ router = APIRouter(prefix="/api/hr", tags=["HR Department"])
 
 @router.get("/employees")
 async def list_employees(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     department: Optional[str] = None,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all employees with optional filters"""
@@ -35,9 +43,9 @@ async def list_employees(
         query = query.where(Employee.department == department)
     if status:
         query = query.where(Employee.status == status)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Employee.created_at, Employee.id, cursor, skip, limit, descending=False)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/employees", status_code=status.HTTP_201_CREATED)
@@ -72,7 +80,7 @@ async def create_employee(
 @router.get("/employees/{employee_id}")
 async def get_employee(
     employee_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get employee by ID"""
@@ -121,14 +129,19 @@ async def update_employee(
 
 @router.get("/competency-matrix")
 async def list_competency_matrix(
+    request: Request,
     employee_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List competency matrix records"""
     query = select(CompetencyMatrix)
     if employee_id:
         query = query.where(CompetencyMatrix.employee_id == employee_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "hr-competency-matrix")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -167,14 +180,19 @@ async def create_competency_record(
 
 @router.get("/training-calendar")
 async def list_training_calendar(
+    request: Request,
     year: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List training calendar"""
     query = select(TrainingCalendar)
     if year:
         query = query.where(TrainingCalendar.year == year)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "hr-training-calendar")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -204,14 +222,19 @@ async def create_training_calendar(
 
 @router.get("/training-sessions")
 async def list_training_sessions(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List training sessions"""
     query = select(TrainingSession)
     if status:
         query = query.where(TrainingSession.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "hr-training-sessions")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -227,9 +250,7 @@ async def create_training_session(
 ):
     """Create training session"""
     # Generate training number
-    result = await db.execute(select(func.count(TrainingSession.id)))
-    count = result.scalar() or 0
-    training_no = f"TRN-{date.today().year}-{count + 1:04d}"
+    training_no = await sequence_service.next_number("TRN", TrainingSession.training_no)
     
     session = TrainingSession(
         id=str(uuid.uuid4()),
@@ -248,7 +269,7 @@ async def create_training_session(
 @router.get("/training-sessions/{session_id}")
 async def get_training_session(
     session_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get training session with attendance"""
@@ -290,14 +311,19 @@ async def record_attendance(
 
 @router.get("/training-evaluations")
 async def list_evaluations(
+    request: Request,
     training_no: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List training evaluations"""
     query = select(TrainingEvaluation)
     if training_no:
         query = query.where(TrainingEvaluation.training_no == training_no)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "hr-training-evaluations")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -346,31 +372,31 @@ async def create_evaluation(
 
 # ==================== Dashboard/Stats ====================
 
+HR_STATS_MODELS = [Employee, TrainingSession]
+
+
+async def load_hr_stats(db: AsyncSession) -> dict:
+    """Counts shown on the HR department dashboard."""
+    return await fetch_counts(
+        db,
+        counts(Employee, total_employees=None, active_employees=Employee.status == "Active"),
+        counts(
+            TrainingSession,
+            scheduled_trainings=TrainingSession.status == "Scheduled",
+            completed_trainings=TrainingSession.status == "Completed"
+        )
+    )
+
+
 @router.get("/stats")
 async def get_hr_stats(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get HR department statistics"""
-    # Total employees
-    result = await db.execute(select(func.count(Employee.id)))
-    total_employees = result.scalar() or 0
-    
-    # Active employees
-    result = await db.execute(select(func.count(Employee.id)).where(Employee.status == "Active"))
-    active_employees = result.scalar() or 0
-    
-    # Scheduled trainings
-    result = await db.execute(select(func.count(TrainingSession.id)).where(TrainingSession.status == "Scheduled"))
-    scheduled_trainings = result.scalar() or 0
-    
-    # Completed trainings
-    result = await db.execute(select(func.count(TrainingSession.id)).where(TrainingSession.status == "Completed"))
-    completed_trainings = result.scalar() or 0
-    
-    return {
-        "total_employees": total_employees,
-        "active_employees": active_employees,
-        "scheduled_trainings": scheduled_trainings,
-        "completed_trainings": completed_trainings
-    }
+    """Get HR department statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, HR_STATS_MODELS, lambda: run_in_read_session(load_hr_stats)
+    )
+
+
+kpi_broadcaster.register("hr", HR_STATS_MODELS, load_hr_stats)
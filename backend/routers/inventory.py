@@ -1,17 +1,19 @@
 """Inventory management router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db
 from models import User, Inventory, LotTracking, SerialNumber, Item
 from schemas import (
     InventoryCreate, InventoryResponse,
     LotTrackingCreate, LotTrackingResponse
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.streaming import stream_format, stream_query
 
 
 router = APIRouter(prefix="/api/inventory", tags=["Inventory"])
@@ -21,7 +23,7 @@ router = APIRouter(prefix="/api/inventory", tags=["Inventory"])
 
 @router.get("/summary")
 async def get_inventory_summary(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get inventory summary statistics."""
@@ -57,22 +59,24 @@ async def get_inventory_summary(
 
 @router.get("/lots", response_model=List[LotTrackingResponse])
 async def get_lots(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     item_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get lot tracking records."""
-    query = select(LotTracking).order_by(LotTracking.created_at.desc())
+    query = select(LotTracking)
     if item_id:
         query = query.where(LotTracking.item_id == item_id)
     if status:
         query = query.where(LotTracking.status == status)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, LotTracking.created_at, LotTracking.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/lots", response_model=LotTrackingResponse, status_code=status.HTTP_201_CREATED)
@@ -95,7 +99,7 @@ async def create_lot(
 @router.get("/lots/{lot_id}", response_model=LotTrackingResponse)
 async def get_lot(
     lot_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific lot."""
@@ -129,9 +133,11 @@ async def update_lot_status(
 
 @router.get("/serial-numbers")
 async def get_serial_numbers(
+    request: Request,
     item_id: Optional[str] = None,
     lot_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get serial number records."""
@@ -140,6 +146,9 @@ async def get_serial_numbers(
         query = query.where(SerialNumber.item_id == item_id)
     if lot_id:
         query = query.where(SerialNumber.lot_id == lot_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "serial-numbers")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -177,7 +186,7 @@ async def create_serial_number(
 @router.get("/serial-numbers/{sn}")
 async def get_serial_number(
     sn: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get serial number details for traceability."""
@@ -194,22 +203,24 @@ async def get_serial_number(
 
 @router.get("", response_model=List[InventoryResponse])
 async def get_inventory(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     item_id: Optional[str] = None,
     warehouse: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get inventory records."""
-    query = select(Inventory).order_by(Inventory.updated_at.desc())
+    query = select(Inventory)
     if item_id:
         query = query.where(Inventory.item_id == item_id)
     if warehouse:
         query = query.where(Inventory.warehouse_location == warehouse)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Inventory.updated_at, Inventory.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "updated_at")
 
 
 @router.post("", response_model=InventoryResponse, status_code=status.HTTP_201_CREATED)
@@ -234,7 +245,7 @@ async def create_inventory_record(
 @router.get("/{inv_id}", response_model=InventoryResponse)
 async def get_inventory_record(
     inv_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific inventory record."""
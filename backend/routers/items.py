@@ -1,14 +1,16 @@
 """Items and Manufacturing router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Item, BillOfMaterial, Routing, User
 from schemas import ItemCreate, ItemUpdate, ItemResponse
 from utils.auth import get_current_user
+from utils.bom import explode_bom
+from utils.pagination import keyset_page, page_results
 
 
 router = APIRouter(prefix="/api", tags=["Manufacturing"])
@@ -18,16 +20,18 @@ router = APIRouter(prefix="/api", tags=["Manufacturing"])
 
 @router.get("/items", response_model=List[ItemResponse])
 async def get_items(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     item_type: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all items."""
-    query = select(Item).order_by(Item.item_code)
+    query = select(Item)
     
     if item_type:
         query = query.where(Item.item_type == item_type)
@@ -36,9 +40,9 @@ async def get_items(
     if search:
         query = query.where(Item.item_code.ilike(f"%{search}%") | Item.description.ilike(f"%{search}%"))
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Item.item_code, Item.id, cursor, skip, limit, descending=False)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "item_code")
 
 
 @router.post("/items", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
@@ -64,7 +68,7 @@ async def create_item(
 @router.get("/items/{item_id}", response_model=ItemResponse)
 async def get_item(
     item_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific item."""
@@ -103,7 +107,7 @@ async def update_item(
 @router.get("/boms/{item_id}")
 async def get_bom(
     item_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get BOM for an item."""
@@ -129,6 +133,24 @@ async def get_bom(
     ]
 
 
+@router.get("/boms/{item_id}/explosion")
+async def explode_item_bom(
+    item_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the full indented BOM of an item down to raw materials.
+    
+    ``lines`` are in depth-first order with ``level`` (1 = direct component)
+    and ``extended_quantity`` per unit of the item; ``totals`` sums the
+    extended quantities of leaf components. A component that contains
+    itself is returned once with ``cycle`` set and not expanded further.
+    """
+    explosion = await explode_bom(item_id)
+    if explosion is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return explosion
+
+
 @router.post("/boms")
 async def create_bom_line(
     parent_item_id: str,
@@ -158,7 +180,7 @@ async def create_bom_line(
 @router.get("/routings/{item_id}")
 async def get_routing(
     item_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get routing for an item."""
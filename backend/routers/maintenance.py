@@ -1,15 +1,21 @@
 """Maintenance Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import date, datetime
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.maintenance import CleaningRecord, Equipment, PreventiveMaintenance, BreakdownRecord
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/maintenance", tags=["Maintenance Department"])
@@ -19,19 +25,21 @@ router = APIRouter(prefix="/api/maintenance", tags=["Maintenance Department"])
 
 @router.get("/equipment")
 async def list_equipment(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List all equipment"""
     query = select(Equipment)
     if status:
         query = query.where(Equipment.status == status)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Equipment.created_at, Equipment.id, cursor, skip, limit, descending=False)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/equipment", status_code=status.HTTP_201_CREATED)
@@ -47,9 +55,7 @@ async def create_equipment(
 ):
     """Create new equipment"""
     # Generate equipment ID
-    result = await db.execute(select(func.count(Equipment.id)))
-    count = result.scalar() or 0
-    equipment_id = f"EQP-{count + 1:04d}"
+    equipment_id = await sequence_service.next_number("EQP", Equipment.equipment_id, yearly=False)
     
     equipment = Equipment(
         id=str(uuid.uuid4()),
@@ -70,7 +76,7 @@ async def create_equipment(
 @router.get("/equipment/{equipment_id}")
 async def get_equipment(
     equipment_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get equipment by ID with maintenance history"""
@@ -116,9 +122,11 @@ async def update_equipment(
 
 @router.get("/preventive-maintenance")
 async def list_preventive_maintenance(
+    request: Request,
     equipment_id: Optional[str] = None,
     month_year: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List preventive maintenance records"""
@@ -127,6 +135,9 @@ async def list_preventive_maintenance(
         query = query.where(PreventiveMaintenance.equipment_id == equipment_id)
     if month_year:
         query = query.where(PreventiveMaintenance.month_year == month_year)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "maintenance-preventive-maintenance")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -168,9 +179,11 @@ async def create_pm_record(
 
 @router.get("/breakdowns")
 async def list_breakdowns(
+    request: Request,
     status: Optional[str] = None,
     equipment_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List breakdown records"""
@@ -179,6 +192,9 @@ async def list_breakdowns(
         query = query.where(BreakdownRecord.status == status)
     if equipment_id:
         query = query.where(BreakdownRecord.equipment_id == equipment_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "maintenance-breakdowns")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -200,9 +216,7 @@ async def create_breakdown(
         raise HTTPException(status_code=404, detail="Equipment not found")
     
     # Generate breakdown number
-    result = await db.execute(select(func.count(BreakdownRecord.id)))
-    count = result.scalar() or 0
-    breakdown_no = f"BD-{date.today().year}-{count + 1:04d}"
+    breakdown_no = await sequence_service.next_number("BD", BreakdownRecord.breakdown_no)
     
     breakdown = BreakdownRecord(
         id=str(uuid.uuid4()),
@@ -258,10 +272,12 @@ async def update_breakdown(
 
 @router.get("/cleaning-records")
 async def list_cleaning_records(
+    request: Request,
     month: Optional[str] = None,
     year: Optional[int] = None,
     area: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """List cleaning records"""
@@ -272,6 +288,9 @@ async def list_cleaning_records(
         query = query.where(CleaningRecord.year == year)
     if area:
         query = query.where(CleaningRecord.area == area)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "maintenance-cleaning-records")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -306,35 +325,32 @@ async def create_cleaning_record(
 
 # ==================== Dashboard/Stats ====================
 
+MAINTENANCE_STATS_MODELS = [Equipment, BreakdownRecord, PreventiveMaintenance]
+
+
+async def load_maintenance_stats(db: AsyncSession) -> dict:
+    """Counts shown on the maintenance department dashboard."""
+    current_month = f"{date.today().strftime('%B')}-{date.today().year}"
+    return await fetch_counts(
+        db,
+        counts(Equipment, total_equipment=None, active_equipment=Equipment.status == "Active"),
+        counts(BreakdownRecord, open_breakdowns=BreakdownRecord.status == "Open"),
+        counts(
+            PreventiveMaintenance,
+            pm_due_this_month=PreventiveMaintenance.month_year == current_month
+        )
+    )
+
+
 @router.get("/stats")
 async def get_maintenance_stats(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get maintenance department statistics"""
-    # Total equipment
-    result = await db.execute(select(func.count(Equipment.id)))
-    total_equipment = result.scalar() or 0
-    
-    # Active equipment
-    result = await db.execute(select(func.count(Equipment.id)).where(Equipment.status == "Active"))
-    active_equipment = result.scalar() or 0
-    
-    # Open breakdowns
-    result = await db.execute(select(func.count(BreakdownRecord.id)).where(BreakdownRecord.status == "Open"))
-    open_breakdowns = result.scalar() or 0
-    
-    # PM due this month
-    current_month = f"{date.today().strftime('%B')}-{date.today().year}"
-    result = await db.execute(
-        select(func.count(PreventiveMaintenance.id))
-        .where(PreventiveMaintenance.month_year == current_month)
+    """Get maintenance department statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, MAINTENANCE_STATS_MODELS, lambda: run_in_read_session(load_maintenance_stats)
     )
-    pm_due = result.scalar() or 0
-    
-    return {
-        "total_equipment": total_equipment,
-        "active_equipment": active_equipment,
-        "open_breakdowns": open_breakdowns,
-        "pm_due_this_month": pm_due
-    }
+
+
+kpi_broadcaster.register("maintenance", MAINTENANCE_STATS_MODELS, load_maintenance_stats)
@@ -1,18 +1,24 @@
 """Marketing Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.marketing import (
     Customer, Inquiry, OrderConfirmation, OrderItem,
     InternalWorkOrder, CustomerFeedback, CustomerComplaint
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/marketing", tags=["Marketing Department"])
@@ -22,14 +28,15 @@ router = APIRouter(prefix="/api/marketing", tags=["Marketing Department"])
 
 @router.get("/customers")
 async def list_customers(
-    skip: int = 0, limit: int = 100, status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    response: Response,
+    skip: int = 0, limit: int = 100, cursor: Optional[str] = None, status: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(Customer)
     if status:
         query = query.where(Customer.status == status)
-    result = await db.execute(query.offset(skip).limit(limit))
-    return result.scalars().all()
+    result = await db.execute(keyset_page(query, Customer.created_at, Customer.id, cursor, skip, limit, descending=False))
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/customers", status_code=status.HTTP_201_CREATED)
@@ -40,9 +47,7 @@ async def create_customer(
     email: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(Customer.id)))
-    count = result.scalar() or 0
-    customer_code = f"CUST-{count + 1:04d}"
+    customer_code = await sequence_service.next_number("CUST", Customer.customer_code, yearly=False)
     
     customer = Customer(
         id=str(uuid.uuid4()), customer_code=customer_code, customer_name=customer_name,
@@ -57,7 +62,7 @@ async def create_customer(
 
 @router.get("/customers/{customer_id}")
 async def get_customer(
-    customer_id: str, db: AsyncSession = Depends(get_db),
+    customer_id: str, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
@@ -76,12 +81,16 @@ async def get_customer(
 
 @router.get("/inquiries")
 async def list_inquiries(
-    status: Optional[str] = None, db: AsyncSession = Depends(get_db),
+    request: Request,
+    status: Optional[str] = None, format: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = select(Inquiry)
     if status:
         query = query.where(Inquiry.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "marketing-inquiries")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -93,9 +102,7 @@ async def create_inquiry(
     contact_person: Optional[str] = None, contact_number: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(Inquiry.id)))
-    count = result.scalar() or 0
-    inquiry_no = f"INQ-{date.today().year}-{count + 1:04d}"
+    inquiry_no = await sequence_service.next_number("INQ", Inquiry.inquiry_no)
     
     inquiry = Inquiry(
         id=str(uuid.uuid4()), inquiry_no=inquiry_no, inquiry_date=inquiry_date,
@@ -113,12 +120,16 @@ async def create_inquiry(
 
 @router.get("/orders")
 async def list_orders(
-    status: Optional[str] = None, db: AsyncSession = Depends(get_db),
+    request: Request,
+    status: Optional[str] = None, format: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = select(OrderConfirmation)
     if status:
         query = query.where(OrderConfirmation.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "marketing-orders")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -129,9 +140,7 @@ async def create_order(
     total_amount: Optional[float] = None, expected_dispatch: Optional[date] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(OrderConfirmation.id)))
-    count = result.scalar() or 0
-    oc_number = f"OC-{date.today().year}-{count + 1:04d}"
+    oc_number = await sequence_service.next_number("OC", OrderConfirmation.oc_number)
     
     order = OrderConfirmation(
         id=str(uuid.uuid4()), oc_number=oc_number, oc_date=oc_date,
@@ -146,7 +155,7 @@ async def create_order(
 
 @router.get("/orders/{order_id}")
 async def get_order(
-    order_id: str, db: AsyncSession = Depends(get_db),
+    order_id: str, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
@@ -163,12 +172,16 @@ async def get_order(
 
 @router.get("/work-orders")
 async def list_internal_work_orders(
-    status: Optional[str] = None, db: AsyncSession = Depends(get_db),
+    request: Request,
+    status: Optional[str] = None, format: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = select(InternalWorkOrder)
     if status:
         query = query.where(InternalWorkOrder.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "marketing-work-orders")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -180,9 +193,7 @@ async def create_internal_work_order(
     expected_dispatch: Optional[date] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(InternalWorkOrder.id)))
-    count = result.scalar() or 0
-    iwo_number = f"IWO-{date.today().year}-{count + 1:04d}"
+    iwo_number = await sequence_service.next_number("IWO", InternalWorkOrder.iwo_number)
     
     iwo = InternalWorkOrder(
         id=str(uuid.uuid4()), iwo_number=iwo_number, iwo_date=iwo_date,
@@ -199,12 +210,16 @@ async def create_internal_work_order(
 
 @router.get("/complaints")
 async def list_complaints(
-    status: Optional[str] = None, db: AsyncSession = Depends(get_db),
+    request: Request,
+    status: Optional[str] = None, format: Optional[str] = None, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     query = select(CustomerComplaint)
     if status:
         query = query.where(CustomerComplaint.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "marketing-complaints")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -215,9 +230,7 @@ async def create_complaint(
     customer_id: Optional[str] = None, severity: Optional[str] = "Minor",
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(CustomerComplaint.id)))
-    count = result.scalar() or 0
-    complaint_no = f"COMP-{date.today().year}-{count + 1:04d}"
+    complaint_no = await sequence_service.next_number("COMP", CustomerComplaint.complaint_no)
     
     complaint = CustomerComplaint(
         id=str(uuid.uuid4()), complaint_no=complaint_no, customer_id=customer_id,
@@ -258,9 +271,15 @@ async def update_complaint(
 
 @router.get("/feedbacks")
 async def list_feedbacks(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(CustomerFeedback))
+    query = select(CustomerFeedback)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "marketing-feedbacks")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -272,9 +291,7 @@ async def create_feedback(
     customer_id: Optional[str] = None, comments: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(CustomerFeedback.id)))
-    count = result.scalar() or 0
-    feedback_no = f"FB-{date.today().year}-{count + 1:04d}"
+    feedback_no = await sequence_service.next_number("FB", CustomerFeedback.feedback_no)
     
     feedback = CustomerFeedback(
         id=str(uuid.uuid4()), feedback_no=feedback_no, feedback_date=feedback_date,
@@ -291,25 +308,29 @@ async def create_feedback(
 
 # ==================== Stats ====================
 
+MARKETING_STATS_MODELS = [Customer, Inquiry, OrderConfirmation, CustomerComplaint]
+
+
+async def load_marketing_stats(db: AsyncSession) -> dict:
+    """Counts shown on the marketing dashboard."""
+    return await fetch_counts(
+        db,
+        counts(Customer, total_customers=None),
+        counts(Inquiry, open_inquiries=Inquiry.status == "Open"),
+        counts(OrderConfirmation, pending_orders=OrderConfirmation.status == "Pending"),
+        counts(CustomerComplaint, open_complaints=CustomerComplaint.status == "Open")
+    )
+
+
 @router.get("/stats")
 async def get_marketing_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(Customer.id)))
-    total_customers = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(Inquiry.id)).where(Inquiry.status == "Open"))
-    open_inquiries = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(OrderConfirmation.id)).where(OrderConfirmation.status == "Pending"))
-    pending_orders = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(CustomerComplaint.id)).where(CustomerComplaint.status == "Open"))
-    open_complaints = result.scalar() or 0
-    
-    return {
-        "total_customers": total_customers,
-        "open_inquiries": open_inquiries,
-        "pending_orders": pending_orders,
-        "open_complaints": open_complaints
-    }
+    """Get marketing statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, MARKETING_STATS_MODELS, lambda: run_in_read_session(load_marketing_stats)
+    )
+
+
+kpi_broadcaster.register("marketing", MARKETING_STATS_MODELS, load_marketing_stats)
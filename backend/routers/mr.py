@@ -1,18 +1,23 @@
 """MR/QA Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.mr import (
     AuditSchedule, AuditCircular, InternalAuditNote, InternalAuditFinding,
     CorrectiveActionReport, ManagementReviewMeeting, DocumentChangeRequest, PreventiveActionReport
 )
 from utils.auth import get_current_user
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/mr", tags=["MR/QA Department"])
@@ -22,12 +27,17 @@ router = APIRouter(prefix="/api/mr", tags=["MR/QA Department"])
 
 @router.get("/audit-schedules")
 async def list_audit_schedules(
+    request: Request,
     year: Optional[int] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(AuditSchedule)
     if year:
         query = query.where(AuditSchedule.year == year)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-audit-schedules")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -51,9 +61,15 @@ async def create_audit_schedule(
 
 @router.get("/audit-circulars")
 async def list_audit_circulars(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(AuditCircular))
+    query = select(AuditCircular)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-audit-circulars")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -63,9 +79,7 @@ async def create_audit_circular(
     circular_text: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(AuditCircular.id)))
-    count = result.scalar() or 0
-    circular_no = f"AC-{date.today().year}-{count + 1:04d}"
+    circular_no = await sequence_service.next_number("AC", AuditCircular.circular_no)
     
     circular = AuditCircular(
         id=str(uuid.uuid4()), circular_no=circular_no, circular_date=date.today(),
@@ -82,12 +96,17 @@ async def create_audit_circular(
 
 @router.get("/audit-notes")
 async def list_audit_notes(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(InternalAuditNote)
     if status:
         query = query.where(InternalAuditNote.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-audit-notes")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -98,9 +117,7 @@ async def create_audit_note(
     nc_count: int = 0, observation_count: int = 0,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(InternalAuditNote.id)))
-    count = result.scalar() or 0
-    audit_no = f"IAN-{date.today().year}-{count + 1:04d}"
+    audit_no = await sequence_service.next_number("IAN", InternalAuditNote.audit_no)
     
     note = InternalAuditNote(
         id=str(uuid.uuid4()), audit_no=audit_no, audit_date=audit_date,
@@ -118,12 +135,17 @@ async def create_audit_note(
 
 @router.get("/car")
 async def list_car(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(CorrectiveActionReport)
     if status:
         query = query.where(CorrectiveActionReport.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-car")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -134,9 +156,7 @@ async def create_car(
     audit_reference: Optional[str] = None, clause_no: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(CorrectiveActionReport.id)))
-    count = result.scalar() or 0
-    car_number = f"CAR-{date.today().year}-{count + 1:04d}"
+    car_number = await sequence_service.next_number("CAR", CorrectiveActionReport.car_number)
     
     car = CorrectiveActionReport(
         id=str(uuid.uuid4()), car_number=car_number, car_date=date.today(),
@@ -153,9 +173,15 @@ async def create_car(
 
 @router.get("/mrm")
 async def list_mrm(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(ManagementReviewMeeting))
+    query = select(ManagementReviewMeeting)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-mrm")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -165,9 +191,7 @@ async def create_mrm(
     next_meeting_date: Optional[date] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(ManagementReviewMeeting.id)))
-    count = result.scalar() or 0
-    meeting_no = f"MRM-{date.today().year}-{count + 1:04d}"
+    meeting_no = await sequence_service.next_number("MRM", ManagementReviewMeeting.meeting_no)
     
     mrm = ManagementReviewMeeting(
         id=str(uuid.uuid4()), meeting_no=meeting_no, meeting_date=meeting_date,
@@ -183,12 +207,17 @@ async def create_mrm(
 
 @router.get("/dcr")
 async def list_dcr(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(DocumentChangeRequest)
     if status:
         query = query.where(DocumentChangeRequest.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "mr-dcr")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -199,9 +228,7 @@ async def create_dcr(
     document_no: Optional[str] = None, revision_no: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(DocumentChangeRequest.id)))
-    count = result.scalar() or 0
-    dcr_number = f"DCR-{date.today().year}-{count + 1:04d}"
+    dcr_number = await sequence_service.next_number("DCR", DocumentChangeRequest.dcr_number)
     
     dcr = DocumentChangeRequest(
         id=str(uuid.uuid4()), dcr_number=dcr_number, dcr_date=date.today(),
@@ -216,25 +243,31 @@ async def create_dcr(
 
 # ==================== Stats ====================
 
+MR_STATS_MODELS = [
+    InternalAuditNote, CorrectiveActionReport, DocumentChangeRequest, ManagementReviewMeeting
+]
+
+
+async def load_mr_stats(db: AsyncSession) -> dict:
+    """Counts shown on the management representative dashboard."""
+    return await fetch_counts(
+        db,
+        counts(InternalAuditNote, open_audits=InternalAuditNote.status == "Open"),
+        counts(CorrectiveActionReport, open_car=CorrectiveActionReport.status == "Open"),
+        counts(DocumentChangeRequest, pending_dcr=DocumentChangeRequest.status == "Pending"),
+        counts(ManagementReviewMeeting, total_mrm=None)
+    )
+
+
 @router.get("/stats")
 async def get_mr_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(InternalAuditNote.id)).where(InternalAuditNote.status == "Open"))
-    open_audits = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(CorrectiveActionReport.id)).where(CorrectiveActionReport.status == "Open"))
-    open_car = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(DocumentChangeRequest.id)).where(DocumentChangeRequest.status == "Pending"))
-    pending_dcr = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(ManagementReviewMeeting.id)))
-    total_mrm = result.scalar() or 0
-    
-    return {
-        "open_audits": open_audits,
-        "open_car": open_car,
-        "pending_dcr": pending_dcr,
-        "total_mrm": total_mrm
-    }
+    """Get management representative statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, MR_STATS_MODELS, lambda: run_in_read_session(load_mr_stats)
+    )
+
+
+kpi_broadcaster.register("mr", MR_STATS_MODELS, load_mr_stats)
@@ -1,56 +1,58 @@
 """NC/CAPA router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import date
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Nonconformance, CAPARecord, EffectivenessCheck, User
 from schemas import (
     NonconformanceCreate, NonconformanceUpdate, NonconformanceResponse,
     CAPACreate, CAPAUpdate, CAPAResponse
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
 
 
 router = APIRouter(prefix="/api", tags=["NC/CAPA"])
 
 
-def generate_nc_number(count: int) -> str:
+async def generate_nc_number() -> str:
     """Generate NC number."""
-    year = datetime.now().year
-    return f"NC-{year}-{count + 1:04d}"
+    return await sequence_service.next_number("NC", Nonconformance.nc_number)
 
 
-def generate_capa_number(count: int) -> str:
+async def generate_capa_number() -> str:
     """Generate CAPA number."""
-    year = datetime.now().year
-    return f"CAPA-{year}-{count + 1:04d}"
+    return await sequence_service.next_number("CAPA", CAPARecord.capa_number)
 
 
 # ==================== Nonconformances ====================
 
 @router.get("/nonconformances", response_model=List[NonconformanceResponse])
 async def get_nonconformances(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     severity: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all nonconformances."""
-    query = select(Nonconformance).order_by(Nonconformance.created_at.desc())
+    query = select(Nonconformance)
     
     if status:
         query = query.where(Nonconformance.status == status)
     if severity:
         query = query.where(Nonconformance.severity == severity)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, Nonconformance.created_at, Nonconformance.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/nonconformances", response_model=NonconformanceResponse, status_code=status.HTTP_201_CREATED)
@@ -60,11 +62,8 @@ async def create_nonconformance(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new nonconformance."""
-    result = await db.execute(select(func.count(Nonconformance.id)))
-    count = result.scalar() or 0
-    
     nc = Nonconformance(
-        nc_number=generate_nc_number(count),
+        nc_number=await generate_nc_number(),
         created_by=current_user.id,
         **nc_data.model_dump()
     )
@@ -78,7 +77,7 @@ async def create_nonconformance(
 @router.get("/nonconformances/{nc_id}", response_model=NonconformanceResponse)
 async def get_nonconformance(
     nc_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific nonconformance."""
@@ -119,24 +118,26 @@ async def update_nonconformance(
 
 @router.get("/caparecords", response_model=List[CAPAResponse])
 async def get_capa_records(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all CAPA records."""
-    query = select(CAPARecord).order_by(CAPARecord.created_at.desc())
+    query = select(CAPARecord)
     
     if status:
         query = query.where(CAPARecord.status == status)
     if priority:
         query = query.where(CAPARecord.priority == priority)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, CAPARecord.created_at, CAPARecord.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/caparecords", response_model=CAPAResponse, status_code=status.HTTP_201_CREATED)
@@ -146,11 +147,8 @@ async def create_capa(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new CAPA record."""
-    result = await db.execute(select(func.count(CAPARecord.id)))
-    count = result.scalar() or 0
-    
     capa = CAPARecord(
-        capa_number=generate_capa_number(count),
+        capa_number=await generate_capa_number(),
         **capa_data.model_dump()
     )
     db.add(capa)
@@ -163,7 +161,7 @@ async def create_capa(
 @router.get("/caparecords/{capa_id}", response_model=CAPAResponse)
 async def get_capa(
     capa_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific CAPA record."""
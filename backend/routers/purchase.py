@@ -1,18 +1,24 @@
 """Purchase Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.purchase import (
     Vendor, VendorAudit, PurchaseRequisition,
     PurchaseOrder, PurchaseOrderItem, VendorEvaluation
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/purchase", tags=["Purchase Department"])
@@ -22,17 +28,18 @@ router = APIRouter(prefix="/api/purchase", tags=["Purchase Department"])
 
 @router.get("/vendors")
 async def list_vendors(
-    skip: int = 0, limit: int = 100, status: Optional[str] = None,
+    response: Response,
+    skip: int = 0, limit: int = 100, cursor: Optional[str] = None, status: Optional[str] = None,
     approval_status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(Vendor)
     if status:
         query = query.where(Vendor.status == status)
     if approval_status:
         query = query.where(Vendor.approval_status == approval_status)
-    result = await db.execute(query.offset(skip).limit(limit))
-    return result.scalars().all()
+    result = await db.execute(keyset_page(query, Vendor.created_at, Vendor.id, cursor, skip, limit, descending=False))
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/vendors", status_code=status.HTTP_201_CREATED)
@@ -42,9 +49,7 @@ async def create_vendor(
     gst_no: Optional[str] = None, products_services: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(Vendor.id)))
-    count = result.scalar() or 0
-    vendor_code = f"VND-{count + 1:04d}"
+    vendor_code = await sequence_service.next_number("VND", Vendor.vendor_code, yearly=False)
     
     vendor = Vendor(
         id=str(uuid.uuid4()), vendor_code=vendor_code, vendor_name=vendor_name,
@@ -59,7 +64,7 @@ async def create_vendor(
 
 @router.get("/vendors/{vendor_id}")
 async def get_vendor(
-    vendor_id: str, db: AsyncSession = Depends(get_db),
+    vendor_id: str, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
@@ -103,12 +108,17 @@ async def update_vendor(
 
 @router.get("/requisitions")
 async def list_requisitions(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(PurchaseRequisition)
     if status:
         query = query.where(PurchaseRequisition.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "purchase-requisitions")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -119,9 +129,7 @@ async def create_requisition(
     needed_by: Optional[date] = None, make_spec_size: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(PurchaseRequisition.id)))
-    count = result.scalar() or 0
-    pr_number = f"PR-{date.today().year}-{count + 1:04d}"
+    pr_number = await sequence_service.next_number("PR", PurchaseRequisition.pr_number)
     
     pr = PurchaseRequisition(
         id=str(uuid.uuid4()), pr_number=pr_number, pr_date=date.today(),
@@ -138,14 +146,19 @@ async def create_requisition(
 
 @router.get("/orders")
 async def list_purchase_orders(
+    request: Request,
     status: Optional[str] = None, vendor_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(PurchaseOrder)
     if status:
         query = query.where(PurchaseOrder.status == status)
     if vendor_id:
         query = query.where(PurchaseOrder.vendor_id == vendor_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "purchase-orders")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -156,9 +169,7 @@ async def create_purchase_order(
     delivery_period: Optional[str] = None, payment_terms: Optional[str] = None,
     db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(PurchaseOrder.id)))
-    count = result.scalar() or 0
-    po_number = f"PO-{date.today().year}-{count + 1:04d}"
+    po_number = await sequence_service.next_number("PO", PurchaseOrder.po_number)
     
     po = PurchaseOrder(
         id=str(uuid.uuid4()), po_number=po_number, po_date=po_date,
@@ -174,7 +185,7 @@ async def create_purchase_order(
 
 @router.get("/orders/{po_id}")
 async def get_purchase_order(
-    po_id: str, db: AsyncSession = Depends(get_db),
+    po_id: str, db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
@@ -191,12 +202,17 @@ async def get_purchase_order(
 
 @router.get("/evaluations")
 async def list_evaluations(
+    request: Request,
     vendor_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(VendorEvaluation)
     if vendor_id:
         query = query.where(VendorEvaluation.vendor_id == vendor_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "purchase-evaluations")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -223,25 +239,28 @@ async def create_evaluation(
 
 # ==================== Stats ====================
 
+PURCHASE_STATS_MODELS = [Vendor, PurchaseRequisition, PurchaseOrder]
+
+
+async def load_purchase_stats(db: AsyncSession) -> dict:
+    """Counts shown on the purchase dashboard."""
+    return await fetch_counts(
+        db,
+        counts(Vendor, total_vendors=None, approved_vendors=Vendor.approval_status == "Approved"),
+        counts(PurchaseRequisition, pending_requisitions=PurchaseRequisition.status == "Pending"),
+        counts(PurchaseOrder, draft_orders=PurchaseOrder.status == "Draft")
+    )
+
+
 @router.get("/stats")
 async def get_purchase_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(Vendor.id)))
-    total_vendors = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(Vendor.id)).where(Vendor.approval_status == "Approved"))
-    approved_vendors = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(PurchaseRequisition.id)).where(PurchaseRequisition.status == "Pending"))
-    pending_pr = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(PurchaseOrder.id)).where(PurchaseOrder.status == "Draft"))
-    draft_po = result.scalar() or 0
-    
-    return {
-        "total_vendors": total_vendors,
-        "approved_vendors": approved_vendors,
-        "pending_requisitions": pending_pr,
-        "draft_orders": draft_po
-    }
+    """Get purchase statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, PURCHASE_STATS_MODELS, lambda: run_in_read_session(load_purchase_stats)
+    )
+
+
+kpi_broadcaster.register("purchase", PURCHASE_STATS_MODELS, load_purchase_stats)
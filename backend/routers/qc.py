@@ -1,11 +1,11 @@
 """Quality Control router for inspections and testing."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db, write_queue
 from models import (
     User, InspectionPlan, InspectionRecord, TestResult,
     TestSpecification, WorkOrder
@@ -15,6 +15,8 @@ from schemas import (
     InspectionRecordCreate, InspectionRecordResponse
 )
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.streaming import stream_format, stream_query
 
 
 router = APIRouter(prefix="/api/qc", tags=["Quality Control"])
@@ -24,19 +26,21 @@ router = APIRouter(prefix="/api/qc", tags=["Quality Control"])
 
 @router.get("/inspection-plans", response_model=List[InspectionPlanResponse])
 async def get_inspection_plans(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     item_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all inspection plans."""
-    query = select(InspectionPlan).order_by(InspectionPlan.created_at.desc())
+    query = select(InspectionPlan)
     if item_id:
         query = query.where(InspectionPlan.item_id == item_id)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, InspectionPlan.created_at, InspectionPlan.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/inspection-plans", response_model=InspectionPlanResponse, status_code=status.HTTP_201_CREATED)
@@ -56,7 +60,7 @@ async def create_inspection_plan(
 @router.get("/inspection-plans/{plan_id}", response_model=InspectionPlanResponse)
 async def get_inspection_plan(
     plan_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific inspection plan."""
@@ -71,46 +75,50 @@ async def get_inspection_plan(
 
 @router.get("/inspections", response_model=List[InspectionRecordResponse])
 async def get_inspections(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     work_order_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all inspection records."""
-    query = select(InspectionRecord).order_by(InspectionRecord.inspection_date.desc())
+    query = select(InspectionRecord)
     if status:
         query = query.where(InspectionRecord.status == status)
     if work_order_id:
         query = query.where(InspectionRecord.work_order_id == work_order_id)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, InspectionRecord.inspection_date, InspectionRecord.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "inspection_date")
 
 
 @router.post("/inspections", response_model=InspectionRecordResponse, status_code=status.HTTP_201_CREATED)
 async def create_inspection(
     inspection_data: InspectionRecordCreate,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new inspection record."""
-    inspection = InspectionRecord(
-        inspector_id=current_user.id,
-        inspection_date=datetime.utcnow(),
-        **inspection_data.model_dump()
-    )
-    db.add(inspection)
-    await db.commit()
-    await db.refresh(inspection)
-    return inspection
+    async def unit(db: AsyncSession):
+        inspection = InspectionRecord(
+            inspector_id=current_user.id,
+            inspection_date=datetime.utcnow(),
+            **inspection_data.model_dump()
+        )
+        db.add(inspection)
+        await db.flush()
+        await db.refresh(inspection)
+        return inspection
+    
+    return await write_queue.submit(unit)
 
 
 @router.get("/inspections/{inspection_id}", response_model=InspectionRecordResponse)
 async def get_inspection(
     inspection_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific inspection record."""
@@ -145,14 +153,19 @@ async def complete_inspection(
 
 @router.get("/test-specs")
 async def get_test_specifications(
+    request: Request,
     item_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get test specifications."""
     query = select(TestSpecification)
     if item_id:
         query = query.where(TestSpecification.item_id == item_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc-test-specs")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -189,14 +202,19 @@ async def create_test_specification(
 
 @router.get("/test-results")
 async def get_test_results(
+    request: Request,
     inspection_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get test results."""
     query = select(TestResult)
     if inspection_id:
         query = query.where(TestResult.inspection_id == inspection_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc-test-results")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -209,21 +227,23 @@ async def record_test_result(
     numeric_value: Optional[float] = None,
     pass_fail: str = "Pass",
     notes: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Record a test result."""
-    test_result = TestResult(
-        inspection_id=inspection_id,
-        test_spec_id=test_spec_id,
-        result_value=result_value,
-        numeric_value=numeric_value,
-        pass_fail=pass_fail,
-        notes=notes,
-        tested_by=current_user.id,
-        tested_at=datetime.utcnow()
-    )
-    db.add(test_result)
-    await db.commit()
-    await db.refresh(test_result)
-    return test_result
+    async def unit(db: AsyncSession):
+        test_result = TestResult(
+            inspection_id=inspection_id,
+            test_spec_id=test_spec_id,
+            result_value=result_value,
+            numeric_value=numeric_value,
+            pass_fail=pass_fail,
+            notes=notes,
+            tested_by=current_user.id,
+            tested_at=datetime.utcnow()
+        )
+        db.add(test_result)
+        await db.flush()
+        await db.refresh(test_result)
+        return test_result
+    
+    return await write_queue.submit(unit)
@@ -1,12 +1,12 @@
 """Extended QC Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session
 from models.qc_extended import (
     LeakTestRecord, FumigationRecord, DistilledWaterTest, RoomThermometerCalibration,
     PlateCountRecord, MediaReconciliation, EquipmentLogbook, BETRecord,
@@ -14,6 +14,10 @@ from models.qc_extended import (
     RetainSampleRegister, StabilityRegister
 )
 from utils.auth import get_current_user
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/qc-extended", tags=["Extended QC"])
@@ -23,9 +27,15 @@ router = APIRouter(prefix="/api/qc-extended", tags=["Extended QC"])
 
 @router.get("/leak-tests")
 async def list_leak_tests(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(LeakTestRecord))
+    query = select(LeakTestRecord)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-leak-tests")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -51,9 +61,15 @@ async def create_leak_test(
 
 @router.get("/fumigation")
 async def list_fumigation(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(FumigationRecord))
+    query = select(FumigationRecord)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-fumigation")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -77,9 +93,15 @@ async def create_fumigation(
 
 @router.get("/distilled-water-tests")
 async def list_distilled_water_tests(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(DistilledWaterTest))
+    query = select(DistilledWaterTest)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-distilled-water-tests")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -105,12 +127,17 @@ async def create_distilled_water_test(
 
 @router.get("/calibrations")
 async def list_calibrations(
+    request: Request,
     equipment_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(CalibrationRecord)
     if equipment_type:
         query = query.where(CalibrationRecord.equipment_type == equipment_type)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-calibrations")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -137,9 +164,15 @@ async def create_calibration(
 
 @router.get("/bet-records")
 async def list_bet_records(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(BETRecord))
+    query = select(BETRecord)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-bet-records")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -163,9 +196,15 @@ async def create_bet_record(
 
 @router.get("/retain-samples")
 async def list_retain_samples(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(RetainSampleRegister))
+    query = select(RetainSampleRegister)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-retain-samples")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -191,9 +230,15 @@ async def create_retain_sample(
 
 @router.get("/stability")
 async def list_stability(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(StabilityRegister))
+    query = select(StabilityRegister)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "qc_extended-stability")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -217,21 +262,28 @@ async def create_stability_record(
 
 # ==================== Stats ====================
 
+QC_EXTENDED_STATS_MODELS = [CalibrationRecord, RetainSampleRegister, StabilityRegister]
+
+
+async def load_qc_extended_stats(db: AsyncSession) -> dict:
+    """Counts shown on the extended QC register dashboard."""
+    return await fetch_counts(
+        db,
+        counts(CalibrationRecord, total_calibrations=None),
+        counts(RetainSampleRegister, retain_samples=None),
+        counts(StabilityRegister, stability_studies=None)
+    )
+
+
 @router.get("/stats")
 async def get_qc_extended_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(CalibrationRecord.id)))
-    total_calibrations = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(RetainSampleRegister.id)))
-    retain_samples = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(StabilityRegister.id)))
-    stability_studies = result.scalar() or 0
-    
-    return {
-        "total_calibrations": total_calibrations,
-        "retain_samples": retain_samples,
-        "stability_studies": stability_studies
-    }
+    """Get extended QC register statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, QC_EXTENDED_STATS_MODELS, lambda: run_in_read_session(load_qc_extended_stats)
+    )
+
+
+kpi_broadcaster.register("qc_extended", QC_EXTENDED_STATS_MODELS, load_qc_extended_stats)
@@ -1,16 +1,21 @@
 """Store Department API Routes"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import Optional
 from datetime import date
 import uuid
 
-from database import get_db
+from database import get_db, get_read_db, run_in_read_session, write_queue
 from models.store import (
     MaterialInward, ReceivingMemo, IndentSlip, OutwardRegister, StockRegister
 )
 from utils.auth import get_current_user
+from utils.sequences import sequence_service
+from utils.streaming import stream_format, stream_query
+from utils.kpi_stream import kpi_broadcaster
+from utils.stats import counts, fetch_counts
+from utils.table_versions import versioned_response
 from models.user import User
 
 router = APIRouter(prefix="/api/store", tags=["Store Department"])
@@ -20,12 +25,17 @@ router = APIRouter(prefix="/api/store", tags=["Store Department"])
 
 @router.get("/material-inward")
 async def list_material_inward(
+    request: Request,
     qc_status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(MaterialInward)
     if qc_status:
         query = query.where(MaterialInward.qc_status == qc_status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "store-material-inward")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -35,21 +45,22 @@ async def create_material_inward(
     item_name: str, quantity: float, party_name: str, inward_date: date,
     po_no: Optional[str] = None, bill_no: Optional[str] = None,
     received_by: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(MaterialInward.id)))
-    count = result.scalar() or 0
-    grn_number = f"GRN-{date.today().year}-{count + 1:04d}"
+    grn_number = await sequence_service.next_number("GRN", MaterialInward.grn_number)
     
-    inward = MaterialInward(
-        id=str(uuid.uuid4()), grn_number=grn_number, inward_date=inward_date,
-        po_no=po_no, bill_no=bill_no, item_name=item_name,
-        quantity=quantity, party_name=party_name, received_by=received_by
-    )
-    db.add(inward)
-    await db.commit()
-    await db.refresh(inward)
-    return inward
+    async def unit(db: AsyncSession):
+        inward = MaterialInward(
+            id=str(uuid.uuid4()), grn_number=grn_number, inward_date=inward_date,
+            po_no=po_no, bill_no=bill_no, item_name=item_name,
+            quantity=quantity, party_name=party_name, received_by=received_by
+        )
+        db.add(inward)
+        await db.flush()
+        await db.refresh(inward)
+        return inward
+    
+    return await write_queue.submit(unit)
 
 
 @router.put("/material-inward/{grn_id}")
@@ -76,12 +87,17 @@ async def update_material_inward(
 
 @router.get("/indent-slips")
 async def list_indent_slips(
+    request: Request,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     query = select(IndentSlip)
     if status:
         query = query.where(IndentSlip.status == status)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "store-indent-slips")
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -90,21 +106,22 @@ async def list_indent_slips(
 async def create_indent_slip(
     item_name: str, qty_required: float, indent_date: date,
     requesting_department: Optional[str] = None, purpose: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(IndentSlip.id)))
-    count = result.scalar() or 0
-    indent_number = f"IND-{date.today().year}-{count + 1:04d}"
+    indent_number = await sequence_service.next_number("IND", IndentSlip.indent_number)
     
-    indent = IndentSlip(
-        id=str(uuid.uuid4()), indent_number=indent_number, indent_date=indent_date,
-        item_name=item_name, qty_required=qty_required,
-        requesting_department=requesting_department, purpose=purpose
-    )
-    db.add(indent)
-    await db.commit()
-    await db.refresh(indent)
-    return indent
+    async def unit(db: AsyncSession):
+        indent = IndentSlip(
+            id=str(uuid.uuid4()), indent_number=indent_number, indent_date=indent_date,
+            item_name=item_name, qty_required=qty_required,
+            requesting_department=requesting_department, purpose=purpose
+        )
+        db.add(indent)
+        await db.flush()
+        await db.refresh(indent)
+        return indent
+    
+    return await write_queue.submit(unit)
 
 
 @router.put("/indent-slips/{indent_id}")
@@ -134,9 +151,15 @@ async def update_indent_slip(
 
 @router.get("/outward")
 async def list_outward(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(OutwardRegister))
+    query = select(OutwardRegister)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "store-outward")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -145,30 +168,37 @@ async def create_outward(
     item_name: str, customer_name: str, dispatch_qty: float, outward_date: date,
     batch_no: Optional[str] = None, bill_no: Optional[str] = None,
     transporter: Optional[str] = None, vehicle_no: Optional[str] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(OutwardRegister.id)))
-    count = result.scalar() or 0
-    outward_number = f"OUT-{date.today().year}-{count + 1:04d}"
+    outward_number = await sequence_service.next_number("OUT", OutwardRegister.outward_number)
     
-    outward = OutwardRegister(
-        id=str(uuid.uuid4()), outward_number=outward_number, outward_date=outward_date,
-        item_name=item_name, customer_name=customer_name, dispatch_qty=dispatch_qty,
-        batch_no=batch_no, bill_no=bill_no, transporter=transporter, vehicle_no=vehicle_no
-    )
-    db.add(outward)
-    await db.commit()
-    await db.refresh(outward)
-    return outward
+    async def unit(db: AsyncSession):
+        outward = OutwardRegister(
+            id=str(uuid.uuid4()), outward_number=outward_number, outward_date=outward_date,
+            item_name=item_name, customer_name=customer_name, dispatch_qty=dispatch_qty,
+            batch_no=batch_no, bill_no=bill_no, transporter=transporter, vehicle_no=vehicle_no
+        )
+        db.add(outward)
+        await db.flush()
+        await db.refresh(outward)
+        return outward
+    
+    return await write_queue.submit(unit)
 
 
 # ==================== Stock Register Endpoints ====================
 
 @router.get("/stock")
 async def list_stock(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(StockRegister))
+    query = select(StockRegister)
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(query, fmt, "store-stock")
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -176,40 +206,46 @@ async def list_stock(
 async def create_stock_entry(
     item_id: str, item_name: str, warehouse_location: str,
     opening_balance: float = 0, reorder_level: Optional[float] = None,
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
-    stock = StockRegister(
-        id=str(uuid.uuid4()), item_id=item_id, item_name=item_name,
-        warehouse_location=warehouse_location, opening_balance=opening_balance,
-        closing_balance=opening_balance, reorder_level=reorder_level
-    )
-    db.add(stock)
-    await db.commit()
-    await db.refresh(stock)
-    return stock
+    async def unit(db: AsyncSession):
+        stock = StockRegister(
+            id=str(uuid.uuid4()), item_id=item_id, item_name=item_name,
+            warehouse_location=warehouse_location, opening_balance=opening_balance,
+            closing_balance=opening_balance, reorder_level=reorder_level
+        )
+        db.add(stock)
+        await db.flush()
+        await db.refresh(stock)
+        return stock
+    
+    return await write_queue.submit(unit)
 
 
 # ==================== Stats ====================
 
+STORE_STATS_MODELS = [MaterialInward, IndentSlip, OutwardRegister]
+
+
+async def load_store_stats(db: AsyncSession) -> dict:
+    """Counts shown on the store dashboard."""
+    return await fetch_counts(
+        db,
+        counts(MaterialInward, total_grn=None, pending_qc=MaterialInward.qc_status == "Pending"),
+        counts(IndentSlip, pending_indents=IndentSlip.status == "Pending"),
+        counts(OutwardRegister, total_dispatches=None)
+    )
+
+
 @router.get("/stats")
 async def get_store_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(MaterialInward.id)))
-    total_grn = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(MaterialInward.id)).where(MaterialInward.qc_status == "Pending"))
-    pending_qc = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(IndentSlip.id)).where(IndentSlip.status == "Pending"))
-    pending_indents = result.scalar() or 0
-    
-    result = await db.execute(select(func.count(OutwardRegister.id)))
-    total_dispatches = result.scalar() or 0
-    
-    return {
-        "total_grn": total_grn,
-        "pending_qc": pending_qc,
-        "pending_indents": pending_indents,
-        "total_dispatches": total_dispatches
-    }
+    """Get store statistics; 304 while the counted tables are unchanged."""
+    return await versioned_response(
+        request, STORE_STATS_MODELS, lambda: run_in_read_session(load_store_stats)
+    )
+
+
+kpi_broadcaster.register("store", STORE_STATS_MODELS, load_store_stats)
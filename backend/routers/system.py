@@ -0,0 +1,60 @@
+"""System administration router."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import engine, sqlite_profile, get_sqlite_settings, get_read_db, write_queue
+from models import User
+from utils.auth import check_permission
+from utils.extraction import extraction_pipeline, extraction_status_counts
+from utils.kpi_stream import kpi_broadcaster
+from utils.table_versions import response_cache
+
+
+router = APIRouter(prefix="/api/system", tags=["System"])
+
+
+@router.get("/database")
+async def get_database_settings(
+    current_user: User = Depends(check_permission("system.admin"))
+):
+    """Get the configured and effective SQLite connection profile."""
+    return {
+        "dialect": engine.dialect.name,
+        "tuning_enabled": settings.SQLITE_TUNING_ENABLED,
+        "configured": sqlite_profile(),
+        "effective": await get_sqlite_settings(),
+    }
+
+
+@router.get("/write-queue")
+async def get_write_queue_stats(
+    current_user: User = Depends(check_permission("system.admin"))
+):
+    """Get write queue depth and group-commit counters."""
+    return write_queue.stats()
+
+
+@router.get("/response-cache")
+async def get_response_cache_stats(
+    current_user: User = Depends(check_permission("system.admin"))
+):
+    """Get size and hit/miss counters of the versioned response cache."""
+    return response_cache.stats()
+
+
+@router.get("/kpi-stream")
+async def get_kpi_stream_stats(
+    current_user: User = Depends(check_permission("system.admin"))
+):
+    """Get KPI push subscribers and compute/broadcast counters."""
+    return kpi_broadcaster.stats()
+
+
+@router.get("/extraction")
+async def get_extraction_stats(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(check_permission("system.admin"))
+):
+    """Get the text extraction backlog (rows per status) and worker counters."""
+    return {**extraction_pipeline.stats(), "by_status": await extraction_status_counts(db)}
@@ -1,17 +1,18 @@
 """Training router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List, Optional
 from datetime import date, timedelta
 
-from database import get_db
+from database import get_db, get_read_db
 from models import TrainingMatrix, TrainingRecord, User
 from schemas import (
     TrainingMatrixCreate, TrainingMatrixResponse,
     TrainingRecordCreate, TrainingRecordResponse
 )
 from utils.auth import get_current_user
+from utils.streaming import stream_format, stream_query
 
 
 router = APIRouter(prefix="/api", tags=["Training"])
@@ -21,8 +22,10 @@ router = APIRouter(prefix="/api", tags=["Training"])
 
 @router.get("/training-matrix", response_model=List[TrainingMatrixResponse])
 async def get_training_matrix(
+    request: Request,
     role_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get training matrix."""
@@ -31,6 +34,12 @@ async def get_training_matrix(
     if role_id:
         query = query.where(TrainingMatrix.role_id == role_id)
     
+    fmt = stream_format(request, format)
+    
+    if fmt:
+    
+        return stream_query(query, fmt, "training-matrix")
+    
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -53,9 +62,11 @@ async def create_training_matrix(
 
 @router.get("/training-records", response_model=List[TrainingRecordResponse])
 async def get_training_records(
+    request: Request,
     employee_id: Optional[str] = None,
     is_certified: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get training records."""
@@ -66,6 +77,12 @@ async def get_training_records(
     if is_certified is not None:
         query = query.where(TrainingRecord.is_certified == is_certified)
     
+    fmt = stream_format(request, format)
+    
+    if fmt:
+    
+        return stream_query(query, fmt, "training-records")
+    
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -87,7 +104,7 @@ async def create_training_record(
 @router.get("/trainings/{employee_id}")
 async def get_employee_trainings(
     employee_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all trainings for an employee."""
@@ -102,7 +119,7 @@ async def get_employee_trainings(
 @router.get("/certifications/expiring")
 async def get_expiring_certifications(
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get certifications expiring within specified days."""
@@ -1,17 +1,21 @@
 """Users and Roles router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
-from database import get_db
+from database import get_db, get_read_db
 from models import User, Role, AuditLog
 from schemas import (
     UserCreate, UserUpdate, UserResponse,
-    RoleCreate, RoleResponse
+    RoleCreate, RoleUpdate, RoleResponse
 )
-from utils.auth import get_current_user, get_password_hash
+from utils.auth import (
+    check_permission, get_current_user, get_password_hash_async, invalidate_principal
+)
+from utils.pagination import keyset_page, page_results
+from utils.permissions import permission_registry
 
 
 router = APIRouter(prefix="/api", tags=["Users & Roles"])
@@ -20,7 +24,7 @@ router = APIRouter(prefix="/api", tags=["Users & Roles"])
 # ==================== Roles ====================
 
 @router.get("/roles", response_model=List[RoleResponse])
-async def get_roles(db: AsyncSession = Depends(get_db)):
+async def get_roles(db: AsyncSession = Depends(get_read_db)):
     """Get all roles."""
     result = await db.execute(select(Role))
     return result.scalars().all()
@@ -30,7 +34,7 @@ async def get_roles(db: AsyncSession = Depends(get_db)):
 async def create_role(
     role_data: RoleCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(check_permission("roles.create"))
 ):
     """Create a new role."""
     # Check if role name exists
@@ -42,12 +46,13 @@ async def create_role(
     db.add(role)
     await db.commit()
     await db.refresh(role)
+    await permission_registry.reload(db)
     
     return role
 
 
 @router.get("/roles/{role_id}", response_model=RoleResponse)
-async def get_role(role_id: str, db: AsyncSession = Depends(get_db)):
+async def get_role(role_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific role."""
     result = await db.execute(select(Role).where(Role.id == role_id))
     role = result.scalar_one_or_none()
@@ -56,15 +61,43 @@ async def get_role(role_id: str, db: AsyncSession = Depends(get_db)):
     return role
 
 
+@router.put("/roles/{role_id}", response_model=RoleResponse)
+async def update_role(
+    role_id: str,
+    role_data: RoleUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(check_permission("roles.update"))
+):
+    """Update a role and reload compiled permissions."""
+    result = await db.execute(select(Role).where(Role.id == role_id))
+    role = result.scalar_one_or_none()
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    
+    update_data = role_data.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(role, field, value)
+    
+    await db.commit()
+    await db.refresh(role)
+    await permission_registry.reload(db)
+    # Cached principals carry the old role object
+    invalidate_principal()
+    
+    return role
+
+
 # ==================== Users ====================
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     is_active: Optional[bool] = None,
     role_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all users with optional filters."""
@@ -75,9 +108,9 @@ async def get_users(
     if role_id:
         query = query.where(User.role_id == role_id)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, User.created_at, User.id, cursor, skip, limit, descending=False)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -100,7 +133,7 @@ async def create_user(
     user = User(
         email=user_data.email,
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         department=user_data.department,
@@ -116,7 +149,7 @@ async def create_user(
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific user."""
@@ -148,6 +181,7 @@ async def update_user(
     
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(user.id)
     
     return user
 
@@ -166,6 +200,7 @@ async def delete_user(
     
     user.is_active = False
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "User deactivated successfully"}
 
@@ -174,21 +209,23 @@ async def delete_user(
 
 @router.get("/audit-logs")
 async def get_audit_logs(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     user_id: Optional[str] = None,
     table_name: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get audit logs."""
-    query = select(AuditLog).order_by(AuditLog.timestamp.desc())
+    query = select(AuditLog)
     
     if user_id:
         query = query.where(AuditLog.user_id == user_id)
     if table_name:
         query = query.where(AuditLog.table_name == table_name)
     
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, AuditLog.timestamp, AuditLog.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "timestamp")
@@ -1,57 +1,62 @@
 """Work Orders router."""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_read_db, write_queue
 from models import WorkOrder, WorkOrderOperation, Item, Routing, User
 from schemas import WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse
 from utils.auth import get_current_user
+from utils.pagination import keyset_page, page_results
+from utils.sequences import sequence_service
 
 
 router = APIRouter(prefix="/api/work-orders", tags=["Work Orders"])
 
 
-def generate_wo_number(count: int) -> str:
-    year = datetime.now().year
-    return f"WO-{year}-{count + 1:05d}"
+async def generate_wo_number() -> str:
+    return await sequence_service.next_number("WO", WorkOrder.work_order_number, width=5)
 
 
 @router.get("", response_model=List[WorkOrderResponse])
 async def get_work_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = select(WorkOrder).order_by(WorkOrder.created_at.desc())
+    query = select(WorkOrder)
     if status:
         query = query.where(WorkOrder.status == status)
-    query = query.offset(skip).limit(limit)
+    query = keyset_page(query, WorkOrder.created_at, WorkOrder.id, cursor, skip, limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    return page_results(response, result.scalars().all(), limit, "created_at")
 
 
 @router.post("", response_model=WorkOrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_work_order(
     wo_data: WorkOrderCreate,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(func.count(WorkOrder.id)))
-    count = result.scalar() or 0
-    wo = WorkOrder(work_order_number=generate_wo_number(count), created_by=current_user.id, **wo_data.model_dump())
-    db.add(wo)
-    await db.commit()
-    await db.refresh(wo)
-    return wo
+    work_order_number = await generate_wo_number()
+    
+    async def unit(db: AsyncSession):
+        wo = WorkOrder(work_order_number=work_order_number, created_by=current_user.id, **wo_data.model_dump())
+        db.add(wo)
+        await db.flush()
+        await db.refresh(wo)
+        return wo
+    
+    return await write_queue.submit(unit)
 
 
 @router.get("/{wo_id}", response_model=WorkOrderResponse)
-async def get_work_order(wo_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_work_order(wo_id: str, db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)):
     result = await db.execute(select(WorkOrder).where(WorkOrder.id == wo_id))
     wo = result.scalar_one_or_none()
     if not wo:
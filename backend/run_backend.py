@@ -3,13 +3,15 @@
 Script to run the backend server with proper initialization
 """
 import asyncio
-import uvicorn
-from database import init_db
-from seed import seed_data
 
 
 async def setup_and_run():
     """Initialize database and seed data if needed"""
+    # Imported here: the extraction workers import this script on start,
+    # and must not load the database, models and seed data with it
+    from database import init_db
+    from seed import seed_data
+    
     print("Initializing database...")
     await init_db()
     
@@ -20,6 +22,8 @@ async def setup_and_run():
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     # Run setup
     asyncio.run(setup_and_run())
     
@@ -8,7 +8,17 @@ from datetime import datetime, date
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
@@ -39,6 +49,12 @@ class RoleCreate(RoleBase):
     pass
 
 
+class RoleUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    permissions: Optional[dict] = None
+
+
 class RoleResponse(RoleBase):
     id: str
     created_at: datetime
@@ -111,6 +127,11 @@ class DocumentResponse(DocumentBase):
         from_attributes = True
 
 
+class DocumentSearchHit(DocumentResponse):
+    rank: float  # bm25, lower is a better match
+    snippet: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+
+
 # ==================== Training Schemas ====================
 
 class TrainingMatrixBase(BaseModel):
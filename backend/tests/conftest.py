@@ -0,0 +1,90 @@
+"""Shared fixtures: the app on a throwaway database and upload directory.
+
+Settings are read from the environment when ``config`` is first imported,
+so they are set here before anything from the application is loaded.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMP_DIR = tempfile.mkdtemp(prefix="qms-tests-")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(TEMP_DIR, 'test.db')}",
+    "UPLOAD_DIR": os.path.join(TEMP_DIR, "uploads"),
+    "DEBUG": "false",
+    "BCRYPT_ROUNDS": "4",
+    # Background jobs would race the assertions on counters and indexes
+    "KPI_RECONCILE_INTERVAL_SECONDS": "0",
+    "EXTRACTION_WORKERS": "0",
+})
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "Admin@123"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Client for the app with its lifespan (seeding, write queue) running."""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def run(client):
+    """Run ``func(*args)`` on the app's event loop and return its result."""
+    def call(func, *args):
+        return client.portal.call(func, *args)
+    return call
+
+
+@pytest.fixture(scope="session")
+def login(client):
+    """Log the seeded admin in; returns the token pair."""
+    def call() -> dict:
+        response = client.post(
+            "/api/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+    return call
+
+
+@pytest.fixture(scope="session")
+def headers(login):
+    """Authorization header of the seeded admin."""
+    return {"Authorization": f"Bearer {login()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def make_user(client, headers):
+    """Register a user with a seeded non-admin role; returns it with its password."""
+    def call() -> tuple:
+        roles = client.get("/api/roles", headers=headers).json()
+        role_id = next(role["id"] for role in roles if role["name"] != "System Admin")
+        name = f"user-{uuid.uuid4().hex[:8]}"
+        password = "Secret@123"
+        response = client.post("/api/auth/register", json={
+            "email": f"{name}@example.com",
+            "username": name,
+            "password": password,
+            "role_id": role_id,
+        })
+        assert response.status_code == 201, response.text
+        return response.json(), password
+    return call
@@ -0,0 +1,60 @@
+"""Refresh token rotation and single use."""
+import asyncio
+
+import httpx
+
+from main import app
+
+
+def refresh(client, token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_the_pair(client, login):
+    tokens = login()
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert me.status_code == 200
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_refresh_token_is_single_use(client, login):
+    token = login()["refresh_token"]
+    assert refresh(client, token).status_code == 200
+    assert refresh(client, token).status_code == 401
+
+
+def test_access_token_is_not_a_refresh_token(client, login):
+    assert refresh(client, login()["access_token"]).status_code == 401
+
+
+def test_concurrent_reuse_gets_one_pair(client, login, run):
+    token = login()["refresh_token"]
+
+    async def refresh_concurrently():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post("/api/auth/refresh", json={"refresh_token": token})
+                for _ in range(5)
+            ))
+
+    statuses = sorted(response.status_code for response in run(refresh_concurrently))
+    assert statuses == [200, 401, 401, 401, 401]
+
+
+def test_logout_revokes_the_refresh_token(client, login):
+    tokens = login()
+    response = client.post(
+        "/api/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert response.status_code == 200
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
@@ -0,0 +1,47 @@
+"""bcrypt cost calibration and re-hashing on login."""
+import pytest
+from sqlalchemy import select
+
+from database import run_in_read_session
+from models import User
+from utils import auth
+
+
+def stored_hash(run, username: str) -> str:
+    async def load(db):
+        result = await db.execute(select(User.password_hash).where(User.username == username))
+        return result.scalar_one()
+    return run(run_in_read_session, load)
+
+
+def login_as(client, username: str, password: str) -> None:
+    response = client.post("/api/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200
+
+
+def test_calibration_stays_within_bounds():
+    assert auth.calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=6) == 4
+    assert auth.calibrate_bcrypt_rounds(60_000, min_rounds=4, max_rounds=6) == 6
+
+
+@pytest.fixture
+def rounds():
+    active = auth.bcrypt_rounds
+    yield auth.set_bcrypt_rounds
+    auth.set_bcrypt_rounds(active)
+
+
+def test_login_rehashes_with_a_changed_cost(client, run, make_user, rounds):
+    user, password = make_user()
+    original = stored_hash(run, user["username"])
+    assert auth.get_hash_rounds(original) == auth.bcrypt_rounds
+
+    login_as(client, user["username"], password)
+    assert stored_hash(run, user["username"]) == original
+
+    rounds(auth.bcrypt_rounds + 1)
+    login_as(client, user["username"], password)
+    rehashed = stored_hash(run, user["username"])
+    assert auth.get_hash_rounds(rehashed) == auth.bcrypt_rounds
+    login_as(client, user["username"], password)
+    assert stored_hash(run, user["username"]) == rehashed
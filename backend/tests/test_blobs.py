@@ -0,0 +1,81 @@
+"""Blob store reference counts and garbage collection."""
+import hashlib
+import os
+import uuid
+
+from database import run_in_read_session, write_queue
+from models import Blob
+from utils.blobs import blob_path, collect_garbage
+
+
+def create_document(client, headers) -> str:
+    response = client.post(
+        "/api/documents", json={"title": "Blob doc", "document_type": "SOP"}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def upload(client, headers, doc_id: str, content: bytes, name: str = "file.txt"):
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"file": (name, content)}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ref_count(run, sha256: str):
+    async def load(db):
+        blob = await db.get(Blob, sha256)
+        return None if blob is None else blob.ref_count
+    return run(run_in_read_session, load)
+
+
+def test_identical_uploads_share_one_blob(client, headers, run):
+    content = f"shared {uuid.uuid4()}".encode()
+    sha256 = hashlib.sha256(content).hexdigest()
+    first, second = create_document(client, headers), create_document(client, headers)
+
+    assert upload(client, headers, first, content)["sha256"] == sha256
+    upload(client, headers, second, content, name="copy.txt")
+    upload(client, headers, second, content, name="again.txt")
+
+    assert ref_count(run, sha256) == 3
+    assert os.path.exists(blob_path(sha256))
+
+
+def test_garbage_collection_keeps_referenced_blobs(client, headers, run):
+    content = f"collected {uuid.uuid4()}".encode()
+    sha256 = hashlib.sha256(content).hexdigest()
+    first, second = create_document(client, headers), create_document(client, headers)
+    upload(client, headers, first, content)
+    upload(client, headers, second, content)
+
+    assert client.delete(f"/api/documents/{first}", headers=headers).status_code == 200
+    assert ref_count(run, sha256) == 1
+    run(collect_garbage, 0)
+    assert os.path.exists(blob_path(sha256))
+
+    assert client.delete(f"/api/documents/{second}", headers=headers).status_code == 200
+    assert ref_count(run, sha256) == 0
+    # Within the grace period an unreferenced blob is kept for reuse
+    run(collect_garbage, 3600)
+    assert os.path.exists(blob_path(sha256))
+    assert run(collect_garbage, 0) >= 1
+    assert ref_count(run, sha256) is None
+    assert not os.path.exists(blob_path(sha256))
+
+
+def test_garbage_collection_recomputes_drifted_counts(client, headers, run):
+    content = f"drifted {uuid.uuid4()}".encode()
+    sha256 = hashlib.sha256(content).hexdigest()
+    upload(client, headers, create_document(client, headers), content)
+
+    async def drift(session):
+        blob = await session.get(Blob, sha256)
+        blob.ref_count = 0
+
+    run(write_queue.submit, drift)
+    run(collect_garbage, 0)
+    assert ref_count(run, sha256) == 1
+    assert os.path.exists(blob_path(sha256))
@@ -0,0 +1,131 @@
+"""Multi-level BOM explosion: quantities, cycles and cache invalidation."""
+import uuid
+
+from utils import bom
+
+
+def make_items(client, headers, *names) -> dict:
+    prefix = uuid.uuid4().hex[:6]
+    items = {}
+    for name in names:
+        code = f"BOM-{prefix}-{name}"
+        response = client.post(
+            "/api/items", json={"item_code": code, "description": name}, headers=headers
+        )
+        assert response.status_code == 201
+        items[name] = response.json()["id"]
+    return items
+
+
+def add_line(client, headers, parent: str, component: str, quantity: float, sequence=10):
+    response = client.post("/api/boms", params={
+        "parent_item_id": parent,
+        "component_item_id": component,
+        "quantity": quantity,
+        "sequence": sequence,
+    }, headers=headers)
+    assert response.status_code == 200
+
+
+def explode(client, headers, item_id: str) -> dict:
+    response = client.get(f"/api/boms/{item_id}/explosion", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def totals(explosion: dict) -> dict:
+    return {total["component_item_id"]: total["extended_quantity"] for total in explosion["totals"]}
+
+
+def test_quantities_multiply_down_the_tree(client, headers):
+    items = make_items(client, headers, "device", "assembly", "screw", "board")
+    add_line(client, headers, items["device"], items["assembly"], 2, sequence=10)
+    add_line(client, headers, items["device"], items["screw"], 4, sequence=20)
+    add_line(client, headers, items["assembly"], items["screw"], 3, sequence=10)
+    add_line(client, headers, items["assembly"], items["board"], 1, sequence=20)
+
+    explosion = explode(client, headers, items["device"])
+    assert explosion["levels"] == 2
+    assert not explosion["has_cycles"]
+    assert [(line["level"], line["component_item_id"]) for line in explosion["lines"]] == [
+        (1, items["assembly"]), (2, items["screw"]), (2, items["board"]), (1, items["screw"])
+    ]
+    assert totals(explosion) == {items["screw"]: 10.0, items["board"]: 2.0}
+
+    # Subassemblies cached from the parent's explosion match their own
+    assembly = explode(client, headers, items["assembly"])
+    assert totals(assembly) == {items["screw"]: 3.0, items["board"]: 1.0}
+
+
+def test_parents_reuse_memoized_subassemblies(client, headers, monkeypatch):
+    items = make_items(client, headers, "device", "assembly", "screw", "board")
+    add_line(client, headers, items["device"], items["assembly"], 2, sequence=10)
+    add_line(client, headers, items["device"], items["screw"], 4, sequence=20)
+    add_line(client, headers, items["assembly"], items["screw"], 3, sequence=10)
+    add_line(client, headers, items["assembly"], items["board"], 1, sequence=20)
+    explode(client, headers, items["assembly"])
+
+    queries = []
+    explosion_query = bom._explosion_query
+
+    def spy(item_id, stop_at=()):
+        queries.append((item_id, set(stop_at)))
+        return explosion_query(item_id, stop_at)
+
+    monkeypatch.setattr(bom, "_explosion_query", spy)
+    explosion = explode(client, headers, items["device"])
+    # One query, which stops at the already exploded assembly
+    assert [item_id for item_id, _ in queries] == [items["device"]]
+    assert items["assembly"] in queries[0][1]
+    assert [(line["level"], line["component_item_id"]) for line in explosion["lines"]] == [
+        (1, items["assembly"]), (2, items["screw"]), (2, items["board"]), (1, items["screw"])
+    ]
+    assert [line["extended_quantity"] for line in explosion["lines"]] == [2.0, 6.0, 2.0, 4.0]
+    assert totals(explosion) == {items["screw"]: 10.0, items["board"]: 2.0}
+
+
+def test_subassemblies_cut_off_by_the_depth_guard_are_exploded_again(client, headers):
+    names = [f"c{level}" for level in range(bom.MAX_LEVELS + 2)]
+    items = make_items(client, headers, *names)
+    for parent, component in zip(names, names[1:]):
+        add_line(client, headers, items[parent], items[component], 1)
+
+    assert explode(client, headers, items["c0"])["levels"] == bom.MAX_LEVELS
+    # Reached only down to the guard from c0, but complete from c1 itself
+    explosion = explode(client, headers, items["c1"])
+    assert explosion["levels"] == bom.MAX_LEVELS
+    assert explosion["lines"][-1]["component_item_id"] == items[names[-1]]
+    assert explode(client, headers, items["c2"])["levels"] == bom.MAX_LEVELS - 1
+
+
+def test_cycles_are_flagged_not_expanded(client, headers):
+    items = make_items(client, headers, "a", "b", "c", "leaf")
+    add_line(client, headers, items["a"], items["b"], 1)
+    add_line(client, headers, items["b"], items["c"], 2)
+    add_line(client, headers, items["c"], items["a"], 1)
+    add_line(client, headers, items["c"], items["leaf"], 5, sequence=20)
+
+    explosion = explode(client, headers, items["a"])
+    assert explosion["has_cycles"]
+    cycles = [line for line in explosion["lines"] if line["cycle"]]
+    assert [(line["level"], line["component_item_id"]) for line in cycles] == [(3, items["a"])]
+    assert totals(explosion) == {items["leaf"]: 10.0}
+
+    self_reference = make_items(client, headers, "self")["self"]
+    add_line(client, headers, self_reference, self_reference, 1)
+    explosion = explode(client, headers, self_reference)
+    assert [line["cycle"] for line in explosion["lines"]] == [True]
+
+
+def test_new_lines_invalidate_cached_explosions(client, headers):
+    items = make_items(client, headers, "top", "part", "extra")
+    add_line(client, headers, items["top"], items["part"], 1)
+    assert totals(explode(client, headers, items["top"])) == {items["part"]: 1.0}
+
+    add_line(client, headers, items["part"], items["extra"], 3)
+    assert totals(explode(client, headers, items["top"])) == {items["extra"]: 3.0}
+
+
+def test_unknown_item_is_404(client, headers):
+    response = client.get(f"/api/boms/{uuid.uuid4()}/explosion", headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+"""Revision diffs of extracted text and the diff cache."""
+import difflib
+import json
+import uuid
+
+from utils.diffs import diff_cache, diff_texts, unified_lines
+from utils.extraction import ExtractionPipeline
+
+OLD = "\n".join(f"Step {n}: check the seal" for n in range(1, 21))
+NEW = OLD.replace("Step 5: check the seal", "Step 5: check the torque") + "\nStep 21: sign off"
+
+
+def test_hunks_match_difflib():
+    stats, hunks = diff_texts(OLD, NEW)
+    assert stats == {"old_lines": 20, "new_lines": 21, "added": 1, "removed": 0, "changed": 1}
+    assert [(hunk["old_start"], hunk["new_start"]) for hunk in hunks] == [(2, 2), (18, 18)]
+
+    replace = next(c for c in hunks[0]["changes"] if c["op"] == "replace")
+    assert ("delete", "seal") in replace["words"] and ("insert", "torque") in replace["words"]
+
+    ours = [line for chunk in unified_lines("a", "b", hunks) for line in chunk.splitlines()]
+    theirs = list(difflib.unified_diff(OLD.splitlines(), NEW.splitlines(), "a", "b", lineterm=""))
+    # difflib leaves out ",1" lengths in hunk headers; the bodies are identical
+    def body(lines):
+        return [line for line in lines if not line.startswith("@@")]
+
+    assert body(ours) == body(theirs)
+
+
+def test_identical_texts_have_no_hunks():
+    assert diff_texts(OLD, OLD)[1] == []
+
+
+def upload_version(client, headers, doc_id: str, text: str) -> str:
+    response = client.post(
+        f"/api/documents/{doc_id}/upload",
+        files={"file": ("procedure.txt", text.encode())}, headers=headers
+    )
+    assert response.status_code == 200
+    return client.get(f"/api/documents/{doc_id}/versions", headers=headers).json()[0]["id"]
+
+
+def test_diff_endpoint_streams_and_caches(client, headers, run):
+    pipeline = ExtractionPipeline(max_workers=1, tasks_per_child=1)
+    doc_id = client.post(
+        "/api/documents", json={"title": "Diffed", "document_type": "SOP"}, headers=headers
+    ).json()["id"]
+    # Unique text, so the cache key is new to this run
+    marker = uuid.uuid4().hex
+    old_id = upload_version(client, headers, doc_id, f"{OLD}\n{marker}")
+    new_id = upload_version(client, headers, doc_id, f"{NEW}\n{marker}")
+    params = {"from_version": old_id, "to_version": new_id}
+
+    response = client.get("/api/documents/diff", params=params, headers=headers)
+    assert response.status_code == 409
+
+    for version_id in (old_id, new_id):
+        run(pipeline._process, version_id)
+    misses = diff_cache.misses
+    response = client.get("/api/documents/diff", params=params, headers=headers)
+    assert response.status_code == 200
+    header, *hunks = [json.loads(line) for line in response.text.splitlines()]
+    assert header["from"]["version_id"] == old_id and header["to"]["version_id"] == new_id
+    assert header["stats"]["changed"] == 1 and header["hunks"] == len(hunks) == 2
+    assert diff_cache.misses == misses + 1
+
+    hits = diff_cache.hits
+    unified = client.get(
+        "/api/documents/diff", params={**params, "format": "unified"}, headers=headers
+    )
+    assert diff_cache.hits == hits + 1
+    assert "-Step 5: check the seal\n+Step 5: check the torque\n" in unified.text
+
+    response = client.get(
+        "/api/documents/diff", params={**params, "to_version": str(uuid.uuid4())}, headers=headers
+    )
+    assert response.status_code == 404
@@ -0,0 +1,78 @@
+"""Document downloads: validators, conditional GET and byte ranges."""
+import hashlib
+import os
+
+import pytest
+
+from utils.downloads import parse_range
+
+CONTENT = os.urandom(200 * 1024)
+
+
+@pytest.fixture(scope="module")
+def document(client, headers) -> str:
+    doc_id = client.post(
+        "/api/documents", json={"title": "Download doc", "document_type": "SOP"}, headers=headers
+    ).json()["id"]
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"file": ("manual.bin", CONTENT)}, headers=headers
+    )
+    assert response.status_code == 200
+    return f"/api/documents/{doc_id}/download"
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_full_download_carries_validators(client, headers, document):
+    response = client.get(document, headers=headers)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert 'filename="manual.bin"' in response.headers["content-disposition"]
+
+    head = client.head(document, headers=headers)
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["content-length"] == str(len(CONTENT))
+
+
+def test_conditional_requests_get_304(client, headers, document):
+    response = client.get(document, headers=headers)
+    etag, modified = response.headers["etag"], response.headers["last-modified"]
+    assert client.get(document, headers={**headers, "If-None-Match": etag}).status_code == 304
+    assert client.get(document, headers={**headers, "If-Modified-Since": modified}).status_code == 304
+    # If-None-Match takes precedence over a matching date
+    response = client.get(
+        document, headers={**headers, "If-None-Match": '"other"', "If-Modified-Since": modified}
+    )
+    assert response.status_code == 200
+
+
+def test_ranges_resume_downloads(client, headers, document):
+    response = client.get(document, headers={**headers, "Range": "bytes=1000-1999"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[1000:2000]
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(CONTENT)}"
+
+    etag = response.headers["etag"]
+    resumed = client.get(document, headers={**headers, "Range": "bytes=-100", "If-Range": etag})
+    assert resumed.status_code == 206
+    assert resumed.content == CONTENT[-100:]
+    # A changed representation is sent whole
+    stale = client.get(document, headers={**headers, "Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == len(CONTENT)
+
+    response = client.get(document, headers={**headers, "Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
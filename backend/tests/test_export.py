@@ -0,0 +1,83 @@
+"""Streamed ZIP export of document files with a manifest."""
+import csv
+import hashlib
+import io
+import os
+import uuid
+import zipfile
+
+from utils.archives import ZipStream, safe_name
+from utils.blobs import blob_path
+
+
+def test_safe_name():
+    assert safe_name("SOP/001") == "SOP_001"
+    assert safe_name("..") == "file"
+    assert safe_name(None, default="unnamed") == "unnamed"
+
+
+def test_zip_stream_builds_a_valid_archive(tmp_path, run, client):
+    path = tmp_path / "report.txt"
+    path.write_bytes(b"line\n" * 100_000)
+
+    async def build():
+        archive = ZipStream()
+        parts = []
+        digest = hashlib.sha256()
+        async for data in archive.add_file("a/report.txt", str(path), digest=digest):
+            parts.append(data)
+        parts.append(archive.add_bytes("a/scan.pdf", b"%PDF-1.4"))
+        parts.append(archive.close())
+        return b"".join(parts), digest.hexdigest()
+
+    data, sha256 = run(build)
+    assert sha256 == hashlib.sha256(path.read_bytes()).hexdigest()
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.read("a/report.txt") == path.read_bytes()
+        assert archive.getinfo("a/report.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.getinfo("a/scan.pdf").compress_type == zipfile.ZIP_STORED
+
+
+def create_document(client, headers, document_type: str) -> str:
+    response = client.post("/api/documents", json={
+        "title": "Exported", "document_type": document_type
+    }, headers=headers)
+    return response.json()["id"]
+
+
+def upload(client, headers, doc_id: str, name: str, content: bytes) -> None:
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"file": (name, content)}, headers=headers
+    )
+    assert response.status_code == 200
+
+
+def test_export_lists_every_revision(client, headers):
+    document_type = f"EXP{uuid.uuid4().hex[:6]}"
+    first, second = (create_document(client, headers, document_type) for _ in range(2))
+    contents = [f"revision {n} {uuid.uuid4()}".encode() for n in range(3)]
+    upload(client, headers, first, "plan.txt", contents[0])
+    upload(client, headers, first, "plan.txt", contents[1])
+    upload(client, headers, second, "lost.txt", contents[2])
+    # A revision whose file is gone from storage is listed without a path
+    os.remove(blob_path(hashlib.sha256(contents[2]).hexdigest()))
+
+    response = client.get(
+        "/api/documents/export", params={"document_type": document_type}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        manifest = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+        assert len(manifest) == 3
+        for row in manifest:
+            if row["file_name"] == "lost.txt":
+                assert row["path"] == ""
+                continue
+            data = archive.read(row["path"])
+            assert row["path"] == f"{row['doc_number']}/rev{row['revision']}/plan.txt"
+            assert row["sha256"] == hashlib.sha256(data).hexdigest()
+            assert data in contents
+        assert len(archive.namelist()) == 3
@@ -0,0 +1,90 @@
+"""Text extraction: limits, the worker pool and the background pipeline."""
+import uuid
+
+from extractors import _TextBuffer, extract, is_supported
+from utils.extraction import ExtractionPipeline
+
+
+def test_buffer_truncates_only_when_input_is_dropped():
+    buffer = _TextBuffer(5)
+    assert buffer.add("abcde", separator="")
+    assert not buffer.truncated
+    assert not buffer.add("f", separator="")
+    assert buffer.truncated
+    assert buffer.text() == "abcde"
+
+
+def test_text_that_fills_the_limit_exactly(tmp_path):
+    path = tmp_path / "notes.txt"
+    # The first 64 KiB read fills the buffer; the rest must still count
+    path.write_text("a" * (128 * 1024))
+    result = extract(str(path), "notes.txt", 64 * 1024)
+    assert result["truncated"]
+    assert len(result["text"]) == 64 * 1024
+
+    path.write_text("b" * 100)
+    result = extract(str(path), "notes.txt", 100)
+    assert not result["truncated"]
+    assert result["text"] == "b" * 100
+
+
+def test_supported_formats():
+    assert is_supported("Plan.TXT")
+    assert is_supported("report.pdf")
+    assert not is_supported("image.bin")
+
+
+def test_worker_pool_runs_extractions(tmp_path):
+    path = tmp_path / "worker.txt"
+    path.write_text("from a worker process")
+    executor = ExtractionPipeline(max_workers=1, tasks_per_child=1)._new_executor()
+    try:
+        result = executor.submit(extract, str(path), "worker.txt", 100).result(timeout=60)
+    finally:
+        executor.shutdown()
+    assert result["text"] == "from a worker process"
+
+
+def upload(client, headers, name: str, content: bytes) -> tuple:
+    doc_id = client.post(
+        "/api/documents", json={"title": "Extracted", "document_type": "SOP"}, headers=headers
+    ).json()["id"]
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"file": (name, content)}, headers=headers
+    )
+    assert response.status_code == 200
+    versions = client.get(f"/api/documents/{doc_id}/versions", headers=headers).json()
+    return doc_id, versions[0]["id"]
+
+
+def extracted(client, headers, doc_id: str, version_id: str) -> dict:
+    response = client.get(
+        f"/api/documents/{doc_id}/versions/{version_id}/text", headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_pipeline_stores_reuses_and_indexes_text(client, headers, run):
+    # Not started: with no executor the parse runs on the default threadpool
+    pipeline = ExtractionPipeline(max_workers=1, tasks_per_child=1)
+    word = f"zx{uuid.uuid4().hex[:8]}"
+    content = f"Calibration record {word}".encode()
+
+    first = upload(client, headers, "record.txt", content)
+    assert extracted(client, headers, *first)["status"] == "pending"
+    run(pipeline._process, first[1])
+    text = extracted(client, headers, *first)
+    assert text["status"] == "done"
+    assert text["text"] == content.decode()
+    hits = client.get("/api/documents/search", params={"q": word}, headers=headers).json()
+    assert [hit["id"] for hit in hits] == [first[0]]
+
+    second = upload(client, headers, "copy.txt", content)
+    run(pipeline._process, second[1])
+    assert extracted(client, headers, *second)["text"] == content.decode()
+    assert pipeline.reused == 1 and pipeline.completed == 1
+
+    binary = upload(client, headers, "blob.bin", b"\x00\x01")
+    run(pipeline._process, binary[1])
+    assert extracted(client, headers, *binary)["status"] == "unsupported"
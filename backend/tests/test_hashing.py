@@ -0,0 +1,44 @@
+"""Bounded password hashing pool: fail fast with 503 when saturated."""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from utils.hashing import HashingService, hashing_service
+
+
+def test_calls_beyond_the_pending_cap_are_rejected():
+    service = HashingService(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(service.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as raised:
+            await service.run(lambda: None)
+        release.set()
+        assert await running
+        return raised.value
+
+    try:
+        rejected = asyncio.run(scenario())
+    finally:
+        release.set()
+        service.shutdown()
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    assert service.stats()["rejected"] == 1
+    assert service.stats()["in_flight"] == 0
+
+
+def test_login_is_503_while_the_pool_is_saturated(client, headers, monkeypatch):
+    rejected = hashing_service.rejected
+    monkeypatch.setattr(hashing_service, "max_pending", 0)
+    response = client.post("/api/auth/login", data={"username": "admin", "password": "Admin@123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    monkeypatch.undo()
+
+    stats = client.get("/api/auth/hashing-stats", headers=headers).json()
+    assert stats["rejected"] == rejected + 1
@@ -0,0 +1,63 @@
+"""KPI counters against a full recount."""
+import uuid
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import select, update
+
+from database import run_in_read_session, write_queue
+from models import KPICounter, Nonconformance
+from utils.kpi_counters import reconcile_kpi_counters
+
+
+async def counters_and_recount(db):
+    result = await db.execute(
+        select(KPICounter.status, KPICounter.count).where(KPICounter.entity == "nc")
+    )
+    stored = {status: count for status, count in result.all() if count}
+    result = await db.execute(select(Nonconformance.status))
+    return stored, dict(Counter(status for status in result.scalars() if status is not None))
+
+
+def create_nc(client, headers) -> str:
+    response = client.post("/api/nonconformances", json={
+        "title": f"KPI NC {uuid.uuid4().hex[:6]}",
+        "description": "d",
+        "discovered_date": date.today().isoformat(),
+    }, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_counters_follow_creates_and_status_changes(client, headers, run):
+    ids = [create_nc(client, headers) for _ in range(3)]
+    for nc_id, status in zip(ids, ["Under Investigation", "Closed"]):
+        response = client.put(
+            f"/api/nonconformances/{nc_id}", json={"status": status}, headers=headers
+        )
+        assert response.status_code == 200
+
+    stored, actual = run(run_in_read_session, counters_and_recount)
+    assert stored == actual
+    assert run(reconcile_kpi_counters) == 0
+
+    kpis = client.get("/api/dashboard/kpis", headers=headers).json()
+    assert kpis["open_ncs"] == actual.get("Open", 0) + actual.get("Under Investigation", 0)
+
+
+def test_reconcile_corrects_writes_that_bypass_the_orm(client, headers, run):
+    nc_id = create_nc(client, headers)
+
+    async def bypass(session):
+        # Core statements skip the flush hook that maintains the counters
+        await session.execute(
+            update(Nonconformance).where(Nonconformance.id == nc_id).values(status="Rejected")
+        )
+
+    run(write_queue.submit, bypass)
+    stored, actual = run(run_in_read_session, counters_and_recount)
+    assert stored != actual
+
+    assert run(reconcile_kpi_counters) > 0
+    stored, actual = run(run_in_read_session, counters_and_recount)
+    assert stored == actual
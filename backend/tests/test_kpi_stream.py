@@ -0,0 +1,67 @@
+"""KPI push stream: deltas on writes, coalescing and stream tokens."""
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from database import run_in_read_session
+from utils.auth import get_stream_user
+from utils.kpi_stream import Subscriber, kpi_broadcaster
+
+
+def create_nc(client, headers):
+    response = client.post("/api/nonconformances", json={
+        "title": "Stream NC", "description": "d", "discovered_date": date.today().isoformat()
+    }, headers=headers)
+    assert response.status_code == 201
+
+
+def test_slow_subscribers_get_merged_changes():
+    subscriber = Subscriber(["dashboard"])
+    subscriber.offer("dashboard", {"open_ncs": 1, "open_capas": 4})
+    subscriber.offer("dashboard", {"open_ncs": 2})
+    subscriber.offer("hr", {"total_employees": 9})
+    assert subscriber.coalesced == 1
+    assert subscriber.take() == {"dashboard": {"open_ncs": 2, "open_capas": 4}}
+    assert subscriber.take() == {}
+
+
+def test_writes_are_broadcast_as_deltas(client, headers, run):
+    subscriber = kpi_broadcaster.subscribe(["dashboard"])
+    run(kpi_broadcaster.attach, subscriber)
+    try:
+        initial = subscriber.take()["dashboard"]
+        assert {"open_ncs", "open_capas", "open_work_orders"} <= set(initial)
+
+        create_nc(client, headers)
+        create_nc(client, headers)
+        # The loop may already have picked the writes up; this makes sure
+        run(kpi_broadcaster._refresh, "dashboard")
+        assert subscriber.take() == {"dashboard": {"open_ncs": initial["open_ncs"] + 2}}
+    finally:
+        kpi_broadcaster.unsubscribe(subscriber)
+
+
+def stream_user(run, token: str):
+    async def load(db):
+        return await get_stream_user(None, token, db)
+    return run(run_in_read_session, load)
+
+
+def test_only_stream_tokens_open_streams(client, login, run):
+    access_token = login()["access_token"]
+    response = client.post(
+        "/api/dashboard/stream-token", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    stream_token = response.json()["stream_token"]
+
+    assert stream_user(run, stream_token).username == "admin"
+    with pytest.raises(HTTPException) as raised:
+        stream_user(run, access_token)
+    assert raised.value.status_code == 401
+    response = client.get("/api/dashboard/stream", params={"stream_token": access_token})
+    assert response.status_code == 401
+
+    # Nor is a stream token accepted anywhere else
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {stream_token}"})
+    assert response.status_code == 401
@@ -0,0 +1,71 @@
+"""Keyset cursors on list endpoints."""
+import uuid
+from datetime import date, datetime
+
+from utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    for value in (datetime(2024, 5, 1, 12, 30, 15, 250), date(2024, 5, 1), "SOP-0001", 7, None):
+        assert decode_cursor(encode_cursor(value, "row-id")) == (value, "row-id")
+
+
+def test_malformed_cursor_is_rejected(client, headers):
+    response = client.get("/api/items", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def walk(client, headers, path: str, params: dict) -> list:
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(path, params={**params, "cursor": cursor}, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_row_once(client, headers):
+    prefix = f"PG{uuid.uuid4().hex[:6]}"
+    codes = [f"{prefix}-{index}" for index in range(7)]
+    for code in reversed(codes):
+        response = client.post(
+            "/api/items", json={"item_code": code, "description": code}, headers=headers
+        )
+        assert response.status_code == 201
+
+    pages = walk(client, headers, "/api/items", {"search": prefix, "limit": 3})
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item["item_code"] for page in pages for item in page] == codes
+
+    offset = client.get(
+        "/api/items", params={"search": prefix, "limit": 3, "skip": 3}, headers=headers
+    )
+    assert offset.json() == pages[1]
+
+
+def test_rows_inserted_ahead_do_not_shift_pages(client, headers):
+    """Newest-first lists keep their place when new rows arrive."""
+    created = []
+    for index in range(5):
+        response = client.post("/api/nonconformances", json={
+            "title": f"Pagination NC {index}",
+            "description": "d",
+            "discovered_date": date.today().isoformat(),
+        }, headers=headers)
+        assert response.status_code == 201
+        created.append(response.json()["id"])
+
+    first = client.get("/api/nonconformances", params={"limit": 2}, headers=headers)
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    client.post("/api/nonconformances", json={
+        "title": "Arrived later", "description": "d", "discovered_date": date.today().isoformat()
+    }, headers=headers)
+    second = client.get(
+        "/api/nonconformances", params={"limit": 2, "cursor": cursor}, headers=headers
+    )
+
+    seen = [nc["id"] for nc in first.json() + second.json()]
+    assert seen == created[::-1][:4]
@@ -0,0 +1,45 @@
+"""Compiled role permissions and registry reloads on unknown roles."""
+import uuid
+
+from config import settings
+from database import write_queue
+from models import Role
+from utils.permissions import CompiledRole, permission_registry
+
+
+def test_compiled_role_matches_exact_and_wildcard_grants():
+    role = CompiledRole("r", "Inspector", {"nc.create": True, "capa.*": True, "nc.delete": False})
+    assert role.allows("nc.create")
+    assert role.allows("capa.close")
+    assert not role.allows("nc.delete")
+    assert not role.allows("capability.view")
+    assert CompiledRole("s", "Any", {"*": True}).allows("anything.at_all")
+
+
+def test_unknown_roles_reload_at_most_once_per_interval(client, run, monkeypatch):
+    reloads = []
+    reload = permission_registry.reload
+
+    async def counted(db=None):
+        reloads.append(db)
+        await reload(db)
+
+    monkeypatch.setattr(permission_registry, "reload", counted)
+    monkeypatch.setattr(permission_registry, "_loaded_at", 0.0)
+    missing = str(uuid.uuid4())
+    for _ in range(3):
+        assert run(permission_registry.resolve, missing) is None
+    assert len(reloads) == 1
+
+
+def test_roles_created_elsewhere_are_found_after_the_interval(client, run, monkeypatch):
+    role_id = str(uuid.uuid4())
+
+    async def create(session):
+        # Written without the reload /api/roles does, as another worker would
+        session.add(Role(id=role_id, name=f"Role {role_id[:8]}", permissions={"nc.view": True}))
+
+    run(write_queue.submit, create)
+    monkeypatch.setattr(settings, "ROLE_RELOAD_INTERVAL_SECONDS", 0)
+    role = run(permission_registry.resolve, role_id)
+    assert role is not None and role.allows("nc.view")
@@ -0,0 +1,39 @@
+"""Principal cache: one user lookup per token, dropped on user changes."""
+from utils.auth import principal_cache
+
+
+def bearer(client, username: str, password: str) -> dict:
+    response = client.post("/api/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_repeated_requests_reuse_the_principal(client, make_user):
+    user, password = make_user()
+    auth = bearer(client, user["username"], password)
+    assert client.get("/api/auth/me", headers=auth).status_code == 200
+    hits = principal_cache.hits
+    assert client.get("/api/auth/me", headers=auth).status_code == 200
+    assert principal_cache.hits > hits
+
+
+def test_password_change_refreshes_the_cached_principal(client, make_user):
+    user, password = make_user()
+    auth = bearer(client, user["username"], password)
+    assert client.get("/api/auth/me", headers=auth).status_code == 200
+
+    for current, new in [(password, "Changed@123"), ("Changed@123", "Again@1234")]:
+        # Checked against the cached principal's hash, which must be current
+        response = client.post("/api/auth/change-password", json={
+            "current_password": current, "new_password": new
+        }, headers=auth)
+        assert response.status_code == 200, response.text
+
+
+def test_deactivation_applies_to_cached_principals(client, headers, make_user):
+    user, password = make_user()
+    auth = bearer(client, user["username"], password)
+    assert client.get("/api/auth/me", headers=auth).status_code == 200
+
+    assert client.delete(f"/api/users/{user['id']}", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=auth).status_code == 400
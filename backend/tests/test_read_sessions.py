@@ -0,0 +1,55 @@
+"""Read-only sessions on the reader pool."""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+
+from database import ReadSessionLocal, reader_engine, run_in_read_session, write_queue
+from models import Item
+
+
+def test_reader_connections_reject_writes(client, run):
+    async def write(db):
+        await db.execute(update(Item).values(description="changed"))
+
+    with pytest.raises(OperationalError, match="readonly"):
+        run(run_in_read_session, write)
+
+
+def test_read_sessions_see_one_snapshot(client, run):
+    async def scenario():
+        async with ReadSessionLocal() as db:
+            before = await db.scalar(select(func.count()).select_from(Item))
+
+            async def insert(session):
+                session.add(Item(item_code=f"SNAP-{uuid.uuid4().hex[:8]}", description="s"))
+
+            await write_queue.submit(insert)
+            # Still inside the deferred read transaction started above
+            during = await db.scalar(select(func.count()).select_from(Item))
+        after = await run_in_read_session(
+            lambda db: db.scalar(select(func.count()).select_from(Item))
+        )
+        return before, during, after
+
+    before, during, after = run(scenario)
+    assert during == before
+    assert after == before + 1
+
+
+def test_concurrent_reads_use_separate_connections(client, run):
+    async def scenario():
+        peak = 0
+
+        async def hold(db):
+            nonlocal peak
+            await db.execute(select(1))
+            peak = max(peak, reader_engine.pool.checkedout())
+            await asyncio.sleep(0.05)
+
+        await asyncio.gather(*(run_in_read_session(hold) for _ in range(3)))
+        return peak
+
+    assert run(scenario) >= 3
@@ -0,0 +1,82 @@
+"""Full-text index kept in step with documents."""
+import uuid
+
+from database import write_queue
+from utils.search import index_content, match_expression, reconcile_search_index
+
+
+def search(client, headers, text: str) -> list:
+    response = client.get("/api/documents/search", params={"q": text}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def ids(hits: list) -> list:
+    return [hit["id"] for hit in hits]
+
+
+def test_match_expression_quotes_words():
+    assert match_expression("SOP-0001 steril") == '"SOP-0001" "steril"*'
+    assert match_expression('valid* "protocol"') == '"valid"* "protocol"*'
+    assert match_expression(" -- ") is None
+
+
+def test_index_follows_document_writes(client, headers):
+    word = f"zq{uuid.uuid4().hex[:8]}"
+    response = client.post("/api/documents", json={
+        "title": f"Sterilization {word} protocol", "document_type": "SOP"
+    }, headers=headers)
+    assert response.status_code == 201
+    doc_id = response.json()["id"]
+
+    hits = search(client, headers, word)
+    assert ids(hits) == [doc_id]
+    assert f"<mark>{word}</mark>" in hits[0]["snippet"]
+    assert ids(search(client, headers, word[:5])) == [doc_id]
+
+    renamed = f"zr{uuid.uuid4().hex[:8]}"
+    client.put(f"/api/documents/{doc_id}", json={"title": f"Cleaning {renamed}"}, headers=headers)
+    assert search(client, headers, word) == []
+    assert ids(search(client, headers, renamed)) == [doc_id]
+
+    listed = client.get("/api/documents", params={"search": renamed}, headers=headers)
+    assert [document["id"] for document in listed.json()] == [doc_id]
+
+    client.delete(f"/api/documents/{doc_id}", headers=headers)
+    assert search(client, headers, renamed) == []
+
+
+def test_file_text_is_searchable(client, headers, run):
+    word = f"zc{uuid.uuid4().hex[:8]}"
+    doc_id = client.post("/api/documents", json={
+        "title": "Work instruction", "document_type": "WI"
+    }, headers=headers).json()["id"]
+
+    async def unit(session):
+        await index_content(session, doc_id, f"Torque the <housing> screws; {word}.")
+
+    run(write_queue.submit, unit)
+    hits = search(client, headers, word)
+    assert ids(hits) == [doc_id]
+    # Text around the match is escaped before the markers are added
+    assert "&lt;housing&gt;" in hits[0]["snippet"]
+
+
+def test_title_matches_rank_above_content(client, headers, run):
+    word = f"zt{uuid.uuid4().hex[:8]}"
+    in_content = client.post("/api/documents", json={
+        "title": "Other", "document_type": "SOP"
+    }, headers=headers).json()["id"]
+    in_title = client.post("/api/documents", json={
+        "title": f"About {word}", "document_type": "SOP"
+    }, headers=headers).json()["id"]
+
+    async def unit(session):
+        await index_content(session, in_content, f"Mentions {word} once.")
+
+    run(write_queue.submit, unit)
+    assert ids(search(client, headers, word)) == [in_title, in_content]
+
+
+def test_index_matches_documents_after_writes(client, headers, run):
+    assert run(reconcile_search_index) == 0
@@ -0,0 +1,67 @@
+"""Record number sequences: unique, gap-tolerant, continuing existing numbers."""
+import asyncio
+import uuid
+
+from database import run_in_read_session, write_queue
+from models import Document, SequenceCounter
+from utils.sequences import SequenceService
+
+
+def scope() -> str:
+    return f"T{uuid.uuid4().hex[:6].upper()}"
+
+
+def test_concurrent_allocations_are_unique(client, run):
+    name = scope()
+    service = SequenceService(block_size=3)
+
+    async def allocate():
+        return await asyncio.gather(*(service.next_value(name) for _ in range(10)))
+
+    assert sorted(run(allocate)) == list(range(1, 11))
+
+    async def counter(db):
+        return (await db.get(SequenceCounter, name)).value
+
+    # Four blocks of three were reserved for ten numbers
+    assert run(run_in_read_session, counter) == 12
+
+
+def test_processes_never_hand_out_the_same_number(client, run):
+    name = scope()
+    first, second = SequenceService(block_size=5), SequenceService(block_size=5)
+
+    async def allocate():
+        values = []
+        for _ in range(12):
+            values.append(await first.next_value(name))
+            values.append(await second.next_value(name))
+        return values
+
+    values = run(allocate)
+    assert len(set(values)) == len(values)
+
+
+def test_new_scopes_continue_after_existing_records(client, headers, run):
+    prefix = scope()
+    user_id = client.get("/api/auth/me", headers=headers).json()["id"]
+
+    async def insert(session):
+        session.add(Document(
+            doc_number=f"{prefix}-0041", title="Existing", document_type="SOP", created_by=user_id
+        ))
+
+    run(write_queue.submit, insert)
+    service = SequenceService(block_size=10)
+    assert run(service.next_number, prefix, Document.doc_number, 4, False) == f"{prefix}-0042"
+
+
+def test_created_documents_get_distinct_numbers(client, headers):
+    numbers = {
+        client.post("/api/documents", json={
+            "title": f"Numbered {index}", "document_type": "Form"
+        }, headers=headers).json()["doc_number"]
+        for index in range(5)
+    }
+    assert len(numbers) == 5
+    assert all(number.startswith("FRM-") for number in numbers)
@@ -0,0 +1,46 @@
+"""SQLite PRAGMA profile on every engine's connections."""
+from sqlalchemy import text
+
+from database import run_in_read_session, write_queue
+
+# PRAGMA reads return numbers for the named settings
+EXPECTED = {
+    "busy_timeout": 5000,
+    "journal_mode": "wal",
+    "synchronous": 1,  # NORMAL
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": 2,  # MEMORY
+    "foreign_keys": 1,
+}
+
+
+async def read_pragmas(session) -> dict:
+    values = {}
+    for pragma in EXPECTED:
+        result = await session.execute(text(f"PRAGMA {pragma}"))
+        values[pragma] = result.scalar()
+    return values
+
+
+def test_profile_is_reported_as_configured(client, headers):
+    response = client.get("/api/system/database", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dialect"] == "sqlite"
+    assert list(body["configured"]) == list(EXPECTED)
+    assert body["effective"] == EXPECTED
+
+
+def test_reader_and_writer_connections_use_the_profile(client, run):
+    assert run(run_in_read_session, read_pragmas) == EXPECTED
+    assert run(write_queue.submit, read_pragmas) == EXPECTED
+
+
+def test_profile_is_admin_only(client, make_user):
+    user, password = make_user()
+    token = client.post(
+        "/api/auth/login", data={"username": user["username"], "password": password}
+    ).json()["access_token"]
+    response = client.get("/api/system/database", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
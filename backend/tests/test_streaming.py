@@ -0,0 +1,63 @@
+"""NDJSON and CSV streaming of register endpoints."""
+import csv
+import io
+import json
+import uuid
+from datetime import date
+
+from config import settings
+
+
+def create_inquiries(client, headers, count: int) -> str:
+    customer = f"Stream {uuid.uuid4().hex[:6]}"
+    for index in range(count):
+        response = client.post("/api/marketing/inquiries", params={
+            "customer_name": customer,
+            "item_requirement": f"Item {index}",
+            "inquiry_date": date.today().isoformat(),
+        }, headers=headers)
+        assert response.status_code == 201
+    return customer
+
+
+def test_ndjson_matches_the_json_list(client, headers, monkeypatch):
+    # Several partitions, so rows span more than one streamed chunk
+    monkeypatch.setattr(settings, "STREAM_CHUNK_ROWS", 2)
+    customer = create_inquiries(client, headers, 5)
+    listed = client.get("/api/marketing/inquiries", headers=headers).json()
+
+    response = client.get(
+        "/api/marketing/inquiries", params={"format": "ndjson"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["id"] for row in streamed) == sorted(row["id"] for row in listed)
+    mine = [row for row in streamed if row["customer_name"] == customer]
+    assert sorted(row["item_requirement"] for row in mine) == [f"Item {i}" for i in range(5)]
+
+
+def test_csv_is_chosen_from_the_accept_header(client, headers):
+    customer = create_inquiries(client, headers, 2)
+    response = client.get(
+        "/api/marketing/inquiries", headers={**headers, "Accept": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="marketing-inquiries.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    mine = [row for row in rows if row["customer_name"] == customer]
+    assert len(mine) == 2
+    # NULL columns are empty cells
+    assert mine[0]["contact_person"] == ""
+
+
+def test_format_parameter(client, headers):
+    response = client.get(
+        "/api/marketing/inquiries", params={"format": "json"},
+        headers={**headers, "Accept": "application/x-ndjson"}
+    )
+    assert isinstance(response.json(), list)
+    response = client.get("/api/marketing/inquiries", params={"format": "xml"}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+"""ETags and 304s of version-keyed responses."""
+from datetime import date
+
+
+def test_unchanged_tables_answer_304(client, headers):
+    first = client.get("/api/dashboard/kpis", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    for value in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(
+            "/api/dashboard/kpis", headers={**headers, "If-None-Match": value}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    stale = client.get("/api/dashboard/kpis", headers={**headers, "If-None-Match": '"other"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_write_changes_the_etag_and_body(client, headers):
+    first = client.get("/api/dashboard/kpis", headers=headers)
+    response = client.post("/api/nonconformances", json={
+        "title": "ETag NC", "description": "d", "discovered_date": date.today().isoformat()
+    }, headers=headers)
+    assert response.status_code == 201
+
+    second = client.get(
+        "/api/dashboard/kpis", headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()["open_ncs"] == first.json()["open_ncs"] + 1
+
+
+def test_other_tables_keep_the_etag(client, headers):
+    first = client.get("/api/hr/stats", headers=headers)
+    client.post("/api/nonconformances", json={
+        "title": "Unrelated NC", "description": "d", "discovered_date": date.today().isoformat()
+    }, headers=headers)
+    second = client.get(
+        "/api/hr/stats", headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 304
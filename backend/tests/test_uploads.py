@@ -0,0 +1,66 @@
+"""Streaming uploads: stored content, progress, size limits and OpenAPI."""
+import hashlib
+import os
+import uuid
+
+import pytest
+
+from config import settings
+from utils.blobs import UPLOAD_DIR
+
+
+def create_document(client, headers) -> str:
+    response = client.post(
+        "/api/documents", json={"title": "Upload doc", "document_type": "SOP"}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def partial_files() -> list:
+    return [name for name in os.listdir(UPLOAD_DIR) if name.startswith(".upload-")]
+
+
+def test_upload_is_hashed_and_progress_reported(client, headers):
+    doc_id = create_document(client, headers)
+    content = os.urandom(300 * 1024)
+    upload_id = uuid.uuid4().hex
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", params={"upload_id": upload_id},
+        files={"file": ("data.bin", content)}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["size"] == len(content)
+    assert body["sha256"] == hashlib.sha256(content).hexdigest()
+
+    progress = client.get(f"/api/documents/uploads/{upload_id}", headers=headers).json()
+    assert progress["state"] == "stored"
+    assert progress["received"] >= len(content)
+    assert partial_files() == []
+
+
+@pytest.mark.parametrize("size", [100, 200 * 1024])
+def test_oversized_uploads_are_refused(client, headers, monkeypatch, size):
+    # 100 bytes passes the Content-Length check and is caught while streaming
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 10)
+    doc_id = create_document(client, headers)
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"file": ("big.txt", b"x" * size)}, headers=headers
+    )
+    assert response.status_code == 413
+    assert partial_files() == []
+
+
+def test_upload_without_the_file_field_is_400(client, headers):
+    doc_id = create_document(client, headers)
+    response = client.post(
+        f"/api/documents/{doc_id}/upload", files={"other": ("a.txt", b"a")}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_openapi_documents_the_multipart_body(client):
+    operation = client.get("/openapi.json").json()["paths"]["/api/documents/{doc_id}/upload"]["post"]
+    schema = operation["requestBody"]["content"]["multipart/form-data"]["schema"]
+    assert schema["properties"]["file"] == {"type": "string", "format": "binary"}
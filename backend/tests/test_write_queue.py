@@ -0,0 +1,104 @@
+"""Single-writer queue: group commit, per-unit rollback, failed batches."""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+import database
+from database import run_in_read_session, write_queue
+from models import Item
+
+
+SETTLE_TIMEOUT = 5
+
+
+def add_item(code: str, ran: list = None):
+    async def unit(session):
+        if ran is not None:
+            ran.append(code)
+        session.add(Item(item_code=code, description=code, item_type="raw"))
+        await session.flush()
+        return code
+    return unit
+
+
+async def count_items(codes) -> int:
+    async def count(db):
+        result = await db.execute(
+            select(func.count()).select_from(Item).where(Item.item_code.in_(codes))
+        )
+        return result.scalar_one()
+    return await run_in_read_session(count)
+
+
+def test_concurrent_units_share_commits(client, run):
+    codes = [f"WQ-{uuid.uuid4().hex[:8]}" for _ in range(20)]
+    batches = write_queue.batches
+
+    async def submit_all():
+        return await asyncio.gather(*(write_queue.submit(add_item(code)) for code in codes))
+
+    assert run(submit_all) == codes
+    assert write_queue.batches - batches < len(codes)
+    assert run(count_items, codes) == len(codes)
+
+
+def test_failing_unit_rolls_back_alone(client, run):
+    good = [f"WQ-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+
+    async def fail(session):
+        session.add(Item(item_code="WQ-never-stored", description="x", item_type="raw"))
+        await session.flush()
+        raise ValueError("rejected")
+
+    async def submit_all():
+        return await asyncio.gather(
+            write_queue.submit(add_item(good[0])),
+            write_queue.submit(fail),
+            write_queue.submit(add_item(good[1])),
+            return_exceptions=True
+        )
+
+    first, failed, second = run(submit_all)
+    assert (first, second) == tuple(good)
+    assert isinstance(failed, ValueError)
+    assert run(count_items, good + ["WQ-never-stored"]) == 2
+
+
+class UnreachableEngine:
+    def connect(self):
+        raise OSError("writer connection unavailable")
+
+
+def test_connect_failure_fails_every_unit(client, run, monkeypatch):
+    codes = [f"WQ-{uuid.uuid4().hex[:8]}" for _ in range(3)]
+    ran = []
+
+    async def submit_all():
+        # Bounded: units left unresolved by a failed batch would hang forever
+        return await asyncio.wait_for(asyncio.gather(
+            *(write_queue.submit(add_item(code, ran)) for code in codes),
+            return_exceptions=True
+        ), SETTLE_TIMEOUT)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(database, "writer_engine", UnreachableEngine())
+        results = run(submit_all)
+
+    assert all(isinstance(result, OSError) for result in results)
+    assert ran == []
+    # The worker survives and later batches commit normally
+    assert run(write_queue.submit, add_item(codes[0])) == codes[0]
+    assert run(count_items, codes) == 1
+
+
+def test_submit_raises_connect_failure_to_caller(client, run, monkeypatch):
+    monkeypatch.setattr(database, "writer_engine", UnreachableEngine())
+
+    async def submit():
+        unit = add_item(f"WQ-{uuid.uuid4().hex[:8]}")
+        return await asyncio.wait_for(write_queue.submit(unit), SETTLE_TIMEOUT)
+
+    with pytest.raises(OSError, match="writer connection unavailable"):
+        run(submit)
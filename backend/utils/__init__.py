@@ -2,17 +2,29 @@
 from utils.auth import (
     verify_password,
     get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
+    create_refresh_token,
+    decode_token,
     get_current_user,
     get_current_active_user,
-    check_permission
+    check_permission,
+    invalidate_principal
 )
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
+    "password_needs_rehash",
     "create_access_token",
+    "create_refresh_token",
+    "decode_token",
     "get_current_user",
     "get_current_active_user",
-    "check_permission"
+    "check_permission",
+    "invalidate_principal"
 ]
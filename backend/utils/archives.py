@@ -0,0 +1,110 @@
+"""ZIP archives produced on the fly for streaming responses.
+
+``zipfile`` writes to an unseekable sink here, so each entry's sizes and
+CRC go into a data descriptor after its bytes instead of being patched
+into the header, and nothing has to be rewound. Output is handed to the
+response as soon as each chunk is compressed: memory use does not grow
+with the size or number of files.
+"""
+import io
+import os
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+CHUNK_SIZE = 256 * 1024
+
+# Formats that are already compressed are stored as-is
+STORED_EXTENSIONS = {".docx", ".xlsx", ".xlsm", ".pptx", ".pdf", ".zip", ".png", ".jpg", ".jpeg"}
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer drained after every write."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def safe_name(name: Optional[str], default: str = "file") -> str:
+    """A single archive path component: no separators, no "." or ".."."""
+    name = (name or "").replace("/", "_").replace("\\", "_").strip()
+    return default if name in ("", ".", "..") else name
+
+
+class ZipStream:
+    """ZIP archive whose bytes are returned as entries are added."""
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, "w", allowZip64=True)
+
+    def _info(self, name: str, modified: Optional[datetime], size: int) -> zipfile.ZipInfo:
+        modified = max(modified or datetime.utcnow(), datetime(1980, 1, 1))
+        info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+        info.external_attr = 0o644 << 16
+        info.file_size = size  # lets zipfile decide on ZIP64 up front
+        extension = os.path.splitext(name)[1].lower()
+        info.compress_type = (
+            zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+        )
+        return info
+
+    async def add_file(
+        self,
+        name: str,
+        path: str,
+        modified: Optional[datetime] = None,
+        digest=None
+    ) -> AsyncIterator[bytes]:
+        """Add the file at ``path``, yielding archive bytes as they are produced.
+
+        Reading and compressing run in the threadpool, one chunk at a time;
+        ``digest`` (e.g. ``hashlib.sha256()``) is updated with the file bytes.
+        """
+        info = self._info(name, modified, os.path.getsize(path))
+
+        def copy_chunk(source, entry) -> bool:
+            data = source.read(CHUNK_SIZE)
+            if digest is not None:
+                digest.update(data)
+            entry.write(data)
+            return bool(data)
+
+        source = await run_in_threadpool(open, path, "rb")
+        try:
+            with self._zip.open(info, "w") as entry:
+                while await run_in_threadpool(copy_chunk, source, entry):
+                    data = self._sink.take()
+                    if data:
+                        yield data
+        finally:
+            source.close()
+        # Data descriptor written when the entry closed
+        data = self._sink.take()
+        if data:
+            yield data
+
+    def add_bytes(self, name: str, data: bytes, modified: Optional[datetime] = None) -> bytes:
+        """Add an in-memory entry; returns the archive bytes produced."""
+        self._zip.writestr(self._info(name, modified, len(data)), data)
+        return self._sink.take()
+
+    def close(self) -> bytes:
+        """Write the central directory; returns the final archive bytes."""
+        self._zip.close()
+        return self._sink.take()
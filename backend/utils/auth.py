@@ -1,4 +1,6 @@
 """Authentication utilities for JWT and password handling."""
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -10,12 +12,37 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from config import settings
-from database import get_db
-from models import User, Role
+from database import get_read_db
+from models import User
+from utils.cache import TTLCache
+from utils.hashing import hashing_service
+from utils.permissions import permission_registry
+from utils.revocation import revocation_list
 
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
+# Active bcrypt cost; may be replaced by calibrate_bcrypt_rounds() at startup
+bcrypt_rounds = settings.BCRYPT_ROUNDS
+
+# Authenticated users keyed by (user_id, token). Cached instances are detached
+# from their session and must be treated as read-only; reload the row before
+# mutating it.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(user_id: Optional[str] = None) -> int:
+    """Drop cached principals for one user, or for everyone if no id is given."""
+    if user_id is None:
+        count = len(principal_cache)
+        principal_cache.clear()
+        return count
+    return principal_cache.invalidate(lambda key: key[0] == user_id)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,51 +55,163 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Return the cost factor encoded in a bcrypt hash ($2b$<cost>$...)."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a cost other than the active one."""
+    return get_hash_rounds(hashed_password) != bcrypt_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Change the cost used for new hashes."""
+    global bcrypt_rounds
+    bcrypt_rounds = rounds
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = settings.BCRYPT_MIN_ROUNDS,
+    max_rounds: int = settings.BCRYPT_MAX_ROUNDS
+) -> int:
+    """Pick the highest cost whose hash time stays under ``target_ms``.
+    
+    Each extra round doubles the work, so timing stops at the first cost
+    that exceeds the target. Never returns less than ``min_rounds``.
+    """
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await hashing_service.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await hashing_service.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "access"})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a JWT refresh token (exchanged at /api/auth/refresh)."""
+    to_encode = {"sub": data["sub"]}
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "refresh"})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_stream_token(user_id: str) -> str:
+    """Create a short-lived JWT that can only open KPI streams."""
+    expire = datetime.utcnow() + timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    to_encode = {"sub": user_id, "exp": expire, "jti": uuid.uuid4().hex, "type": "stream"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_token(token: str, token_type: str = "access") -> Optional[dict]:
+    """Decode a JWT and check its type and revocation; None if invalid.
     
+    Tokens issued before refresh support carry no type and count as access tokens.
+    """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    result = await db.execute(
-        select(User).options(selectinload(User.role)).where(User.id == user_id)
+        return None
+    if payload.get("type", "access") != token_type or payload.get("sub") is None:
+        return None
+    if revocation_list.is_revoked(payload.get("jti")):
+        return None
+    return payload
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    user = result.scalar_one_or_none()
-    
+
+
+async def _load_principal(user_id: str, token: str, db: AsyncSession) -> User:
+    """Load the active user of a decoded token, cached per token."""
+    cache_key = (user_id, token)
+    user = principal_cache.get(cache_key)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(
+            select(User).options(selectinload(User.role)).where(User.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        
+        if user is None:
+            raise _credentials_exception()
+        principal_cache.set(cache_key, user)
+    
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
     return user
 
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Get current authenticated user from JWT token."""
+    payload = decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
+    return await _load_principal(payload["sub"], token, db)
+
+
+async def get_stream_user(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    stream_token: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Like ``get_current_user``, but also accepts ``?stream_token=``.
+    
+    Browser EventSource connections cannot send an Authorization header.
+    Query strings end up in access logs, so the query accepts only a token
+    from ``create_stream_token``: it expires within a minute and is not
+    valid for any other endpoint.
+    """
+    if header_token:
+        return await get_current_user(header_token, db)
+    payload = decode_token(stream_token, token_type="stream") if stream_token else None
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await _load_principal(payload["sub"], stream_token, db)
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user."""
     if not current_user.is_active:
@@ -83,25 +222,14 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 def check_permission(required_permission: str):
     """Dependency to check if user has required permission."""
     async def permission_checker(
-        current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_db)
+        current_user: User = Depends(get_current_user)
     ) -> User:
-        # Get user's role with permissions
-        result = await db.execute(
-            select(Role).where(Role.id == current_user.role_id)
-        )
-        role = result.scalar_one_or_none()
+        role = await permission_registry.resolve(current_user.role_id)
         
         if not role:
             raise HTTPException(status_code=403, detail="Role not found")
         
-        # Admin has all permissions
-        if role.name == "System Admin":
-            return current_user
-        
-        # Check specific permission
-        permissions = role.permissions or {}
-        if not permissions.get(required_permission, False):
+        if not role.allows(required_permission):
             raise HTTPException(
                 status_code=403,
                 detail=f"Permission denied: {required_permission}"
@@ -0,0 +1,206 @@
+"""Content-addressed, deduplicated store for uploaded document files.
+
+Files live under ``UPLOAD_DIR/blobs/<aa>/<bb>/<sha256>``; identical bytes are
+stored once however many versions use them. ``DocumentVersion.file_url``
+holds the blob's path relative to ``UPLOAD_DIR`` and ``blobs.ref_count``
+counts those references, kept current on flush. Placing a blob and
+collecting unreferenced ones both run as write-queue units, so a blob is
+never removed between an upload finding it and referencing it.
+"""
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import write_queue
+from models import Blob, DocumentVersion
+from utils.table_versions import record_writes
+
+
+UPLOAD_DIR = settings.UPLOAD_DIR or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "uploads"
+)
+BLOB_PREFIX = "blobs/"
+TRASH_DIR = os.path.join(UPLOAD_DIR, ".trash")
+
+
+def blob_url(sha256: str) -> str:
+    """``file_url`` of the blob with this digest (relative to UPLOAD_DIR)."""
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def blob_hash(file_url: Optional[str]) -> Optional[str]:
+    """Digest referenced by ``file_url``, or None for legacy per-upload files."""
+    if file_url and file_url.startswith(BLOB_PREFIX):
+        return file_url.rsplit("/", 1)[-1]
+    return None
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(UPLOAD_DIR, *blob_url(sha256).split("/"))
+
+
+def _place(temp_path: str, sha256: str) -> bool:
+    """Move a received file into the store; False if the blob already existed."""
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        os.remove(temp_path)
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+    return True
+
+
+async def store_blob(db: AsyncSession, temp_path: str, sha256: str, size: int) -> str:
+    """Store ``temp_path`` as a blob from inside a write unit; returns its file_url.
+
+    Adds the ``blobs`` row for new content; the caller's DocumentVersion
+    insert takes the reference when it is flushed.
+    """
+    blob = await db.get(Blob, sha256)
+    placed = await run_in_threadpool(_place, temp_path, sha256)
+    if blob is None:
+        db.add(Blob(sha256=sha256, size=size, ref_count=0))
+    elif placed:
+        # Row survived but the file was lost; the new copy restores it
+        blob.size = size
+    return blob_url(sha256)
+
+
+def _ref_deltas(session: Session) -> Counter:
+    """Count reference changes per blob for the versions being flushed."""
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, DocumentVersion):
+            sha256 = blob_hash(obj.file_url)
+            if sha256:
+                deltas[sha256] += 1
+    for obj in session.deleted:
+        if isinstance(obj, DocumentVersion):
+            history = inspect(obj).attrs.file_url.history
+            for url in history.deleted or history.unchanged:
+                sha256 = blob_hash(url)
+                if sha256:
+                    deltas[sha256] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, DocumentVersion):
+            continue
+        history = inspect(obj).attrs.file_url.history
+        if not history.has_changes():
+            continue
+        for url in history.deleted:
+            sha256 = blob_hash(url)
+            if sha256:
+                deltas[sha256] -= 1
+        for url in history.added:
+            sha256 = blob_hash(url)
+            if sha256:
+                deltas[sha256] += 1
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def apply_blob_refs(session: Session, flush_context) -> None:
+    """Apply reference count changes in the same transaction as the flush."""
+    deltas = [(sha256, delta) for sha256, delta in _ref_deltas(session).items() if delta]
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    connection = session.connection()
+    for sha256, delta in deltas:
+        connection.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256)
+            .values(ref_count=Blob.ref_count + delta, updated_at=now)
+        )
+    record_writes(connection, [Blob.__tablename__])
+
+
+def _trash(sha256: str) -> Optional[str]:
+    path = blob_path(sha256)
+    if not os.path.exists(path):
+        return None
+    os.makedirs(TRASH_DIR, exist_ok=True)
+    trashed = os.path.join(TRASH_DIR, sha256)
+    os.replace(path, trashed)
+    return trashed
+
+
+def _restore(sha256: str, trashed: str) -> None:
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(trashed, path)
+
+
+def _stray_files(known: set, cutoff: float) -> List[str]:
+    """Blob files without a row, and abandoned partial uploads, older than cutoff."""
+    stray = []
+    for root, _, files in os.walk(os.path.join(UPLOAD_DIR, "blobs")):
+        for name in files:
+            path = os.path.join(root, name)
+            if name not in known and os.path.getmtime(path) < cutoff:
+                stray.append(path)
+    if os.path.isdir(UPLOAD_DIR):
+        for name in os.listdir(UPLOAD_DIR):
+            path = os.path.join(UPLOAD_DIR, name)
+            if name.startswith(".upload-") and os.path.getmtime(path) < cutoff:
+                stray.append(path)
+    return stray
+
+
+async def collect_garbage(grace_seconds: Optional[int] = None) -> int:
+    """Remove blobs unreferenced for longer than the grace period.
+
+    Reference counts are first recomputed from document_versions, which
+    also corrects drift from writes that bypassed the ORM. Returns the
+    number of files removed.
+    """
+    grace = settings.BLOB_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = datetime.utcnow() - timedelta(seconds=grace)
+    trashed = {}
+
+    async def unit(db: AsyncSession) -> int:
+        result = await db.execute(
+            select(DocumentVersion.file_url, func.count())
+            .where(DocumentVersion.file_url.like(f"{BLOB_PREFIX}%"))
+            .group_by(DocumentVersion.file_url)
+        )
+        refs = Counter()
+        for url, count in result.all():
+            refs[blob_hash(url)] += count
+
+        result = await db.execute(select(Blob))
+        blobs = result.scalars().all()
+        for blob in blobs:
+            actual = refs.get(blob.sha256, 0)
+            if blob.ref_count != actual:
+                blob.ref_count = actual
+            elif actual == 0 and (blob.updated_at or blob.created_at) < cutoff:
+                await db.delete(blob)
+                path = await run_in_threadpool(_trash, blob.sha256)
+                if path:
+                    trashed[blob.sha256] = path
+        await db.flush()
+
+        known = {blob.sha256 for blob in blobs if blob.sha256 not in trashed}
+        stray = await run_in_threadpool(_stray_files, known, time.time() - grace)
+        for path in stray:
+            await run_in_threadpool(os.remove, path)
+        return len(stray)
+
+    try:
+        removed = await write_queue.submit(unit)
+    except Exception:
+        for sha256, path in trashed.items():
+            await run_in_threadpool(_restore, sha256, path)
+        raise
+    for path in trashed.values():
+        await run_in_threadpool(os.remove, path)
+    return removed + len(trashed)
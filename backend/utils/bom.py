@@ -0,0 +1,268 @@
+"""Multi-level BOM explosion with memoized subassemblies.
+
+One recursive CTE walks ``bill_of_materials`` from the requested item
+down to raw materials, multiplying quantities into extended quantities
+and carrying the path of item ids so a component that already appears
+above itself is flagged as a cycle instead of being expanded again.
+
+Exploded trees are cached per item under a revision stamp: the table
+versions of ``bill_of_materials`` and ``items``, which change with every
+committed write to either table. Every complete subassembly in a result
+(cycle-free and not cut off by the depth guard) is memoized for the same
+stamp. Memoized subassemblies answer their own explosion without a query,
+and the CTE stops at them when exploding a parent; their lines are
+spliced in afterwards.
+"""
+from typing import Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import run_in_read_session
+from models import BillOfMaterial, Item
+from utils.cache import TTLCache
+from utils.table_versions import table_versions
+
+
+BOM_MODELS = [BillOfMaterial, Item]
+
+# Depth guard on top of cycle detection
+MAX_LEVELS = 50
+
+# (item id, revision stamp) -> explosion payload
+bom_cache = TTLCache(maxsize=settings.BOM_CACHE_MAX_ENTRIES, ttl=None)
+
+
+class SubtreeMemo:
+    """Complete subassembly lines by item id, for one revision stamp.
+
+    Everything is dropped when the stamp moves on; within a stamp at most
+    ``maxsize`` subassemblies are kept.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.stamp: Optional[Tuple[int, ...]] = None
+        self._subtrees: Dict[str, List[dict]] = {}
+
+    def current(self, stamp: Tuple[int, ...]) -> Dict[str, List[dict]]:
+        """Subtrees memoized under ``stamp``."""
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self._subtrees = {}
+        return self._subtrees
+
+    def add(self, stamp: Tuple[int, ...], subtrees: Dict[str, List[dict]]) -> None:
+        current = self.current(stamp)
+        for item_id, lines in subtrees.items():
+            if item_id in current or len(current) < self.maxsize:
+                current[item_id] = lines
+
+
+subtree_memo = SubtreeMemo(maxsize=settings.BOM_CACHE_MAX_ENTRIES)
+
+
+def revision_stamp() -> Tuple[int, ...]:
+    """Changes whenever a BOM line or item is written."""
+    return table_versions.snapshot(model.__tablename__ for model in BOM_MODELS)
+
+
+def _explosion_query(item_id: str, stop_at: Collection[str] = ()):
+    """Preorder BOM lines below ``item_id``, one row per path.
+
+    Components in ``stop_at`` are listed but not expanded.
+    """
+    # Fixed-width sibling keys (sequence + uuid) make the concatenated
+    # sort key order rows depth-first, siblings by sequence
+    def sibling_key(line):
+        return func.printf("%06d", func.coalesce(line.sequence, 0)).concat(line.id)
+
+    anchor = (
+        select(
+            BillOfMaterial.id.label("line_id"),
+            BillOfMaterial.parent_item_id,
+            BillOfMaterial.component_item_id,
+            BillOfMaterial.quantity,
+            BillOfMaterial.unit_of_measure,
+            BillOfMaterial.sequence,
+            literal(1).label("level"),
+            cast(BillOfMaterial.quantity, Float).label("extended_quantity"),
+            literal(f"/{item_id}/")
+            .concat(BillOfMaterial.component_item_id).concat("/").label("path"),
+            sibling_key(BillOfMaterial).label("sort_key"),
+            (BillOfMaterial.component_item_id == item_id).label("cycle"),
+        )
+        .where(BillOfMaterial.parent_item_id == item_id)
+        .cte("explosion", recursive=True)
+    )
+    parent = anchor.alias("parent")
+    step = (
+        select(
+            BillOfMaterial.id,
+            BillOfMaterial.parent_item_id,
+            BillOfMaterial.component_item_id,
+            BillOfMaterial.quantity,
+            BillOfMaterial.unit_of_measure,
+            BillOfMaterial.sequence,
+            parent.c.level + 1,
+            parent.c.extended_quantity * BillOfMaterial.quantity,
+            parent.c.path.concat(BillOfMaterial.component_item_id).concat("/"),
+            parent.c.sort_key.concat("/").concat(sibling_key(BillOfMaterial)),
+            func.instr(
+                parent.c.path, literal("/").concat(BillOfMaterial.component_item_id).concat("/")
+            ) > 0,
+        )
+        .join_from(
+            parent, BillOfMaterial, BillOfMaterial.parent_item_id == parent.c.component_item_id
+        )
+        .where(parent.c.cycle.is_(False))
+        .where(parent.c.level < MAX_LEVELS)
+    )
+    if stop_at:
+        step = step.where(parent.c.component_item_id.not_in(list(stop_at)))
+    explosion = anchor.union_all(step)
+    return (
+        select(explosion, Item.item_code, Item.description, Item.item_type)
+        .outerjoin(Item, Item.id == explosion.c.component_item_id)
+        .order_by(explosion.c.sort_key)
+    )
+
+
+def _line(row) -> dict:
+    return {
+        "line_id": row.line_id,
+        "level": row.level,
+        "parent_item_id": row.parent_item_id,
+        "component_item_id": row.component_item_id,
+        "component_code": row.item_code,
+        "component_description": row.description,
+        "item_type": row.item_type,
+        "quantity": float(row.quantity or 0),
+        "extended_quantity": round(row.extended_quantity or 0, 6),
+        "unit_of_measure": row.unit_of_measure,
+        "sequence": row.sequence,
+        "cycle": bool(row.cycle),
+    }
+
+
+def _payload(item_id: str, lines: List[dict]) -> dict:
+    totals: Dict[str, dict] = {}
+    for index, line in enumerate(lines):
+        # Sum leaves only: subassemblies are built from their components
+        is_leaf = index + 1 == len(lines) or lines[index + 1]["level"] <= line["level"]
+        if not is_leaf or line["cycle"]:
+            continue
+        total = totals.setdefault(line["component_item_id"], {
+            "component_item_id": line["component_item_id"],
+            "component_code": line["component_code"],
+            "unit_of_measure": line["unit_of_measure"],
+            "extended_quantity": 0.0,
+        })
+        total["extended_quantity"] = round(total["extended_quantity"] + line["extended_quantity"], 6)
+    return {
+        "item_id": item_id,
+        "levels": max((line["level"] for line in lines), default=0),
+        "has_cycles": any(line["cycle"] for line in lines),
+        "lines": lines,
+        "totals": list(totals.values()),
+    }
+
+
+def _rebased(lines: List[dict], level: int, factor: float) -> List[dict]:
+    """``lines`` of a subtree moved below a node at ``level``.
+
+    Extended quantities are recomputed from the line quantities, starting
+    from ``factor``; lines deeper than ``MAX_LEVELS`` are dropped.
+    """
+    rebased = []
+    factors = {0: factor}
+    for line in lines:
+        extended = factors[line["level"] - 1] * line["quantity"]
+        factors[line["level"]] = extended
+        if level + line["level"] > MAX_LEVELS:
+            continue
+        rebased.append({
+            **line,
+            "level": level + line["level"],
+            "extended_quantity": round(extended, 6),
+        })
+    return rebased
+
+
+def _splice(lines: List[dict], subtrees: Dict[str, List[dict]]) -> List[dict]:
+    """Expand the lines the query stopped at with their memoized subtrees."""
+    spliced = []
+    for line in lines:
+        spliced.append(line)
+        sub = None if line["cycle"] else subtrees.get(line["component_item_id"])
+        if sub:
+            spliced.extend(_rebased(sub, line["level"], line["extended_quantity"]))
+    return spliced
+
+
+def _subtrees(item_id: str, lines: List[dict]) -> Dict[str, List[dict]]:
+    """Complete subtrees in an explosion, the root's included, rebased to their own root.
+
+    A subtree is complete when it has no cycle (cycles are flagged relative
+    to the root's path, so one would explode differently on its own) and
+    no line at ``MAX_LEVELS``, below which the explosion was cut off.
+    """
+    def complete(sub: List[dict]) -> bool:
+        return not any(line["cycle"] or line["level"] >= MAX_LEVELS for line in sub)
+
+    subtrees = {}
+    if lines and complete(lines):
+        subtrees[item_id] = lines
+    for index, node in enumerate(lines):
+        component_id = node["component_item_id"]
+        if component_id in subtrees or node["cycle"]:
+            continue
+        end = index + 1
+        while end < len(lines) and lines[end]["level"] > node["level"]:
+            end += 1
+        # Absolute levels decide completeness, relative ones are stored
+        if end > index + 1 and complete(lines[index + 1:end]):
+            subtrees[component_id] = _rebased(
+                [{**line, "level": line["level"] - node["level"]} for line in lines[index + 1:end]],
+                0, 1.0
+            )
+    return subtrees
+
+
+async def explode_bom(item_id: str) -> Optional[dict]:
+    """Indented multi-level BOM of ``item_id`` with per-component totals.
+
+    Returns None if the item does not exist. Queries run on a session of
+    their own, opened after the revision stamp is taken, so a result is
+    never read from a snapshot older than the stamp it is cached under.
+    """
+    stamp = revision_stamp()
+    cached = bom_cache.get((item_id, stamp))
+    if cached is not None:
+        return cached
+
+    memoized = subtree_memo.current(stamp)
+    if item_id in memoized:
+        payload = _payload(item_id, memoized[item_id])
+        bom_cache.set((item_id, stamp), payload)
+        return payload
+    stop_at = list(memoized)
+
+    async def load(db: AsyncSession) -> Optional[List[dict]]:
+        result = await db.execute(select(Item.id).where(Item.id == item_id))
+        if result.scalar_one_or_none() is None:
+            return None
+        result = await db.execute(_explosion_query(item_id, stop_at))
+        return [_line(row) for row in result.all()]
+
+    lines = await run_in_read_session(load)
+    if lines is None:
+        return None
+    lines = _splice(lines, memoized)
+    payload = _payload(item_id, lines)
+    # A write committed meanwhile may not be reflected; don't cache then
+    if revision_stamp() == stamp:
+        bom_cache.set((item_id, stamp), payload)
+        subtree_memo.add(stamp, _subtrees(item_id, lines))
+    return payload
@@ -0,0 +1,169 @@
+"""Revision-to-revision diffs of extracted document text.
+
+Lines are compared with difflib's SequenceMatcher after trimming the
+common head and tail, which is where most revisions agree, so the
+matcher only sees the edited region. Changed line pairs get a word-level
+diff for inline highlighting. Results are grouped into hunks with
+surrounding context; ``diff_cache`` holds them by the content hashes of
+both files, since the same pair of files always yields the same diff.
+"""
+import difflib
+import json
+import re
+from typing import Iterator, List, Tuple
+
+from config import settings
+from utils.cache import TTLCache
+
+
+# Changed regions larger than this get line changes only, no word diff
+WORD_DIFF_MAX_CHARS = 20000
+
+_WORDS = re.compile(r"\s+|\w+|[^\w\s]")
+
+# (old hash, new hash, context) -> (stats, hunks); content-addressed, so no TTL
+diff_cache = TTLCache(maxsize=settings.DIFF_CACHE_MAX_ENTRIES, ttl=None)
+
+
+def _word_diff(old: List[str], new: List[str]) -> List[Tuple[str, str]]:
+    """Word-level (op, text) segments between two blocks of lines."""
+    old_words = _WORDS.findall("\n".join(old))
+    new_words = _WORDS.findall("\n".join(new))
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    segments = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            segments.append(("equal", "".join(old_words[i1:i2])))
+            continue
+        if tag in ("delete", "replace"):
+            segments.append(("delete", "".join(old_words[i1:i2])))
+        if tag in ("insert", "replace"):
+            segments.append(("insert", "".join(new_words[j1:j2])))
+    return segments
+
+
+def _opcodes(old: List[str], new: List[str]) -> List[Tuple[str, int, int, int, int]]:
+    """Line opcodes like SequenceMatcher.get_opcodes(), matching only the middle."""
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+
+    opcodes = []
+    if head:
+        opcodes.append(("equal", 0, head, 0, head))
+    matcher = difflib.SequenceMatcher(
+        None, old[head:len(old) - tail], new[head:len(new) - tail], autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        opcodes.append((tag, i1 + head, i2 + head, j1 + head, j2 + head))
+    if tail:
+        opcodes.append(("equal", len(old) - tail, len(old), len(new) - tail, len(new)))
+    return opcodes
+
+
+def _group(opcodes: list, context: int) -> Iterator[list]:
+    """Opcodes split into hunks with ``context`` equal lines around changes.
+
+    Same grouping as SequenceMatcher.get_grouped_opcodes().
+    """
+    codes = list(opcodes)
+    tag, i1, i2, j1, j2 = codes[0]
+    if tag == "equal":
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    tag, i1, i2, j1, j2 = codes[-1]
+    if tag == "equal":
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # Long unchanged runs end one hunk and start the next
+        if tag == "equal" and i2 - i1 > context * 2:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def diff_texts(old_text: str, new_text: str, context: int = 3) -> Tuple[dict, List[dict]]:
+    """Diff two texts into ``(stats, hunks)``.
+
+    Each hunk has 1-based ``old_start``/``new_start``, line counts and a list
+    of ``changes``: ``equal``/``delete``/``insert`` with their ``lines``, or
+    ``replace`` with ``old`` and ``new`` lines plus ``words`` segments.
+    """
+    old = old_text.splitlines()
+    new = new_text.splitlines()
+    stats = {"old_lines": len(old), "new_lines": len(new), "added": 0, "removed": 0, "changed": 0}
+    opcodes = _opcodes(old, new)
+    if all(tag == "equal" for tag, *_ in opcodes):
+        return stats, []
+
+    hunks = []
+    for group in _group(opcodes, context):
+        _, i1, _, j1, _ = group[0]
+        _, _, i2, _, j2 = group[-1]
+        changes = []
+        for tag, a1, a2, b1, b2 in group:
+            if tag == "equal":
+                if a2 > a1:
+                    changes.append({"op": "equal", "lines": old[a1:a2]})
+            elif tag == "delete":
+                stats["removed"] += a2 - a1
+                changes.append({"op": "delete", "lines": old[a1:a2]})
+            elif tag == "insert":
+                stats["added"] += b2 - b1
+                changes.append({"op": "insert", "lines": new[b1:b2]})
+            else:
+                stats["changed"] += max(a2 - a1, b2 - b1)
+                change = {"op": "replace", "old": old[a1:a2], "new": new[b1:b2]}
+                size = sum(map(len, change["old"])) + sum(map(len, change["new"]))
+                if size <= WORD_DIFF_MAX_CHARS:
+                    change["words"] = _word_diff(change["old"], change["new"])
+                changes.append(change)
+        hunks.append({
+            "old_start": i1 + 1,
+            "old_lines": i2 - i1,
+            "new_start": j1 + 1,
+            "new_lines": j2 - j1,
+            "changes": changes,
+        })
+    return stats, hunks
+
+
+def ndjson_lines(header: dict, hunks: List[dict]) -> Iterator[str]:
+    """Header line (versions and stats) followed by one line per hunk."""
+    yield json.dumps(header, default=str) + "\n"
+    for hunk in hunks:
+        yield json.dumps(hunk) + "\n"
+
+
+def unified_lines(old_name: str, new_name: str, hunks: List[dict]) -> Iterator[str]:
+    """The hunks rendered as a unified diff."""
+    if not hunks:
+        return
+    yield f"--- {old_name}\n+++ {new_name}\n"
+    for hunk in hunks:
+        # An empty range is given as the line before it, as in difflib
+        old_start = hunk["old_start"] - (hunk["old_lines"] == 0)
+        new_start = hunk["new_start"] - (hunk["new_lines"] == 0)
+        lines = [
+            f"@@ -{old_start},{hunk['old_lines']} +{new_start},{hunk['new_lines']} @@"
+        ]
+        for change in hunk["changes"]:
+            if change["op"] == "equal":
+                lines.extend(" " + line for line in change["lines"])
+            elif change["op"] == "delete":
+                lines.extend("-" + line for line in change["lines"])
+            elif change["op"] == "insert":
+                lines.extend("+" + line for line in change["lines"])
+            else:
+                lines.extend("-" + line for line in change["old"])
+                lines.extend("+" + line for line in change["new"])
+        yield "\n".join(lines) + "\n"
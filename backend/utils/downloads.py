@@ -0,0 +1,150 @@
+"""File downloads with validators, conditional GET and byte ranges."""
+import mimetypes
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _etag_in(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """If-None-Match wins; If-Modified-Since is only consulted without it."""
+    if "if-none-match" in request.headers:
+        return _etag_in(request.headers["if-none-match"], etag)
+    since = _parse_http_date(request.headers.get("if-modified-since"))
+    return since is not None and _parse_http_date(_http_date(last_modified)) <= since
+
+
+def _range_applies(request: Request, etag: str, last_modified: datetime) -> bool:
+    """If-Range: only resume when the client still has this representation."""
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.strip().startswith(('"', "W/")):
+        return if_range.strip() == etag
+    return _parse_http_date(if_range) == _parse_http_date(_http_date(last_modified))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """First (start, end) of a ``bytes=`` Range header, end inclusive.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges (answered with the full body); raises ValueError when the range
+    cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if not start_text:
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError("empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        if start_text.isdigit() or end_text.isdigit():
+            raise
+        return None
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+async def _read_file(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as handle:
+        await handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_download(
+    request: Request,
+    path: str,
+    filename: str,
+    etag: str,
+    last_modified: datetime
+) -> Response:
+    """Serve ``path`` as an attachment with ETag/Last-Modified validators.
+
+    Answers 304 to matching conditional requests, 206 to a satisfiable
+    single byte range (honouring If-Range), 416 to an unsatisfiable one,
+    and sends headers only for HEAD.
+    """
+    size = os.path.getsize(path)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    quoted = quote(filename)
+    disposition = (
+        f'attachment; filename="{filename}"' if quoted == filename
+        else f"attachment; filename*=utf-8''{quoted}"
+    )
+    headers = {
+        "ETag": etag,
+        "Last-Modified": _http_date(last_modified),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": disposition,
+    }
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    start, end = 0, size - 1
+    status_code = status.HTTP_200_OK
+    if size and _range_applies(request, etag, last_modified):
+        try:
+            requested = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if requested:
+            start, end = requested
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = max(end - start + 1, 0)
+    headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        _read_file(path, start, length),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
@@ -0,0 +1,236 @@
+"""Background text extraction for uploaded document files.
+
+Each upload adds a ``pending`` ``document_extractions`` row in the same
+transaction as its DocumentVersion, so the database is the durable queue:
+rows still pending at startup (including versions uploaded before this
+stage existed) are queued again. Workers hand files to a process pool,
+keeping parser CPU and memory out of the API process, then store the
+text and page/sheet counts through the write queue. The text of each
+document's latest version also goes into the search index.
+
+Content already extracted for another version with the same SHA-256 is
+copied instead of parsed again.
+
+Workers are started with ``spawn``, which imports the launching script in
+each of them; launch scripts keep their start-up code under
+``if __name__ == "__main__"`` and their imports light.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import run_in_read_session, write_queue
+from extractors import extract, init_worker, is_supported
+from models import DocumentExtraction, DocumentVersion
+from utils.blobs import UPLOAD_DIR
+from utils.search import index_content
+
+
+class ExtractionPipeline:
+    """Queues pending extractions and runs them on a process pool."""
+
+    def __init__(self, max_workers: int, tasks_per_child: int):
+        self.max_workers = max_workers
+        self.tasks_per_child = tasks_per_child
+        self.in_flight = 0
+        self.completed = 0
+        self.reused = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: set = set()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and threadpools
+        # is unsafe, and max_tasks_per_child requires it. Workers import
+        # only the extractors module (and the launching script, see above)
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            max_tasks_per_child=self.tasks_per_child
+        )
+
+    async def start(self) -> int:
+        """Start the workers and queue every pending extraction; returns how many."""
+        if self.running or self.max_workers <= 0:
+            return 0
+        self._queue = asyncio.Queue()
+        self._executor = self._new_executor()
+        pending = await self._recover()
+        for version_id in pending:
+            self.enqueue(version_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+        return len(pending)
+
+    async def stop(self) -> None:
+        """Stop the workers; unfinished extractions stay pending for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._queued.clear()
+
+    def enqueue(self, version_id: str) -> None:
+        """Queue a version whose pending extraction row has been committed."""
+        if self._queue is None or version_id in self._queued:
+            return
+        self._queued.add(version_id)
+        self._queue.put_nowait(version_id)
+
+    def stats(self) -> dict:
+        """Return queue depth, work in progress and counters."""
+        return {
+            "running": self.running,
+            "workers": self.max_workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
+
+    async def _recover(self) -> List[str]:
+        """Add pending rows for versions without one; return all pending ids."""
+        async def unit(db: AsyncSession) -> List[str]:
+            missing = (
+                select(DocumentVersion.id)
+                .outerjoin(DocumentExtraction, DocumentExtraction.version_id == DocumentVersion.id)
+                .where(DocumentVersion.file_url.is_not(None))
+                .where(DocumentExtraction.version_id.is_(None))
+            )
+            await db.execute(
+                insert(DocumentExtraction).from_select(["version_id"], missing)
+            )
+            result = await db.execute(
+                select(DocumentExtraction.version_id)
+                .where(DocumentExtraction.status == "pending")
+                .order_by(DocumentExtraction.created_at)
+            )
+            return list(result.scalars().all())
+
+        return await write_queue.submit(unit)
+
+    async def _work(self) -> None:
+        while True:
+            version_id = await self._queue.get()
+            self._queued.discard(version_id)
+            try:
+                await self._process(version_id)
+            except Exception as e:
+                print(f"Text extraction of version {version_id} failed: {e}")
+
+    async def _process(self, version_id: str) -> None:
+        async def load(db: AsyncSession):
+            result = await db.execute(
+                select(DocumentVersion, DocumentExtraction.status)
+                .join(DocumentExtraction, DocumentExtraction.version_id == DocumentVersion.id)
+                .where(DocumentVersion.id == version_id)
+            )
+            row = result.one_or_none()
+            if row is None or row.status != "pending":
+                return None, None
+            version = row.DocumentVersion
+            done = None
+            if version.sha256:
+                result = await db.execute(
+                    select(DocumentExtraction)
+                    .join(DocumentVersion, DocumentVersion.id == DocumentExtraction.version_id)
+                    .where(DocumentVersion.sha256 == version.sha256)
+                    .where(DocumentExtraction.status == "done")
+                    .limit(1)
+                )
+                done = result.scalar_one_or_none()
+            return version, done
+
+        version, done = await run_in_read_session(load)
+        if version is None:
+            return
+        if done is not None:
+            self.reused += 1
+            outcome = {
+                "status": "done",
+                "text": done.text,
+                "truncated": done.truncated,
+                "page_count": done.page_count,
+                "sheet_count": done.sheet_count,
+            }
+        elif not is_supported(version.file_name):
+            outcome = {"status": "unsupported"}
+        else:
+            outcome = await self._extract(version)
+        await self._save(version_id, outcome)
+
+    async def _extract(self, version: DocumentVersion) -> dict:
+        path = os.path.join(UPLOAD_DIR, version.file_url)
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(
+                self._executor, extract, path, version.file_name, settings.SEARCH_CONTENT_MAX_CHARS
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self.failed += 1
+            return {"status": "failed", "error": "Extraction worker exited unexpectedly"}
+        except Exception as e:
+            self.failed += 1
+            return {"status": "failed", "error": f"{type(e).__name__}: {e}"[:1000]}
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return {"status": "done", **result}
+
+    async def _save(self, version_id: str, outcome: dict) -> None:
+        async def unit(db: AsyncSession) -> None:
+            extraction = await db.get(DocumentExtraction, version_id)
+            version = await db.get(DocumentVersion, version_id)
+            if extraction is None or version is None:
+                return  # Version deleted meanwhile
+            for field, value in outcome.items():
+                setattr(extraction, field, value)
+            extraction.extracted_at = datetime.utcnow()
+            await db.flush()
+
+            result = await db.execute(
+                select(DocumentVersion.id)
+                .where(DocumentVersion.document_id == version.document_id)
+                .order_by(DocumentVersion.revision_number.desc())
+                .limit(1)
+            )
+            if result.scalar_one() == version_id:
+                await index_content(db, version.document_id, outcome.get("text"))
+
+        await write_queue.submit(unit)
+
+
+async def extraction_status_counts(db: AsyncSession) -> Dict[str, int]:
+    """Number of extraction rows per status; ``pending`` is the backlog."""
+    result = await db.execute(
+        select(DocumentExtraction.status, func.count()).group_by(DocumentExtraction.status)
+    )
+    return dict(result.all())
+
+
+extraction_pipeline = ExtractionPipeline(
+    max_workers=settings.EXTRACTION_WORKERS,
+    tasks_per_child=settings.EXTRACTION_TASKS_PER_CHILD
+)
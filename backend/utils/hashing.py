@@ -0,0 +1,67 @@
+"""Bounded worker pool for CPU-heavy password hashing."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from config import settings
+
+
+class HashingService:
+    """Runs bcrypt calls on a dedicated thread pool.
+
+    bcrypt releases the GIL, so a small thread pool keeps the event loop
+    responsive while hashes are computed. ``max_pending`` caps queued plus
+    running jobs; callers beyond the cap fail fast with 503 instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bcrypt"
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the pool, or raise 503 when saturated."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        """Return pool size, queue depth and counters."""
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queue_depth": max(self.pending - self.max_workers, 0),
+            "in_flight": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running hashes."""
+        self._executor.shutdown(wait=True)
+
+
+hashing_service = HashingService(
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_pending=settings.HASHING_MAX_PENDING,
+)
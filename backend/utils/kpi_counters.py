@@ -0,0 +1,142 @@
+"""Per-status row counts behind the dashboard KPIs, kept current on flush."""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import write_queue
+from models import (
+    KPICounter, Nonconformance, CAPARecord, AuditFinding, WorkOrder, InspectionRecord
+)
+from utils.table_versions import record_writes
+
+
+# Model -> entity key used in kpi_counters
+TRACKED = {
+    Nonconformance: "nc",
+    CAPARecord: "capa",
+    AuditFinding: "audit_finding",
+    WorkOrder: "work_order",
+    InspectionRecord: "inspection",
+}
+
+
+def _status_deltas(session: Session) -> Counter:
+    """Count changes per (entity, status) for the objects being flushed."""
+    deltas = Counter()
+    for obj in session.new:
+        entity = TRACKED.get(type(obj))
+        if entity and obj.status is not None:
+            deltas[(entity, obj.status)] += 1
+    for obj in session.deleted:
+        entity = TRACKED.get(type(obj))
+        if entity:
+            history = inspect(obj).attrs.status.history
+            for status in history.deleted or history.unchanged:
+                if status is not None:
+                    deltas[(entity, status)] -= 1
+    for obj in session.dirty:
+        entity = TRACKED.get(type(obj))
+        if not entity:
+            continue
+        history = inspect(obj).attrs.status.history
+        if not history.has_changes():
+            continue
+        for status in history.deleted:
+            if status is not None:
+                deltas[(entity, status)] -= 1
+        for status in history.added:
+            if status is not None:
+                deltas[(entity, status)] += 1
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def apply_kpi_deltas(session: Session, flush_context) -> None:
+    """Apply status count changes in the same transaction as the flush."""
+    deltas = [(key, delta) for key, delta in _status_deltas(session).items() if delta]
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    connection = session.connection()
+    for (entity, status), delta in deltas:
+        stmt = sqlite_insert(KPICounter).values(
+            entity=entity, status=status, count=delta, updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KPICounter.entity, KPICounter.status],
+            set_={"count": KPICounter.count + delta, "updated_at": now}
+        )
+        connection.execute(stmt)
+    record_writes(connection, [KPICounter.__tablename__])
+
+
+async def read_kpi_counts(db: AsyncSession) -> Dict[Tuple[str, str], int]:
+    """All counters as {(entity, status): count}."""
+    result = await db.execute(select(KPICounter.entity, KPICounter.status, KPICounter.count))
+    return {(entity, status): count for entity, status, count in result.all()}
+
+
+def kpi_total(counts: Dict[Tuple[str, str], int], entity: str, statuses: Iterable[str]) -> int:
+    """Sum the counters of ``entity`` over ``statuses``."""
+    return sum(counts.get((entity, status), 0) for status in statuses)
+
+
+async def reconcile_kpi_counters() -> int:
+    """Recount every tracked table and correct drifted counters.
+
+    Drift comes from writes that bypass the ORM (bulk statements, ON DELETE
+    CASCADE, scripts run without this module loaded). The recount runs as a
+    write unit, so no other write lands between counting and correcting.
+    Returns the number of counters changed.
+    """
+    async def unit(db: AsyncSession) -> int:
+        actual = {}
+        for model, entity in TRACKED.items():
+            result = await db.execute(
+                select(model.status, func.count()).where(model.status.is_not(None)).group_by(model.status)
+            )
+            for status, count in result.all():
+                actual[(entity, status)] = count
+
+        result = await db.execute(select(KPICounter))
+        stored = {(row.entity, row.status): row for row in result.scalars().all()}
+
+        changed = 0
+        now = datetime.utcnow()
+        for key, count in actual.items():
+            row = stored.pop(key, None)
+            if row is None:
+                db.add(KPICounter(entity=key[0], status=key[1], count=count, updated_at=now))
+                changed += 1
+            elif row.count != count:
+                row.count = count
+                changed += 1
+        for row in stored.values():
+            if row.count != 0:
+                row.count = 0
+                changed += 1
+        await db.flush()
+        return changed
+
+    return await write_queue.submit(unit)
+
+
+async def run_reconciliation(
+    interval: float, jobs: Dict[str, Callable[[], Awaitable[int]]]
+) -> None:
+    """Run each named reconcile job every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        for name, job in jobs.items():
+            try:
+                changed = await job()
+                if changed:
+                    print(f"{name} reconciled ({changed} corrected)")
+            except Exception as e:
+                print(f"{name} reconciliation failed: {e}")
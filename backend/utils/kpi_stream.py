@@ -0,0 +1,228 @@
+"""Server-sent KPI updates, computed once per change and fanned out.
+
+Routers register named KPI sources (a loader plus the models it reads).
+When a write bumps one of those tables, the broadcaster recomputes the
+source once, diffs it against the previous payload and hands the changed
+fields to every subscriber of that source.
+
+Subscribers never queue messages: each keeps at most one pending change
+set per source and newer deltas are merged into it. A slow consumer
+therefore skips intermediate values and receives the latest state when it
+catches up, and the broadcaster never waits on a client.
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import run_in_read_session
+from utils.table_versions import table_versions
+
+
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+# Wake up at least this often so date-relative figures roll over at midnight
+REFRESH_SECONDS = 60
+
+
+class Subscriber:
+    """One stream's pending changes, merged per source."""
+
+    def __init__(self, sources: Iterable[str]):
+        self.sources = set(sources)
+        self.pending: Dict[str, dict] = {}
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.coalesced = 0
+
+    def offer(self, source: str, changes: dict) -> None:
+        if source not in self.sources:
+            return
+        if source in self.pending:
+            self.coalesced += 1
+        self.pending.setdefault(source, {}).update(changes)
+        self.ready.set()
+
+    def take(self) -> Dict[str, dict]:
+        pending, self.pending = self.pending, {}
+        self.ready.clear()
+        return pending
+
+    def close(self) -> None:
+        self.closed = True
+        self.ready.set()
+
+
+class KPIBroadcaster:
+    """Recomputes registered KPI sources on table writes and fans out deltas."""
+
+    def __init__(self, debounce_ms: float, max_subscribers: int):
+        self.debounce = debounce_ms / 1000
+        self.max_subscribers = max_subscribers
+        self.computations = 0
+        self.broadcasts = 0
+        self._sources: Dict[str, Tuple[List[str], Loader]] = {}
+        self._latest: Dict[str, dict] = {}
+        self._computed_at: Dict[str, tuple] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    def register(self, name: str, models: Iterable[Any], loader: Loader) -> None:
+        """Publish ``loader(session)`` (a flat dict or model) as source ``name``."""
+        tables = sorted({model.__tablename__ for model in models})
+        self._sources[name] = (tables, loader)
+
+    def start(self) -> None:
+        """Start the recompute loop on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        table_versions.add_listener(self._on_tables_written)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop and end every open stream."""
+        table_versions.remove_listener(self._on_tables_written)
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, sources: Iterable[str]) -> Subscriber:
+        """Create a stream whose first message is the full state of ``sources``.
+
+        The subscriber is only registered once ``sse_events`` starts, so a
+        client that disconnects before its response is iterated leaves
+        nothing behind.
+        """
+        if self._task is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="KPI stream is not running"
+            )
+        if len(self._subscribers) >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many KPI stream subscribers"
+            )
+        return Subscriber(sources)
+
+    async def attach(self, subscriber: Subscriber) -> None:
+        """Register ``subscriber`` and queue the full state of its sources."""
+        if self._task is None:
+            subscriber.close()  # Stopped since subscribe()
+            return
+        # Registered first, so changes broadcast while the sources are
+        # being loaded are not missed
+        self._subscribers.add(subscriber)
+        for name in subscriber.sources:
+            await self._refresh(name)
+            subscriber.offer(name, dict(self._latest.get(name, {})))
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        """Return subscriber count and compute/broadcast counters."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sources": self.sources,
+            "subscribers": len(self._subscribers),
+            "computations": self.computations,
+            "broadcasts": self.broadcasts,
+            "coalesced": sum(s.coalesced for s in self._subscribers),
+        }
+
+    def _on_tables_written(self, tables: Set[str]) -> None:
+        # Called from flush/checkin hooks, possibly off the event loop thread
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    def _version_key(self, tables: List[str]) -> tuple:
+        return table_versions.snapshot(tables) + (datetime.utcnow().date(),)
+
+    async def _refresh(self, name: str) -> None:
+        """Recompute ``name`` if its tables changed; broadcast the changed fields."""
+        tables, loader = self._sources[name]
+        async with self._lock:
+            key = self._version_key(tables)
+            if self._computed_at.get(name) == key:
+                return
+            payload = jsonable_encoder(await run_in_read_session(loader))
+            self.computations += 1
+            self._computed_at[name] = key
+            previous = self._latest.get(name)
+            self._latest[name] = payload
+        if previous is None:
+            return
+        changes = {
+            field: value for field, value in payload.items()
+            if previous.get(field) != value
+        }
+        if changes:
+            self.broadcasts += 1
+            for subscriber in list(self._subscribers):
+                subscriber.offer(name, changes)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), REFRESH_SECONDS)
+                # Let the rest of a write burst land before recomputing
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            wanted = set()
+            for subscriber in self._subscribers:
+                wanted |= subscriber.sources
+            for name in wanted:
+                try:
+                    await self._refresh(name)
+                except Exception as e:
+                    print(f"KPI stream refresh of {name} failed: {e}")
+
+
+async def sse_events(subscriber: Subscriber, heartbeat: float):
+    """Render a subscriber's change sets as ``text/event-stream`` frames."""
+    event_id = 0
+    try:
+        await kpi_broadcaster.attach(subscriber)
+        while not subscriber.closed:
+            try:
+                await asyncio.wait_for(subscriber.ready.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            for source, changes in subscriber.take().items():
+                event_id += 1
+                data = json.dumps({"source": source, "changes": changes})
+                yield f"id: {event_id}\nevent: kpi\ndata: {data}\n\n"
+    finally:
+        kpi_broadcaster.unsubscribe(subscriber)
+
+
+kpi_broadcaster = KPIBroadcaster(
+    debounce_ms=settings.KPI_PUSH_DEBOUNCE_MS,
+    max_subscribers=settings.KPI_PUSH_MAX_SUBSCRIBERS
+)
@@ -0,0 +1,219 @@
+"""Daily NC rollup behind the trend charts, kept current on flush."""
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import write_queue
+from models import Nonconformance, NCDailyRollup
+from utils.table_versions import record_writes
+
+
+DIMENSIONS = ("severity", "source", "root_cause_category")
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+RollupKey = Tuple[date, str, str, str]
+
+
+def _key(created_at: Optional[datetime], *dimensions: Optional[str]) -> Optional[RollupKey]:
+    if created_at is None:
+        return None
+    return (created_at.date(),) + tuple(value or "" for value in dimensions)
+
+
+def _old_value(state, attr: str):
+    history = state.attrs[attr].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else None
+
+
+def _rollup_deltas(session: Session) -> Counter:
+    """Count changes per rollup key for the NCs being flushed."""
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Nonconformance):
+            key = _key(obj.created_at, *(getattr(obj, attr) for attr in DIMENSIONS))
+            if key:
+                deltas[key] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Nonconformance):
+            state = inspect(obj)
+            key = _key(*(_old_value(state, attr) for attr in ("created_at",) + DIMENSIONS))
+            if key:
+                deltas[key] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, Nonconformance):
+            continue
+        state = inspect(obj)
+        attrs = ("created_at",) + DIMENSIONS
+        if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+            continue
+        old = _key(*(_old_value(state, attr) for attr in attrs))
+        new = _key(*(getattr(obj, attr) for attr in attrs))
+        if old != new:
+            if old:
+                deltas[old] -= 1
+            if new:
+                deltas[new] += 1
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def apply_rollup_deltas(session: Session, flush_context) -> None:
+    """Apply rollup changes in the same transaction as the flush."""
+    deltas = [(key, delta) for key, delta in _rollup_deltas(session).items() if delta]
+    if not deltas:
+        return
+    connection = session.connection()
+    for (day, severity, source, root_cause_category), delta in deltas:
+        stmt = sqlite_insert(NCDailyRollup).values(
+            day=day, severity=severity, source=source,
+            root_cause_category=root_cause_category, count=delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                NCDailyRollup.day, NCDailyRollup.severity,
+                NCDailyRollup.source, NCDailyRollup.root_cause_category
+            ],
+            set_={"count": NCDailyRollup.count + delta}
+        )
+        connection.execute(stmt)
+    record_writes(connection, [NCDailyRollup.__tablename__])
+
+
+async def reconcile_nc_rollup() -> int:
+    """Rebuild the rollup from nonconformances and correct drifted rows.
+
+    Runs as a write unit like ``reconcile_kpi_counters``; also backfills the
+    table on the first start after it is created. Returns the number of
+    rows changed.
+    """
+    async def unit(db: AsyncSession) -> int:
+        # SQLite stores DateTime as ISO text, so "YYYY-MM-DD" is a plain prefix
+        day_key = func.substr(Nonconformance.created_at, 1, 10)
+        dimensions = [func.coalesce(getattr(Nonconformance, attr), "") for attr in DIMENSIONS]
+        result = await db.execute(
+            select(day_key, *dimensions, func.count())
+            .where(Nonconformance.created_at.is_not(None))
+            .group_by(day_key, *dimensions)
+        )
+        actual = {
+            (date.fromisoformat(day), *dims): count
+            for day, *dims, count in result.all()
+        }
+
+        result = await db.execute(select(NCDailyRollup))
+        stored = {
+            (row.day, row.severity, row.source, row.root_cause_category): row
+            for row in result.scalars().all()
+        }
+
+        changed = 0
+        for key, count in actual.items():
+            row = stored.pop(key, None)
+            if row is None:
+                db.add(NCDailyRollup(
+                    day=key[0], severity=key[1], source=key[2],
+                    root_cause_category=key[3], count=count
+                ))
+                changed += 1
+            elif row.count != count:
+                row.count = count
+                changed += 1
+        # Leftover rows are drift or zeroed-out keys; only the former count
+        for row in stored.values():
+            if row.count != 0:
+                changed += 1
+            await db.delete(row)
+        await db.flush()
+        return changed
+
+    return await write_queue.submit(unit)
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the bucket containing ``day``."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return day
+
+
+def shift_bucket(start: date, granularity: str, count: int) -> date:
+    """Start of the bucket ``count`` buckets after (or before) ``start``."""
+    if granularity == "day":
+        return start + timedelta(days=count)
+    if granularity == "week":
+        return start + timedelta(weeks=count)
+    months = count * (3 if granularity == "quarter" else 1)
+    index = start.year * 12 + start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bucket_label(start: date, granularity: str) -> str:
+    if granularity == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return start.strftime("%b %Y")
+    if granularity == "quarter":
+        return f"Q{(start.month - 1) // 3 + 1} {start.year}"
+    return start.isoformat()
+
+
+def bucket_count(start: date, end: date, granularity: str) -> int:
+    """Number of buckets ``trend_buckets`` returns, without building them."""
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // (3 if granularity == "quarter" else 1) + 1
+
+
+def trend_buckets(start: date, end: date, granularity: str) -> List[date]:
+    """Start of every bucket overlapping [start, end], oldest first."""
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        buckets.append(current)
+        current = shift_bucket(current, granularity, 1)
+    return buckets
+
+
+async def load_trend(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    granularity: str,
+    filters: Optional[Dict[str, str]] = None
+) -> Tuple[List[date], List[int]]:
+    """NCs created per bucket between ``start`` and ``end`` (inclusive).
+
+    One range scan over the rollup's primary key returns at most one row
+    per day, which is then folded into buckets; the cost depends on the
+    number of days in range, not on how many NCs they hold.
+    """
+    buckets = trend_buckets(start, end, granularity)
+    query = (
+        select(NCDailyRollup.day, func.sum(NCDailyRollup.count))
+        .where(NCDailyRollup.day >= start, NCDailyRollup.day <= end)
+        .group_by(NCDailyRollup.day)
+    )
+    for attr, value in (filters or {}).items():
+        if value is not None:
+            query = query.where(getattr(NCDailyRollup, attr) == value)
+    result = await db.execute(query)
+
+    totals = Counter()
+    for day, count in result.all():
+        totals[bucket_start(day, granularity)] += count
+    return buckets, [totals.get(bucket, 0) for bucket in buckets]
@@ -0,0 +1,98 @@
+"""Keyset (cursor) pagination for list endpoints."""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, and_, tuple_
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _dump_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    return ["v", value]
+
+
+def _load_value(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(sort_value: Any, row_id: str) -> str:
+    """Encode a (sort key, id) position as an opaque URL-safe token."""
+    raw = json.dumps(_dump_value(sort_value) + [row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Any, str]:
+    """Decode a token from ``encode_cursor``; raises 400 if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        kind, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return _load_value(kind, value), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_page(
+    query: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    descending: bool = True
+) -> Select:
+    """Order ``query`` by (sort key, id) and select one page.
+
+    With a ``cursor`` the page starts right after the encoded position, which
+    the (sort key, id) index resolves without scanning skipped rows; without
+    one, ``skip`` is applied as an OFFSET for older clients. One extra row is
+    fetched so ``page_results`` can tell whether another page exists.
+
+    Sort keys are expected to be set on every row (they all have column
+    defaults); rows with a NULL key are not reached from a non-NULL cursor.
+    """
+    if descending:
+        query = query.order_by(None).order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(None).order_by(sort_column.asc(), id_column.asc())
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            after = id_column < row_id if descending else id_column > row_id
+            query = query.where(and_(sort_column.is_(None), after))
+        elif descending:
+            query = query.where(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+        else:
+            query = query.where(tuple_(sort_column, id_column) > tuple_(sort_value, row_id))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def page_results(
+    response: Response, rows: Sequence[Any], limit: int, sort_attr: str
+) -> List[Any]:
+    """Trim the look-ahead row and expose the next cursor in ``X-Next-Cursor``."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), last.id)
+    return rows
@@ -0,0 +1,104 @@
+"""Compiled role permissions for query-free authorization checks."""
+import asyncio
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal
+from models import Role
+
+
+# Roles with this name, or with an "all" / "*" grant, may do everything
+SUPERUSER_ROLE = "System Admin"
+SUPERUSER_GRANTS = {"all", "*"}
+
+
+class CompiledRole:
+    """A role's permissions flattened into an exact set plus wildcard prefixes.
+
+    ``{"nc.create": True, "capa.*": True}`` compiles to the exact set
+    ``{"nc.create"}`` and the prefix ``"capa."``. Wildcard lookups are
+    memoized so every permission is resolved at most once per role.
+    """
+
+    __slots__ = ("role_id", "name", "is_superuser", "exact", "prefixes", "_resolved")
+
+    def __init__(self, role_id: str, name: str, permissions: Optional[dict]):
+        granted = {key for key, value in (permissions or {}).items() if value}
+        self.role_id = role_id
+        self.name = name
+        self.is_superuser = name == SUPERUSER_ROLE or bool(granted & SUPERUSER_GRANTS)
+        self.exact: FrozenSet[str] = frozenset(key for key in granted if not key.endswith("*"))
+        self.prefixes: Tuple[str, ...] = tuple(
+            key[:-1] for key in granted if key.endswith(".*")
+        )
+        self._resolved: Dict[str, bool] = {}
+
+    def allows(self, permission: str) -> bool:
+        """Return True if the role grants ``permission``."""
+        if self.is_superuser or permission in self.exact:
+            return True
+        allowed = self._resolved.get(permission)
+        if allowed is None:
+            allowed = any(permission.startswith(prefix) for prefix in self.prefixes)
+            self._resolved[permission] = allowed
+        return allowed
+
+
+class PermissionRegistry:
+    """Process-wide map of role id to compiled permissions.
+
+    The registry is loaded at startup and rebuilt whenever roles change
+    through ``/api/roles``; lookups never touch the database.
+    """
+
+    def __init__(self):
+        self._roles: Dict[str, CompiledRole] = {}
+        self.version = 0
+        self._reload_lock = asyncio.Lock()
+        self._loaded_at = 0.0
+
+    def load(self, roles: Iterable[Role]) -> None:
+        """Replace the registry contents with the given roles."""
+        self._roles = {
+            role.id: CompiledRole(role.id, role.name, role.permissions) for role in roles
+        }
+        self.version += 1
+        self._loaded_at = time.monotonic()
+
+    async def reload(self, db: Optional[AsyncSession] = None) -> None:
+        """Rebuild the registry from the roles table."""
+        if db is not None:
+            result = await db.execute(select(Role))
+            self.load(result.scalars().all())
+            return
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Role))
+            self.load(result.scalars().all())
+
+    def get(self, role_id: str) -> Optional[CompiledRole]:
+        """Return the compiled role or None if it is unknown."""
+        return self._roles.get(role_id)
+
+    async def resolve(self, role_id: str) -> Optional[CompiledRole]:
+        """Return the compiled role, reloading once if it is unknown.
+
+        The role may have been created by another worker process. Reloads
+        triggered by misses happen at most once per
+        ``ROLE_RELOAD_INTERVAL_SECONDS``, so requests carrying a deleted or
+        bogus role id cannot turn every check into a query.
+        """
+        role = self._roles.get(role_id)
+        if role is not None:
+            return role
+        async with self._reload_lock:
+            # A concurrent miss may have reloaded while this one waited
+            if time.monotonic() - self._loaded_at >= settings.ROLE_RELOAD_INTERVAL_SECONDS:
+                await self.reload()
+        return self._roles.get(role_id)
+
+
+permission_registry = PermissionRegistry()
@@ -0,0 +1,123 @@
+"""In-memory JWT revocation list backed by the revoked_tokens table."""
+import hashlib
+import math
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal
+from models import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    """Revoked token ids held in memory so auth checks never hit SQLite.
+
+    The bloom filter answers the common "not revoked" case without touching
+    the exact set; the set settles the rare positives. Both are rebuilt
+    from ``revoked_tokens`` at startup, dropping rows that have expired.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: set = set()
+        self._claimed: set = set()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Return True if ``jti`` has been revoked."""
+        if not jti or jti not in self._bloom:
+            return False
+        return jti in self._revoked
+
+    def _remember(self, jti: str) -> None:
+        self._revoked.add(jti)
+        self._bloom.add(jti)
+        if len(self._revoked) > self._bloom.capacity:
+            self._rebuild(self._bloom.capacity * 2)
+
+    def _rebuild(self, capacity: int) -> None:
+        self._bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+    async def revoke(
+        self,
+        db: AsyncSession,
+        jti: str,
+        expires_at: datetime,
+        user_id: Optional[str] = None,
+        token_type: Optional[str] = None
+    ) -> bool:
+        """Persist a revocation and make it effective immediately.
+
+        Returns False if ``jti`` was already revoked, including by a concurrent
+        call that has not committed yet, so single-use tokens can be rejected.
+        """
+        if jti in self._revoked or jti in self._claimed:
+            return False
+        # Claimed before the commit is awaited: a second request with the same
+        # token must not get past the check above meanwhile
+        self._claimed.add(jti)
+        try:
+            db.add(RevokedToken(
+                jti=jti, user_id=user_id, token_type=token_type, expires_at=expires_at
+            ))
+            await db.commit()
+        except IntegrityError:
+            # Revoked through another process
+            await db.rollback()
+            self._remember(jti)
+            return False
+        finally:
+            self._claimed.discard(jti)
+        self._remember(jti)
+        return True
+
+    async def load(self) -> None:
+        """Rebuild the in-memory list from the table, pruning expired rows."""
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            result = await db.execute(select(RevokedToken.jti))
+            jtis = result.scalars().all()
+            await db.commit()
+
+        self._revoked = set(jtis)
+        self._rebuild(max(settings.REVOCATION_BLOOM_CAPACITY, len(self._revoked) * 2))
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
@@ -0,0 +1,212 @@
+"""Full-text document search on SQLite FTS5.
+
+``document_search`` holds one row per document with the fields that are
+searched: doc_number, title, description and the text of the latest
+uploaded file. ``document_search_fts`` is an external-content FTS5 index
+over it, kept in step by triggers, so the text is stored once and
+``snippet()`` reads it from ``document_search``.
+
+Document fields are copied into ``document_search`` on flush, in the same
+transaction as the write; file text is set by the extraction pipeline
+through ``index_content``. ``reconcile_search_index`` backfills and corrects rows.
+"""
+import html
+from typing import Optional
+
+from sqlalchemy import Select, column, delete, event, func, inspect, literal_column, select, table
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import write_queue
+from models import Document, DocumentSearch
+from utils.table_versions import record_writes
+
+
+FTS_TABLE = "document_search_fts"
+FIELDS = ("doc_number", "title", "description")
+
+# bm25 column weights: doc_number, title, description, content
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+SNIPPET_TOKENS = 16
+# Core handles on the index: ``_fts`` for joins on rowid, ``_fts_name`` for
+# the MATCH operator and the auxiliary functions, which take the table itself
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_name = literal_column(FTS_TABLE)
+
+# Control characters mark matches inside snippet() so the surrounding text
+# can be HTML-escaped before they are turned into <mark> tags
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        doc_number, title, description, content,
+        content='document_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_search_ai AFTER INSERT ON document_search BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, doc_number, title, description, content)
+        VALUES (new.id, new.doc_number, new.title, new.description, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_search_ad AFTER DELETE ON document_search BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, doc_number, title, description, content)
+        VALUES ('delete', old.id, old.doc_number, old.title, old.description, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_search_au AFTER UPDATE ON document_search BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, doc_number, title, description, content)
+        VALUES ('delete', old.id, old.doc_number, old.title, old.description, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, doc_number, title, description, content)
+        VALUES (new.id, new.doc_number, new.title, new.description, new.content);
+    END
+    """,
+)
+
+
+@event.listens_for(DocumentSearch.__table__, "after_create")
+def create_fts_index(target, connection, **kw) -> None:
+    """Create the FTS5 index and its sync triggers with ``document_search``."""
+    for ddl in _FTS_DDL:
+        connection.exec_driver_sql(ddl)
+
+
+def _upsert(connection, document_id: str, values: dict) -> None:
+    stmt = sqlite_insert(DocumentSearch).values(document_id=document_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[DocumentSearch.document_id], set_=values)
+    connection.execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def sync_search_rows(session: Session, flush_context) -> None:
+    """Copy searched Document fields in the same transaction as the flush."""
+    upserts = []
+    deleted = []
+    for obj in session.new:
+        if isinstance(obj, Document):
+            upserts.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Document):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in FIELDS):
+                upserts.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Document):
+            deleted.append(obj.id)
+    if not upserts and not deleted:
+        return
+    connection = session.connection()
+    for document in upserts:
+        _upsert(connection, document.id, {field: getattr(document, field) for field in FIELDS})
+    if deleted:
+        connection.execute(delete(DocumentSearch).where(DocumentSearch.document_id.in_(deleted)))
+    record_writes(connection, [DocumentSearch.__tablename__])
+
+
+async def index_content(db: AsyncSession, document_id: str, content: Optional[str]) -> None:
+    """Replace the file text indexed for a document (from inside a write unit)."""
+    def write(connection) -> None:
+        _upsert(connection, document_id, {"content": content})
+        record_writes(connection, [DocumentSearch.__tablename__])
+    
+    connection = await db.connection()
+    await connection.run_sync(write)
+
+
+def match_expression(text: str) -> Optional[str]:
+    """FTS5 MATCH expression for a search box query, or None if it has no words.
+
+    Each whitespace-separated word becomes a quoted phrase, so punctuation
+    such as the hyphen in "SOP-0001" cannot break the query syntax. Words
+    ending in ``*`` match as prefixes, and so does the last word, to
+    support search-as-you-type.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.replace('"', "").strip("*")
+        if any(char.isalnum() for char in word):
+            terms.append([word, prefix])
+    if not terms:
+        return None
+    terms[-1][1] = True
+    return " ".join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+
+
+def matching_document_ids(expression: str) -> Select:
+    """Ids of documents matching ``expression``, for use in an IN filter."""
+    return (
+        select(DocumentSearch.document_id)
+        .join(_fts, _fts.c.rowid == DocumentSearch.id)
+        .where(_fts_name.match(expression))
+    )
+
+
+def ranked_search(expression: str) -> Select:
+    """Documents matching ``expression`` best first, with bm25 rank and a snippet.
+
+    Rows are ``(Document, rank, snippet)``; lower ranks are better matches.
+    Filters, OFFSET and LIMIT can be added by the caller.
+    """
+    # Not labelled "rank", which is also a hidden column of FTS5 tables
+    rank = func.bm25(_fts_name, *RANK_WEIGHTS).label("score")
+    snippet = func.snippet(
+        _fts_name, -1, _MARK_START, _MARK_END, "…", SNIPPET_TOKENS
+    ).label("snippet")
+    return (
+        select(Document, rank, snippet)
+        .select_from(DocumentSearch)
+        .join(_fts, _fts.c.rowid == DocumentSearch.id)
+        .join(Document, Document.id == DocumentSearch.document_id)
+        .where(_fts_name.match(expression))
+        .order_by(rank, Document.id)
+    )
+
+
+def render_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and wrap its matches in ``<mark>`` tags."""
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+async def reconcile_search_index() -> int:
+    """Bring ``document_search`` in line with documents.
+
+    Runs as a write unit like the other reconcile jobs; also backfills the
+    index on the first start after it is created. File text is left alone.
+    Returns the number of rows changed.
+    """
+    async def unit(db: AsyncSession) -> int:
+        result = await db.execute(select(Document.id, *(getattr(Document, f) for f in FIELDS)))
+        actual = {row[0]: tuple(row[1:]) for row in result.all()}
+
+        result = await db.execute(select(DocumentSearch))
+        stored = {row.document_id: row for row in result.scalars().all()}
+
+        changed = 0
+        for document_id, values in actual.items():
+            row = stored.pop(document_id, None)
+            if row is None:
+                db.add(DocumentSearch(document_id=document_id, **dict(zip(FIELDS, values))))
+                changed += 1
+            elif tuple(getattr(row, field) for field in FIELDS) != values:
+                for field, value in zip(FIELDS, values):
+                    setattr(row, field, value)
+                changed += 1
+        for row in stored.values():
+            await db.delete(row)
+            changed += 1
+        await db.flush()
+        return changed
+
+    return await write_queue.submit(unit)
@@ -0,0 +1,84 @@
+"""Record number sequences backed by the sequence_counters table."""
+import asyncio
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import write_queue
+from models import SequenceCounter
+
+
+class SequenceService:
+    """Hands out human-readable record numbers such as ``NC-2026-0042``.
+
+    Each scope (prefix plus year, or prefix alone) has a row in
+    ``sequence_counters`` holding the highest number reserved so far.
+    Numbers are reserved ``block_size`` at a time through the write queue
+    and then served from memory (hi/lo), so most allocations never touch
+    the database and none of them count rows. Reservations are committed
+    before a number is used, so numbers stay unique across processes;
+    numbers left in a block when the process stops are skipped.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = max(block_size, 1)
+        self._blocks: Dict[str, List[int]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def next_value(self, scope: str, column=None) -> int:
+        """Return the next number in ``scope``.
+
+        ``column`` is the model column holding the formatted numbers; it is
+        only read the first time a scope is used, to continue after the
+        numbers that already exist.
+        """
+        lock = self._locks.setdefault(scope, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(scope)
+            if block is None or block[0] > block[1]:
+                hi = await self._reserve(scope, column)
+                block = self._blocks[scope] = [hi - self.block_size + 1, hi]
+            value = block[0]
+            block[0] += 1
+            return value
+
+    async def next_number(
+        self, prefix: str, column=None, width: int = 4, yearly: bool = True
+    ) -> str:
+        """Return the next formatted number, e.g. ``NC-2026-0001`` or ``EQP-0001``."""
+        scope = f"{prefix}-{date.today().year}" if yearly else prefix
+        value = await self.next_value(scope, column)
+        return f"{scope}-{value:0{width}d}"
+
+    async def _reserve(self, scope: str, column) -> int:
+        """Reserve the next block for ``scope`` and return its last number."""
+        async def unit(db: AsyncSession) -> int:
+            counter = await db.get(SequenceCounter, scope)
+            if counter is None:
+                counter = SequenceCounter(
+                    scope=scope, value=await self._existing_max(db, scope, column)
+                )
+                db.add(counter)
+            counter.value += self.block_size
+            await db.flush()
+            return counter.value
+
+        return await write_queue.submit(unit)
+
+    @staticmethod
+    async def _existing_max(db: AsyncSession, scope: str, column) -> int:
+        """Highest number already used in ``scope``, from the records themselves."""
+        if column is None:
+            return 0
+        start = len(scope) + 2
+        result = await db.execute(
+            select(func.max(cast(func.substr(column, start), Integer)))
+            .where(column.like(f"{scope}-%"))
+        )
+        return result.scalar() or 0
+
+
+sequence_service = SequenceService(block_size=settings.SEQUENCE_BLOCK_SIZE)
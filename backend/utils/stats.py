@@ -0,0 +1,42 @@
+"""Conditional row counts for the department stats endpoints."""
+from typing import Optional
+
+from sqlalchemy import case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Subquery
+
+
+def counts(model, **labels: Optional[ColumnElement]) -> Subquery:
+    """One aggregate row over ``model`` with a count per label.
+
+    A label mapped to ``None`` counts every row; one mapped to a condition
+    counts the matching rows, so all counts of a table share a single scan.
+    A lone condition is applied as a WHERE instead, which lets SQLite use
+    an index on the filtered column.
+    """
+    if len(labels) == 1:
+        (label, condition), = labels.items()
+        query = select(func.count().label(label)).select_from(model)
+        if condition is not None:
+            query = query.where(condition)
+        return query.subquery()
+    columns = [
+        func.count().label(label) if condition is None
+        else func.count(case((condition, 1))).label(label)
+        for label, condition in labels.items()
+    ]
+    return select(*columns).select_from(model).subquery()
+
+
+async def fetch_counts(db: AsyncSession, *subqueries: Subquery) -> dict:
+    """Run ``counts()`` subqueries as one statement; return label -> count.
+
+    Every subquery yields exactly one row, so joining them on TRUE gives a
+    single row holding all counts in one round trip.
+    """
+    source = subqueries[0]
+    for subquery in subqueries[1:]:
+        source = source.join(subquery, true())
+    columns = [column for subquery in subqueries for column in subquery.c]
+    result = await db.execute(select(*columns).select_from(source))
+    return {key: value or 0 for key, value in result.one()._mapping.items()}
@@ -0,0 +1,103 @@
+"""Streaming NDJSON/CSV responses for register endpoints."""
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, inspect
+
+from config import settings
+from database import ReadSessionLocal
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+def stream_format(request: Request, format: Optional[str]) -> Optional[str]:
+    """Return "ndjson" or "csv" if the client asked for a streamed body.
+
+    ``?format=`` wins over the Accept header; ``?format=json`` forces the
+    regular JSON array.
+    """
+    if format:
+        fmt = format.lower()
+        if fmt == "json":
+            return None
+        if fmt in ("ndjson", "csv"):
+            return fmt
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be one of: json, ndjson, csv"
+        )
+    accept = request.headers.get("accept", "")
+    if NDJSON_MEDIA_TYPE in accept:
+        return "ndjson"
+    if CSV_MEDIA_TYPE in accept:
+        return "csv"
+    return None
+
+
+def _column_keys(query: Select) -> List[str]:
+    entity = query.column_descriptions[0]["entity"]
+    return [attr.key for attr in inspect(entity).column_attrs]
+
+
+async def _partitions(query: Select) -> AsyncIterator[list]:
+    # The request's session is closed before the body is sent, so the
+    # stream reads through its own session for as long as it runs.
+    async with ReadSessionLocal() as session:
+        result = await session.stream_scalars(
+            query.execution_options(yield_per=settings.STREAM_CHUNK_ROWS)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+
+async def _ndjson(query: Select, keys: List[str]) -> AsyncIterator[str]:
+    async for rows in _partitions(query):
+        yield "".join(
+            json.dumps(jsonable_encoder({key: getattr(row, key) for key in keys})) + "\n"
+            for row in rows
+        )
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+async def _csv(query: Select, keys: List[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    yield buffer.getvalue()
+    async for rows in _partitions(query):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([_csv_value(jsonable_encoder(getattr(row, key))) for key in keys])
+        yield buffer.getvalue()
+
+
+def stream_query(query: Select, fmt: str, filename: str) -> StreamingResponse:
+    """Stream the rows of a single-entity ``query`` as NDJSON or CSV.
+
+    Rows are fetched ``STREAM_CHUNK_ROWS`` at a time and each batch is sent
+    as soon as it is encoded, so memory stays flat however large the
+    register grows.
+    """
+    keys = _column_keys(query)
+    if fmt == "csv":
+        return StreamingResponse(
+            _csv(query, keys),
+            media_type=CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+    return StreamingResponse(_ndjson(query, keys), media_type=NDJSON_MEDIA_TYPE)
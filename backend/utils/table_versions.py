@@ -0,0 +1,160 @@
+"""Per-table write versions and version-keyed response caching.
+
+Every ORM flush bumps the version of each table it touched. Read endpoints
+declare the tables they depend on; their ETag and cache key are derived
+from those versions, so an unchanged poll is answered with 304 (or from the
+cache) without touching the database.
+"""
+import hashlib
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, object_mapper
+from sqlalchemy.pool import Pool
+
+from config import settings
+from utils.cache import TTLCache
+
+
+PENDING_KEY = "pending_table_writes"
+
+
+class TableVersions:
+    """Monotonic write counter per table name, local to this process.
+
+    ``epoch`` changes on every start, so ETags issued before a restart
+    never match the fresh (reset) counters.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """Call ``listener(tables)`` after every bump; it must not block."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+        for listener in list(self._listeners):
+            listener(tables)
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+
+table_versions = TableVersions()
+response_cache = TTLCache(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES, ttl=None)
+
+
+def _flushed_tables(session: Session) -> set:
+    tables = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        try:
+            tables.update(table.name for table in object_mapper(obj).tables)
+        except Exception:
+            continue
+    return tables
+
+
+def record_writes(connection, tables: Iterable[str]) -> None:
+    """Bump ``tables`` now and again once ``connection`` has committed.
+
+    The first bump stops new cache entries from being trusted while the
+    write is in flight; the second (on connection checkin) covers readers
+    that computed a response from the pre-commit snapshot in between.
+    Flush hooks that write extra tables through Core call this themselves.
+    """
+    tables = set(tables)
+    if not tables:
+        return
+    table_versions.bump(tables)
+    connection.info.setdefault(PENDING_KEY, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def record_table_writes(session: Session, flush_context) -> None:
+    """Record the tables of every object in the flush."""
+    tables = _flushed_tables(session)
+    if tables:
+        record_writes(session.connection(), tables)
+
+
+@event.listens_for(Engine, "rollback")
+def discard_table_writes(conn) -> None:
+    conn.info.pop(PENDING_KEY, None)
+
+
+@event.listens_for(Pool, "checkin")
+def publish_table_writes(dbapi_connection, connection_record) -> None:
+    # Checkin follows the COMMIT (or ROLLBACK) of every pooled connection
+    tables = connection_record.info.pop(PENDING_KEY, None)
+    if tables:
+        table_versions.bump(tables)
+
+
+def _etag(key: tuple) -> str:
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'"{table_versions.epoch}-{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def versioned_response(
+    request: Request,
+    models: Iterable[Any],
+    produce: Callable[[], Awaitable[Any]]
+) -> Response:
+    """Serve ``produce()`` with an ETag derived from the models' table versions.
+
+    A matching ``If-None-Match`` gets an empty 304; otherwise the body comes
+    from ``response_cache`` when the versions are unchanged, or is computed
+    and cached. The key includes today's date because some figures (overdue
+    trainings, PMs due this month) move with the calendar, not with writes.
+
+    ``produce`` must open its own session, e.g. through ``run_in_read_session``,
+    and not reuse the request's: a snapshot opened before the versions are
+    read could be cached under versions that already include a newer write.
+    """
+    tables = sorted({model.__tablename__ for model in models})
+    versions = table_versions.snapshot(tables)
+    key = (
+        request.url.path, str(request.url.query), tuple(tables), versions,
+        datetime.utcnow().date().isoformat()
+    )
+    etag = _etag(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    content = response_cache.get(key)
+    if content is None:
+        content = jsonable_encoder(await produce())
+        # Only keep the body if no write to these tables landed meanwhile
+        if table_versions.snapshot(tables) == versions:
+            response_cache.set(key, content)
+    return JSONResponse(content=content, headers=headers)
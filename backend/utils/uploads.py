@@ -0,0 +1,227 @@
+"""Streaming file uploads: chunked disk writes, SHA-256 and size limits.
+
+``receive_upload`` parses a multipart request body as it arrives instead
+of letting the framework spool it first. File bytes are hashed and written
+to a temporary file in the target directory from the threadpool, in
+``UPLOAD_CHUNK_BYTES`` pieces, so the event loop never blocks on disk I/O.
+Oversized uploads are refused from ``Content-Length`` before any byte is
+read, or as soon as the streamed size crosses the limit.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from utils.cache import TTLCache
+
+
+# upload_id -> progress dict, polled by clients while an upload runs
+upload_progress = TTLCache(maxsize=1024, ttl=3600)
+
+
+@dataclass
+class ReceivedFile:
+    """A fully received upload, still at its temporary path."""
+    field_name: str
+    filename: str
+    content_type: Optional[str]
+    temp_path: str
+    size: int
+    sha256: str
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the maximum upload size of {max_bytes} bytes"
+    )
+
+
+class _FileSink:
+    """Temporary file plus running hash, written from the threadpool."""
+
+    def __init__(self, directory: str):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def finish(self) -> str:
+        """Flush to stable storage and return the hex digest."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return self._hash.hexdigest()
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _StreamingForm:
+    """Multipart callbacks that hand file bytes to a sink instead of memory."""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.pending: List[bytes] = []
+        self.finished = False
+        self._in_file = False
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._header_name = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = []
+        self._in_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # Only the first part named ``field_name`` that carries a file is kept
+        if name == self.field_name and b"filename" in options and self.filename is None:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+            self._in_file = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_file:
+            self.finished = True
+            self._in_file = False
+
+    def take(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending.clear()
+        return data
+
+
+def multipart_body(field_name: str = "file") -> dict:
+    """``openapi_extra`` documenting a body read with ``receive_upload``.
+
+    The route takes the raw ``Request``, so FastAPI cannot infer the form
+    from its signature.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [field_name],
+                        "properties": {field_name: {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    }
+
+
+async def receive_upload(
+    request: Request,
+    directory: str,
+    field_name: str = "file",
+    max_bytes: Optional[int] = None,
+    upload_id: Optional[str] = None
+) -> ReceivedFile:
+    """Stream the ``field_name`` file of a multipart request into ``directory``.
+
+    The caller moves ``temp_path`` into place (``os.replace`` within the same
+    directory is atomic) or deletes it. With an ``upload_id``, progress is
+    published in ``upload_progress`` as it arrives.
+    """
+    max_bytes = settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    total = int(declared) if declared and declared.isdigit() else None
+    # The multipart envelope adds a little on top of the file itself
+    if total is not None and total > max_bytes + 64 * 1024:
+        raise _too_large(max_bytes)
+
+    progress = {"state": "receiving", "received": 0, "total": total}
+    if upload_id:
+        upload_progress.set(upload_id, progress)
+
+    form = _StreamingForm(field_name)
+    parser = MultipartParser(params[b"boundary"], form.callbacks())
+    sink = await run_in_threadpool(_FileSink, directory)
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            progress["received"] += len(chunk)
+            buffered = sum(len(part) for part in form.pending)
+            if sink.size + buffered > max_bytes:
+                raise _too_large(max_bytes)
+            if buffered >= settings.UPLOAD_CHUNK_BYTES:
+                await run_in_threadpool(sink.write, form.take())
+        parser.finalize()
+        if form.pending:
+            await run_in_threadpool(sink.write, form.take())
+        if form.filename is None or not form.finished:
+            raise HTTPException(status_code=400, detail=f"No file in form field '{field_name}'")
+        digest = await run_in_threadpool(sink.finish)
+    except MultipartParseError as exc:
+        progress["state"] = "rejected"
+        sink.discard()
+        raise HTTPException(status_code=400, detail="Malformed multipart body") from exc
+    except BaseException as exc:
+        # Also reached on client disconnect/cancellation, so no awaits here
+        progress["state"] = "rejected" if isinstance(exc, HTTPException) else "failed"
+        sink.discard()
+        raise
+
+    progress["state"] = "received"
+    return ReceivedFile(
+        field_name=field_name,
+        filename=form.filename,
+        content_type=form.content_type,
+        temp_path=sink.path,
+        size=sink.size,
+        sha256=digest
+    )
@@ -37,6 +37,7 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
                 } catch (error) {
                     console.error('Failed to load user:', error);
                     localStorage.removeItem('token');
+                    localStorage.removeItem('refresh_token');
                     localStorage.removeItem('user');
                     setToken(null);
                 }
@@ -50,9 +51,12 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     const login = async (username: string, password: string) => {
         try {
             const response = await authApi.login(username, password);
-            const { access_token } = response;
+            const { access_token, refresh_token } = response;
 
             localStorage.setItem('token', access_token);
+            if (refresh_token) {
+                localStorage.setItem('refresh_token', refresh_token);
+            }
             setToken(access_token);
 
             const userData = await authApi.getMe();
@@ -62,6 +66,7 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
             console.error('Login failed:', error);
             // Clear any partial state
             localStorage.removeItem('token');
+            localStorage.removeItem('refresh_token');
             localStorage.removeItem('user');
             setToken(null);
             setUser(null);
@@ -70,7 +75,10 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     };
 
     const logout = () => {
+        // Revoke tokens server-side; local state is cleared regardless
+        authApi.logout().catch(() => undefined);
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         setToken(null);
         setUser(null);
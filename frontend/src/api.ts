@@ -22,14 +22,54 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
+// Exchange the stored refresh token for a new pair; shared by concurrent 401s
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = async (): Promise<string | null> => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) {
+        return null;
+    }
+    try {
+        const response = await axios.post(`${API_BASE_URL}/api/auth/refresh`, {
+            refresh_token: refreshToken,
+        });
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
+        return response.data.access_token;
+    } catch {
+        return null;
+    }
+};
+
+// Auth calls whose 401 means bad credentials or a dead session, not an
+// expired access token; all other 401s (including /api/auth/me) are retried
+const NO_REFRESH_URLS = ['/api/auth/login', '/api/auth/refresh', '/api/auth/logout'];
+
+const shouldRefresh = (url?: string) => !NO_REFRESH_URLS.some((path) => url?.includes(path));
+
 // Handle auth errors
 api.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
         console.error('API Error:', error.response?.status, error.response?.data || error.message);
 
+        const original = error.config;
+        if (error.response?.status === 401 && original && !original._retry && shouldRefresh(original.url)) {
+            original._retry = true;
+            refreshPromise = refreshPromise || refreshAccessToken().finally(() => {
+                refreshPromise = null;
+            });
+            const newToken = await refreshPromise;
+            if (newToken) {
+                original.headers.Authorization = `Bearer ${newToken}`;
+                return api(original);
+            }
+        }
+
         if (error.response?.status === 401) {
             localStorage.removeItem('token');
+            localStorage.removeItem('refresh_token');
             localStorage.removeItem('user');
             // Only redirect if we're not already on the login page
             if (window.location.pathname !== '/login') {
@@ -60,7 +100,11 @@ export const authApi = {
         return response.data;
     },
     logout: async () => {
-        const response = await api.post('/api/auth/logout');
+        const token = localStorage.getItem('token');
+        const refreshToken = localStorage.getItem('refresh_token');
+        const response = await api.post('/api/auth/logout', { refresh_token: refreshToken }, {
+            headers: { Authorization: `Bearer ${token}` },
+        });
         return response.data;
     },
 };
@@ -75,6 +119,79 @@ export const dashboardApi = {
         const response = await api.get('/api/dashboard/kpis');
         return response.data;
     },
+    // Stats of several departments in one round trip, keyed by department
+    getDepartmentStats: async (departments?: string[]) => {
+        const response = await api.get('/api/dashboard/department-stats', {
+            params: departments ? { departments: departments.join(',') } : undefined,
+        });
+        return response.data;
+    },
+    // Short-lived token for the KPI stream, which EventSource cannot authorize
+    // with a header
+    getStreamToken: async (): Promise<string> => {
+        const response = await api.post('/api/dashboard/stream-token');
+        return response.data.stream_token;
+    },
+};
+
+export type KpiChanges = Record<string, number>;
+
+const KPI_STREAM_RETRY_MS = 5000;
+
+// Follow KPI changes of the given sources over Server-Sent Events. The first
+// event of each source carries all of its fields, later ones only the fields
+// that changed. When the server closes the stream (e.g. a reconnect with an
+// expired stream token) a new token is fetched after a pause. Returns a
+// function that stops the subscription.
+export const subscribeKpis = (
+    sources: string[],
+    onChange: (source: string, changes: KpiChanges) => void
+): (() => void) => {
+    let stopped = false;
+    let eventSource: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+
+    const reconnectLater = () => {
+        eventSource?.close();
+        eventSource = null;
+        if (!stopped) {
+            retry = setTimeout(connect, KPI_STREAM_RETRY_MS);
+        }
+    };
+
+    const connect = async () => {
+        let token: string;
+        try {
+            token = await dashboardApi.getStreamToken();
+        } catch {
+            reconnectLater();
+            return;
+        }
+        if (stopped) {
+            return;
+        }
+        const params = new URLSearchParams({ sources: sources.join(','), stream_token: token });
+        const source = new EventSource(`${API_BASE_URL}/api/dashboard/stream?${params}`);
+        source.addEventListener('kpi', (event) => {
+            const { source: name, changes } = JSON.parse((event as MessageEvent).data);
+            onChange(name, changes);
+        });
+        source.onerror = () => {
+            // The browser retries dropped connections on its own; only a
+            // refused one (status other than 200) leaves the stream closed
+            if (source.readyState === EventSource.CLOSED) {
+                reconnectLater();
+            }
+        };
+        eventSource = source;
+    };
+
+    connect();
+    return () => {
+        stopped = true;
+        clearTimeout(retry);
+        eventSource?.close();
+    };
 };
 
 // Documents API
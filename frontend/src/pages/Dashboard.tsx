@@ -25,23 +25,58 @@ import {
     AreaChart,
     Area
 } from 'recharts';
+import { dashboardApi, subscribeKpis } from '../api';
+
+type Stats = Record<string, number>;
+
+// Departments shown in the overview, loaded together from department-stats
+// and then kept current by the KPI stream
+const DEPARTMENT_SOURCES = ['marketing', 'purchase', 'hr', 'store', 'maintenance'];
 
 const Dashboard: React.FC = () => {
     const navigate = useNavigate();
     const [loading, setLoading] = useState(true);
+    const [stats, setStats] = useState<Record<string, Stats>>({});
 
     useEffect(() => {
-        // Imitate loading for effect
-        setTimeout(() => setLoading(false), 800);
+        let active = true;
+        Promise.all([dashboardApi.getDashboard(), dashboardApi.getDepartmentStats(DEPARTMENT_SOURCES)])
+            .then(([dashboard, departments]) => {
+                if (active) {
+                    // Values already received from the stream are newer
+                    setStats((current) => {
+                        const loaded: Record<string, Stats> = { dashboard: dashboard.kpis, ...departments };
+                        for (const [source, values] of Object.entries(current)) {
+                            loaded[source] = { ...loaded[source], ...values };
+                        }
+                        return loaded;
+                    });
+                }
+            })
+            .catch((error) => console.error('Failed to load dashboard:', error))
+            .finally(() => {
+                if (active) {
+                    setLoading(false);
+                }
+            });
+        const unsubscribe = subscribeKpis(['dashboard', ...DEPARTMENT_SOURCES], (source, changes) => {
+            setStats((current) => ({ ...current, [source]: { ...current[source], ...changes } }));
+        });
+        return () => {
+            active = false;
+            unsubscribe();
+        };
     }, []);
 
+    const stat = (source: string, field: string) => stats[source]?.[field] ?? 0;
+
     const departments = [
-        { label: 'Marketing', icon: <ShoppingCart size={24} />, path: '/marketing/enquiries', theme: 'primary', count: '3 New Enquiries', trend: '+12%' },
-        { label: 'Purchase', icon: <Building2 size={24} />, path: '/purchase/orders', theme: 'warning', count: '2 Pending POs', trend: 'Urgent' },
-        { label: 'HR', icon: <Users size={24} />, path: '/hr/employees', theme: 'success', count: '142 Active', trend: 'Stable' },
-        { label: 'Operations', icon: <Factory size={24} />, path: '/work-orders', theme: 'info', count: '8 Running', trend: '98% Eff.' },
-        { label: 'Stores', icon: <Boxes size={24} />, path: '/inventory', theme: 'warning', count: 'Low Stock: 4', trend: '-2 Items' },
-        { label: 'Maintenance', icon: <Wrench size={24} />, path: '/maintenance/preventive-shop', theme: 'error', count: '1 Due Today', trend: 'Critical' },
+        { label: 'Marketing', icon: <ShoppingCart size={24} />, path: '/marketing/enquiries', theme: 'primary', count: `${stat('marketing', 'open_inquiries')} Open Enquiries`, trend: `${stat('marketing', 'open_complaints')} Complaints` },
+        { label: 'Purchase', icon: <Building2 size={24} />, path: '/purchase/orders', theme: 'warning', count: `${stat('purchase', 'pending_requisitions')} Pending Requisitions`, trend: `${stat('purchase', 'draft_orders')} Draft POs` },
+        { label: 'HR', icon: <Users size={24} />, path: '/hr/employees', theme: 'success', count: `${stat('hr', 'active_employees')} Active`, trend: `${stat('hr', 'scheduled_trainings')} Trainings` },
+        { label: 'Operations', icon: <Factory size={24} />, path: '/work-orders', theme: 'info', count: `${stat('dashboard', 'open_work_orders')} Open Work Orders`, trend: `${stat('dashboard', 'pending_inspections')} Inspections` },
+        { label: 'Stores', icon: <Boxes size={24} />, path: '/inventory', theme: 'warning', count: `${stat('store', 'pending_indents')} Pending Indents`, trend: `${stat('store', 'pending_qc')} Pending QC` },
+        { label: 'Maintenance', icon: <Wrench size={24} />, path: '/maintenance/preventive-shop', theme: 'error', count: `${stat('maintenance', 'pm_due_this_month')} PM Due This Month`, trend: `${stat('maintenance', 'open_breakdowns')} Breakdowns` },
     ];
 
     const chartData = [
@@ -164,7 +199,7 @@ const Dashboard: React.FC = () => {
                             <AlertTriangle size={24} />
                         </div>
                         <div>
-                            <div className="text-2xl font-bold">2</div>
+                            <div className="text-2xl font-bold">{stat('dashboard', 'open_ncs')}</div>
                             <div className="text-sm text-muted">Open Non-Conformances</div>
                         </div>
                     </div>
@@ -174,7 +209,7 @@ const Dashboard: React.FC = () => {
                             <CheckCircle size={24} />
                         </div>
                         <div>
-                            <div className="text-2xl font-bold">1</div>
+                            <div className="text-2xl font-bold">{stat('dashboard', 'open_capas')}</div>
                             <div className="text-sm text-muted">Active CAPAs</div>
                         </div>
                     </div>
@@ -184,8 +219,8 @@ const Dashboard: React.FC = () => {
                             <GraduationCap size={24} />
                         </div>
                         <div>
-                            <div className="text-2xl font-bold">5</div>
-                            <div className="text-sm text-muted">Pending Trainings</div>
+                            <div className="text-2xl font-bold">{stat('dashboard', 'overdue_trainings')}</div>
+                            <div className="text-sm text-muted">Overdue Trainings</div>
                         </div>
                     </div>
 